@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+# Runs each scenario in a fresh interpreter and reports its wall time and the
+# heavy dependencies it imported. Usage:
+#
+#   python benchmarks/import_time.py [--repeat 5] [--maf path/to/file.maf] [--json out.json]
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+HEAVY_MODULES = ("crewai", "langchain_openai", "scipy", "statsmodels", "pandas", "requests")
+
+_REPORT_MODULES = (
+    "import sys, json; print(json.dumps(sorted(m for m in %r if m in sys.modules)))"
+    % (HEAVY_MODULES,)
+)
+
+
+def scenarios(maf_file_path: str) -> Dict[str, List[str]]:
+    """
+    Returns the benchmarked commands, keyed by name.
+    """
+    python = sys.executable
+    return {
+        "cli --help": [python, "main.py", "--help"],
+        "import pipeline": [
+            python,
+            "-c",
+            f"import maf_tools.pipeline; {_REPORT_MODULES}",
+        ],
+        "import agent tools": [
+            python,
+            "-c",
+            "import maf_tools.task_delegator, maf_tools.somatic_interactions; "
+            + _REPORT_MODULES,
+        ],
+        "summary only": [
+            python,
+            "-c",
+            "from maf_tools.analyses import summarize_maf; "
+            f"summarize_maf({maf_file_path!r}); {_REPORT_MODULES}",
+        ],
+        "no-llm pipeline": [
+            python,
+            "-c",
+            "from maf_tools.dgidb_snapshot import DGIdbSnapshot; "
+            "from maf_tools.pipeline import run_pipeline; "
+            f"run_pipeline({maf_file_path!r}, dgidb_client=DGIdbSnapshot({{}}, {{}})); "
+            + _REPORT_MODULES,
+        ],
+    }
+
+
+def run_scenario(command: List[str], repeat: int) -> Dict[str, object]:
+    """
+    Runs a command ``repeat`` times and returns its best and median wall time
+    and the heavy modules it imported.
+    """
+    timings, imported = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = subprocess.run(
+            command, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        )
+        timings.append(time.perf_counter() - start)
+        lines = result.stdout.strip().splitlines()
+        if lines and lines[-1].startswith("["):
+            imported = json.loads(lines[-1])
+    timings.sort()
+    return {
+        "best_s": round(timings[0], 3),
+        "median_s": round(timings[len(timings) // 2], 3),
+        "imported": imported,
+    }
+
+
+def write_example_maf(path: str) -> str:
+    with open(path, "w") as f:
+        f.write("Hugo_Symbol\tTumor_Sample_Barcode\tVariant_Classification\n")
+        for i in range(200):
+            f.write(f"GENE{i % 20}\tS{i % 50}\tMissense_Mutation\n")
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CLI and module import times.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per scenario.")
+    parser.add_argument("--maf", help="MAF file for the summary and pipeline scenarios.")
+    parser.add_argument("--json", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    maf_file_path = args.maf
+    if maf_file_path is None:
+        import tempfile
+
+        maf_file_path = write_example_maf(os.path.join(tempfile.mkdtemp(), "example.maf"))
+    maf_file_path = os.path.abspath(maf_file_path)
+
+    results = {}
+    for name, command in scenarios(maf_file_path).items():
+        results[name] = run_scenario(command, args.repeat)
+        result = results[name]
+        print(
+            f"{name:20s} best {result['best_s']:6.3f}s  median {result['median_s']:6.3f}s  "
+            f"imports: {', '.join(result['imported']) or '-'}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version.split()[0], "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
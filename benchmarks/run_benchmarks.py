@@ -0,0 +1,254 @@
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+# Times the analyses on synthetic cohorts of increasing size and writes the
+# results as JSON, so runs can be compared to catch regressions. Usage:
+#
+#   python benchmarks/run_benchmarks.py [--scales small,medium] [--top-n 25,50,100]
+#                                       [--repeat 3] [--output results.json]
+#
+# Every timed run starts with empty caches. Peak memory is measured in a
+# separate run under tracemalloc (Python and NumPy allocations), since tracing
+# slows the run down.
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, PROJECT_ROOT)
+
+from maf_tools.synthetic import PlantedPair, generate_maf, write_maf  # noqa: E402
+
+# Named scales as (samples, genes). Other scales can be given as SAMPLESxGENES.
+SCALES = {
+    "small": (500, 2_000),
+    "medium": (2_000, 10_000),
+    "large": (10_000, 20_000),
+}
+
+# Planted pairs, so the somatic interaction analysis has real signal to report.
+CO_OCCURRING = [PlantedPair("GENE3", "GENE4", 0.8)]
+MUTUALLY_EXCLUSIVE = [PlantedPair("GENE1", "GENE2", 0.95)]
+
+
+def parse_scale(spec: str) -> Tuple[str, int, int]:
+    """
+    Returns the name, samples and genes of a scale given by name or as SAMPLESxGENES.
+    """
+    if spec in SCALES:
+        return (spec, *SCALES[spec])
+    try:
+        n_samples, n_genes = (int(part) for part in spec.lower().split("x"))
+    except ValueError:
+        raise ValueError(
+            f"Unknown scale {spec!r}; expected one of {', '.join(SCALES)} or SAMPLESxGENES"
+        )
+    return spec, n_samples, n_genes
+
+
+def clear_caches() -> None:
+    """
+    Empties the process-wide caches, so the next analysis reads the MAF file again.
+    """
+    from maf_tools import cohort_summary, gene_ranking
+    from maf_tools.maf_cache import get_maf_cache
+
+    get_maf_cache().clear()
+    with cohort_summary._summaries_lock:
+        cohort_summary._summaries.clear()
+    with gene_ranking._rankings_lock:
+        gene_ranking._rankings.clear()
+
+
+def _checked(func: Callable[[], str]) -> str:
+    output = func()
+    if output.startswith("Error"):
+        raise RuntimeError(output)
+    return output
+
+
+def measure(func: Callable[[], str], repeat: int) -> Dict[str, float]:
+    """
+    Times ``func`` once with warm caches and ``repeat`` times from empty
+    caches, and measures its peak traced memory from empty caches. An untimed
+    first call keeps lazy imports out of the timings.
+    """
+    _checked(func)
+    start = time.perf_counter()
+    _checked(func)
+    warm = time.perf_counter() - start
+
+    timings = []
+    for _ in range(repeat):
+        clear_caches()
+        start = time.perf_counter()
+        _checked(func)
+        timings.append(time.perf_counter() - start)
+
+    clear_caches()
+    tracemalloc.start()
+    try:
+        _checked(func)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": round(min(timings), 4),
+        "median_s": round(statistics.median(timings), 4),
+        "warm_s": round(warm, 4),
+        "peak_mb": round(peak / 2**20, 2),
+    }
+
+
+def benchmarks(maf_file_path: str, top_ns: List[int]) -> List[Tuple[str, dict, Callable[[], str]]]:
+    """
+    Returns the benchmarked calls as (name, parameters, function) tuples.
+    """
+    from maf_tools.dgidb_snapshot import DGIdbSnapshot
+    from maf_tools.maf_summarizer import MAFSummarizer
+    from maf_tools.pipeline import run_pipeline
+    from maf_tools.somatic_interactions import SomaticInteractionsTool
+
+    summarizer = MAFSummarizer()
+    somatic_tool = SomaticInteractionsTool()
+    # An empty offline snapshot keeps DGIdb (and the network) out of the timings
+    dgidb_client = DGIdbSnapshot({}, {})
+
+    calls = [("maf_summarizer", {}, lambda: summarizer._run(maf_file_path=maf_file_path))]
+    for top_n in top_ns:
+        calls.append(
+            (
+                "somatic_interactions",
+                {"top_n": top_n},
+                lambda top_n=top_n: somatic_tool._run(
+                    maf_file_path=maf_file_path, top_n=top_n, pvalue_cutoff=0.05
+                ),
+            )
+        )
+    calls.append(
+        (
+            "report",
+            {"top_n": max(top_ns)},
+            lambda: run_pipeline(
+                maf_file_path, top_n=max(top_ns), dgidb_client=dgidb_client
+            ),
+        )
+    )
+    return calls
+
+
+def run_scale(
+    name: str, n_samples: int, n_genes: int, top_ns: List[int], repeat: int, seed: int, workdir: str
+) -> List[dict]:
+    """
+    Generates the synthetic MAF file of a scale and runs every benchmark on it.
+    """
+    start = time.perf_counter()
+    maf_df = generate_maf(
+        n_samples,
+        n_genes,
+        co_occurring=CO_OCCURRING,
+        mutually_exclusive=MUTUALLY_EXCLUSIVE,
+        seed=seed,
+    )
+    maf_file_path = write_maf(maf_df, os.path.join(workdir, f"{name}.maf"))
+    scale = {
+        "scale": name,
+        "samples": n_samples,
+        "genes": n_genes,
+        "mutations": len(maf_df),
+        "file_mb": round(os.path.getsize(maf_file_path) / 2**20, 2),
+    }
+    del maf_df
+    print(
+        f"[{name}] {n_samples} samples, {n_genes} genes, {scale['mutations']} mutations "
+        f"({scale['file_mb']} MB, generated in {time.perf_counter() - start:.1f}s)"
+    )
+
+    results = []
+    for benchmark, params, func in benchmarks(maf_file_path, top_ns):
+        result = {**scale, "benchmark": benchmark, "params": params, **measure(func, repeat)}
+        results.append(result)
+        label = benchmark + "".join(f" {k}={v}" for k, v in params.items())
+        print(
+            f"  {label:30s} best {result['best_s']:8.3f}s  median {result['median_s']:8.3f}s  "
+            f"warm {result['warm_s']:8.3f}s  peak {result['peak_mb']:9.2f} MB"
+        )
+    os.remove(maf_file_path)
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the analyses on synthetic MAF files.")
+    parser.add_argument(
+        "--scales",
+        default="small,medium",
+        help=f"Comma-separated scales: {', '.join(SCALES)} or SAMPLESxGENES.",
+    )
+    parser.add_argument(
+        "--top-n", default="25,50,100", help="Comma-separated top_n values for somatic interactions."
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the synthetic cohorts.")
+    parser.add_argument(
+        "--output", default="benchmark_results.json", help="JSON file to write the results to."
+    )
+    args = parser.parse_args()
+
+    try:
+        scales = [parse_scale(spec) for spec in args.scales.split(",")]
+        top_ns = [int(top_n) for top_n in args.top_n.split(",")]
+    except ValueError as e:
+        parser.error(str(e))
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name, n_samples, n_genes in scales:
+            results.extend(run_scale(name, n_samples, n_genes, top_ns, args.repeat, args.seed, workdir))
+
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    max_rss_mb = max_rss / (2**20 if sys.platform == "darwin" else 2**10)
+    with open(args.output, "w") as f:
+        json.dump(
+            {
+                "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                "commit": _git_commit(),
+                "python": sys.version.split()[0],
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "repeat": args.repeat,
+                "seed": args.seed,
+                "max_rss_mb": round(max_rss_mb, 2),
+                "results": results,
+            },
+            f,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+import os
+from typing import List, Optional
+
+from maf_tools.cohort_summary import DEFAULT_TOP_N as DEFAULT_SUMMARY_TOP_N
+from maf_tools.cohort_summary import summarize_cohort
+from maf_tools.defaults import DEFAULT_PERMUTATIONS
+from maf_tools.gene_ranking import gene_ranking
+from maf_tools.tool_output import DEFAULT_MAX_ROWS, OUTPUT_FORMATS, dumps, frame_table, table
+
+# The analyses behind the CrewAI tools, as plain functions. They import
+# neither CrewAI nor the statistics libraries until called, so the LLM-free
+# pipeline and the batch workers never load CrewAI, and a summary never
+# loads SciPy or statsmodels.
+
+# Significance tests for gene pairs.
+METHODS = ("fisher", "permutation")
+
+# Number of top genes from which Fisher's test runs on the sparse backend.
+SPARSE_MIN_GENES = int(os.environ.get("MAF_AI_SPARSE_MIN_GENES", 1000))
+
+# Columns of the JSON somatic interaction table, most informative first.
+SOMATIC_COLUMNS = [
+    "gene1",
+    "gene2",
+    "Event",
+    "pAdjust",
+    "pValue",
+    "oddsRatio",
+    "11",
+    "10",
+    "01",
+    "00",
+]
+
+# Columns of the JSON drug-gene interaction table.
+DRUG_GENE_COLUMNS = ["gene", "drug", "types", "sources"]
+
+
+def _format_error(output_format: str) -> Optional[str]:
+    if output_format not in OUTPUT_FORMATS:
+        return f"Error: Unknown output format {output_format!r}; expected one of {', '.join(OUTPUT_FORMATS)}"
+    return None
+
+
+def _incremental_state(
+    maf_file_path: str, delta_maf_file_path: Optional[str], chunksize: Optional[int]
+):
+    from maf_tools.incremental import incremental_analysis
+    from maf_tools.maf_stream import DEFAULT_CHUNKSIZE
+
+    return incremental_analysis(
+        maf_file_path, delta_maf_file_path, chunksize=chunksize or DEFAULT_CHUNKSIZE
+    )
+
+
+def summarize_maf(
+    maf_file_path: str,
+    chunksize: Optional[int] = None,
+    output_format: str = "text",
+    top_n: int = DEFAULT_SUMMARY_TOP_N,
+    capture_size_mb: Optional[float] = None,
+    incremental: bool = False,
+    delta_maf_file_path: Optional[str] = None,
+) -> str:
+    """
+    Reads a MAF file and returns a summary.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        chunksize: If set, stream the file in chunks of this many rows.
+        output_format: "text" or "json".
+        top_n: Number of most frequently mutated genes to list.
+        capture_size_mb: Capture size, to report mutation burden per megabase.
+        incremental: Keep the cohort state next to the MAF file and read only
+            the rows appended since the last run.
+        delta_maf_file_path: MAF file with new rows for the cohort; implies
+            ``incremental``.
+
+    Returns:
+        A summary of the MAF file.
+    """
+    error = _format_error(output_format)
+    if error:
+        return error
+    try:
+        if incremental or delta_maf_file_path is not None:
+            # Counters kept from the previous run, updated with the new rows only
+            summary = _incremental_state(
+                maf_file_path, delta_maf_file_path, chunksize
+            ).summary()
+        else:
+            # All statistics come from one pass over the records
+            summary = summarize_cohort(maf_file_path, chunksize)
+        if output_format == "json":
+            return summary.to_json(top_n, capture_size_mb)
+        return summary.to_text(top_n, capture_size_mb)
+
+    except FileNotFoundError:
+        return f"Error: MAF file not found at {maf_file_path}"
+    except KeyError as e:
+        return f"Error: Required column not found in MAF file: {e}"
+    except Exception as e:
+        return f"Error summarizing MAF file: {e}"
+
+
+def somatic_interactions(
+    maf_file_path: str,
+    top_n: int,
+    pvalue_cutoff: float,
+    chunksize: Optional[int] = None,
+    method: str = "fisher",
+    permutations: int = DEFAULT_PERMUTATIONS,
+    seed: Optional[int] = None,
+    exclude_classifications: Optional[List[str]] = None,
+    output_format: str = "json",
+    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    incremental: bool = False,
+    delta_maf_file_path: Optional[str] = None,
+    group_by: Optional[str] = None,
+) -> str:
+    """
+    Analyzes somatic interactions in a MAF file.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        top_n: Number of top mutated genes to consider.
+        pvalue_cutoff: The p-value cutoff for significance.
+        chunksize: If set, stream the file in chunks of this many rows.
+        method: "fisher" or "permutation".
+        permutations: Number of permutations for the permutation method.
+        seed: Random seed for the permutation method.
+        exclude_classifications: Variant classifications to ignore (e.g. Silent).
+        output_format: "json" or "text".
+        max_rows: Most significant pairs to include in JSON output.
+        incremental: Keep the co-mutation counts next to the MAF file and
+            read only the rows appended since the last run (Fisher's test only).
+        delta_maf_file_path: MAF file with new rows for the cohort; implies
+            ``incremental``.
+        group_by: Test the pairs within each group of samples: a MAF column
+            (e.g. a cancer type column) or a sample to group mapping file.
+            The top genes are chosen over the whole cohort, and p-values are
+            adjusted within each group.
+
+    Returns:
+        A string representation of the results (gene pairs, p-values, etc.).
+    """
+    if method not in METHODS:
+        return f"Error: Unknown method {method!r}; expected one of {', '.join(METHODS)}"
+    incremental = incremental or delta_maf_file_path is not None
+    if incremental and method != "fisher":
+        return "Error: Incremental analysis supports only the fisher method"
+    if incremental and group_by is not None:
+        return "Error: Incremental analysis does not support group_by"
+    error = _format_error(output_format)
+    if error:
+        return error
+    try:
+        from statsmodels.sandbox.stats.multicomp import multipletests
+
+        from maf_tools.incidence import pairwise_interactions
+        from maf_tools.permutation import permutation_interactions
+
+        # Number of pairs tested, when the backend tests more pairs than it returns
+        pairs_tested = None
+        if group_by is not None:
+            from maf_tools.stratified import sample_groups, stratified_interactions, stratify
+
+            # 1. Gene Selection over the whole cohort
+            ranking = gene_ranking(maf_file_path, chunksize)
+            top_genes = ranking.top_genes(top_n, exclude_classifications)
+
+            # 2. One incidence matrix with each group's samples in consecutive
+            # rows, sliced into per-group views
+            strata = stratify(
+                ranking,
+                top_genes,
+                sample_groups(maf_file_path, group_by, chunksize),
+                exclude_classifications,
+            )
+
+            # 3-4. Tests and Benjamini-Hochberg adjustment within each group,
+            # with the groups tested in parallel
+            results_df = stratified_interactions(strata, method, permutations, seed)
+        elif incremental:
+            # 1-3. Gene selection and Fisher's Exact Test from the stored
+            # co-mutation counts, updated with the new rows only
+            top_genes, results_df = _incremental_state(
+                maf_file_path, delta_maf_file_path, chunksize
+            ).interactions(top_n, exclude_classifications)
+        else:
+            # Gene ranking by mutated samples, shared with the other tools
+            ranking = gene_ranking(maf_file_path, chunksize)
+
+            # 1. Gene Selection
+            top_genes = ranking.top_genes(top_n, exclude_classifications)
+
+            if method == "fisher" and len(top_genes) >= SPARSE_MIN_GENES:
+                from maf_tools.sparse_incidence import SparseIncidence, sparse_interactions
+
+                # 2-4. Sparse incidence matrix for whole-exome gene counts; pairs
+                # are tested in blocks, skipping those whose margins cannot
+                # reach the cutoff, and adjusted over all pairs
+                results_df, pairs_tested = sparse_interactions(
+                    SparseIncidence.from_ranking(ranking, top_genes, exclude_classifications),
+                    pvalue_cutoff,
+                )
+            else:
+                # 2. Sample x gene incidence matrix, built once for all pairs
+                incidence = ranking.incidence(top_genes, exclude_classifications)
+
+                # 3. Contingency tables and Fisher's Exact Test for every pair at once,
+                # or empirical p-values from burden-preserving permutations
+                if method == "permutation":
+                    results_df = permutation_interactions(incidence, permutations, seed)
+                else:
+                    results_df = pairwise_interactions(incidence)
+
+        if "pAdjust" not in results_df:
+            # 4. P-value Adjustment (Benjamini-Hochberg)
+            reject, pvals_corrected, _, _ = multipletests(results_df["pValue"], method="fdr_bh")
+            results_df["pAdjust"] = pvals_corrected
+        if pairs_tested is None:
+            pairs_tested = len(results_df)
+
+        # Filter based on p-value cutoff
+        significant_interactions = results_df[results_df["pAdjust"] < pvalue_cutoff]
+
+        if output_format == "json":
+            # Most significant pairs first, so truncation keeps the strongest
+            significant_interactions = significant_interactions.sort_values(
+                ["pAdjust", "pValue"], kind="stable"
+            )
+            events = significant_interactions["Event"].value_counts()
+            columns = SOMATIC_COLUMNS
+            stratification = {}
+            if group_by is not None:
+                columns = ["group"] + SOMATIC_COLUMNS
+                significant_by_group = significant_interactions["group"].value_counts()
+                stratification = {
+                    "group_by": group_by,
+                    "groups": {
+                        name: {
+                            "samples": incidence.n_samples,
+                            "significant": int(significant_by_group.get(name, 0)),
+                        }
+                        for name, incidence in strata
+                    },
+                }
+            return dumps(
+                {
+                    "method": method,
+                    **stratification,
+                    "genes_tested": len(top_genes),
+                    "pairs_tested": pairs_tested,
+                    "pvalue_cutoff": pvalue_cutoff,
+                    "significant": len(significant_interactions),
+                    "events": {event: int(count) for event, count in events.items()},
+                    **frame_table(significant_interactions, columns, max_rows),
+                }
+            )
+
+        # Format the output as a string
+        if significant_interactions.empty:
+            return "No significant somatic interactions found."
+
+        return significant_interactions.to_string()
+
+    except FileNotFoundError:
+        return f"Error: MAF file not found at {maf_file_path}"
+    except KeyError as e:
+        return f"Error: Required column not found in MAF file: {e}"
+    except Exception as e:
+        return f"Error during somatic interaction analysis: {e}"
+
+
+def drug_gene_interactions(
+    maf_file_path: str,
+    num_genes: int,
+    num_interactions: int,
+    chunksize: Optional[int] = None,
+    exclude_classifications: Optional[List[str]] = None,
+    output_format: str = "json",
+    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    client=None,
+) -> str:
+    """
+    Identifies drug-gene interactions for the top mutated genes in a MAF file using batched GraphQL queries.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        num_genes: Number of top mutated genes to analyze.
+        num_interactions: Number of top interactions to retrieve per gene.
+        chunksize: If set, stream the file in chunks of this many rows.
+        exclude_classifications: Variant classifications to ignore (e.g. Silent).
+        output_format: "json" or "text".
+        max_rows: Most interactions to include in JSON output.
+        client: DGIdb backend (a DGIdbClient or DGIdbSnapshot). Defaults to the
+            shared backend.
+
+    Returns:
+        A summary of drug-gene interactions for the specified genes.
+    """
+    error = _format_error(output_format)
+    if error:
+        return error
+    try:
+        # Get the genes mutated in the most samples (shared ranking)
+        top_genes = gene_ranking(maf_file_path, chunksize).top_genes(
+            num_genes, exclude_classifications
+        )
+
+        # Query DGIdb for all genes at once (batched, concurrent requests)
+        if client is None:
+            from maf_tools.dgidb_client import get_dgidb_client
+
+            client = get_dgidb_client()
+        lookup = client.fetch_interactions(top_genes, num_interactions)
+        found, errors = lookup.interactions, lookup.errors
+
+        # One row per interaction for JSON, one line per interaction for text
+        rows, no_interactions, interactions = [], [], []
+        for gene in top_genes:
+            if gene in errors:
+                interactions.append(f"{gene}: {errors[gene]}")
+                continue
+            if not found.get(gene):
+                no_interactions.append(gene)
+                interactions.append(f"{gene}: No interactions found.")
+                continue
+            for interaction in found[gene]:
+                drug_name = interaction["drug"]["name"]
+                interaction_types = ", ".join(
+                    f"{t['type']} ({t['directionality']})"
+                    if t.get("directionality")
+                    else t["type"]
+                    for t in interaction.get("interactionTypes", [])
+                )
+                sources = ", ".join(
+                    source["sourceDbName"]
+                    for source in interaction.get("sources", [])
+                )
+                rows.append([gene, drug_name, interaction_types, sources])
+                interactions.append(
+                    f"{gene}: {drug_name} - Types: {interaction_types} - Sources: {sources}"
+                )
+
+        if output_format == "json":
+            payload = {
+                "genes": top_genes,
+                **table(rows, DRUG_GENE_COLUMNS, max_rows),
+                "no_interactions": no_interactions,
+                "errors": {gene: errors[gene] for gene in top_genes if gene in errors},
+            }
+            if client.cache is not None:
+                payload["cache"] = {"hits": lookup.cache_hits, "misses": lookup.cache_misses}
+            return dumps(payload)
+
+        if client.cache is not None:
+            interactions.append(
+                f"(DGIdb cache: {lookup.cache_hits} hits, {lookup.cache_misses} misses)"
+            )
+
+        if interactions:
+            return "\n".join(interactions)
+        else:
+            return "No drug-gene interactions found for the specified genes."
+
+    except FileNotFoundError:
+        return f"Error: MAF file not found at {maf_file_path}"
+    except KeyError as e:
+        return f"Error: Required column not found in MAF file: {e}"
+    except Exception as e:
+        raise RuntimeError(f"Error during drug-gene interaction analysis: {e}")
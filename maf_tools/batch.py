@@ -0,0 +1,280 @@
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+from maf_tools.maf_cache import DEFAULT_MAX_BYTES, get_maf_cache
+from maf_tools.maf_sidecar import check_sidecar_support, set_sidecar_enabled
+from maf_tools.pipeline import run_pipeline
+
+# File names picked up when a directory of MAF files is given.
+MAF_SUFFIXES = tuple(
+    suffix + compression
+    for suffix in (".maf", ".maf.txt", ".maf.tsv", "data_mutations.txt")
+    for compression in ("", ".gz", ".bgz")
+)
+
+_MARKER_SUFFIX = ".done.json"
+
+# Per-worker state, set up once per process by _init_worker.
+_worker_dgidb_client: Optional[DGIdbSnapshot] = None
+
+
+def _cohort_name(maf_file_path: str) -> str:
+    name = os.path.basename(maf_file_path)
+    for suffix in (".gz", ".bgz"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    for suffix in (".maf.txt", ".maf.tsv", ".maf", ".txt", ".tsv"):
+        if name.endswith(suffix):
+            name = name[: -len(suffix)]
+            break
+    if name == "data_mutations":
+        # cBioPortal layout: <study>/data_mutations.txt
+        name = os.path.basename(os.path.dirname(os.path.abspath(maf_file_path)))
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", name) or "cohort"
+
+
+def discover_cohorts(source: str) -> List[Tuple[str, str]]:
+    """
+    Lists the cohorts of a batch.
+
+    Args:
+        source: A directory, searched recursively for MAF files, or a manifest
+            with one MAF path per line, optionally preceded by a cohort name
+            and a tab. Relative manifest paths are relative to the manifest.
+
+    Returns:
+        (cohort name, MAF path) pairs with unique cohort names.
+    """
+    entries: List[Tuple[Optional[str], str]] = []
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if name.endswith(MAF_SUFFIXES):
+                    entries.append((None, os.path.join(root, name)))
+    else:
+        base = os.path.dirname(os.path.abspath(source))
+        with open(source) as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                name, _, path = line.rpartition("\t")
+                entries.append((name.strip() or None, os.path.join(base, path.strip())))
+
+    # "index" is taken by the batch index files.
+    cohorts, seen = [], {"index": 1}
+    for name, path in entries:
+        name = name or _cohort_name(path)
+        count = seen.get(name, 0)
+        seen[name] = count + 1
+        cohorts.append((f"{name}_{count + 1}" if count else name, path))
+    return cohorts
+
+
+def _source_state(maf_file_path: str) -> Dict[str, Any]:
+    stat = os.stat(maf_file_path)
+    return {
+        "maf_file_path": os.path.abspath(maf_file_path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _marker_path(output_dir: str, cohort: str) -> str:
+    return os.path.join(output_dir, cohort + _MARKER_SUFFIX)
+
+
+def _read_marker(output_dir: str, cohort: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(_marker_path(output_dir, cohort)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_atomic(path: str, text: str) -> None:
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def is_done(output_dir: str, cohort: str, maf_file_path: str, params: Dict[str, Any]) -> bool:
+    """
+    Checks whether a cohort already has a report for the current MAF file and parameters.
+    """
+    marker = _read_marker(output_dir, cohort)
+    if marker is None or not os.path.exists(os.path.join(output_dir, marker["report"])):
+        return False
+    try:
+        state = _source_state(maf_file_path)
+    except OSError:
+        return False
+    return marker["source"] == state and marker["params"] == params
+
+
+def _init_worker(max_cache_bytes: int, sidecar: bool, dgidb_snapshot: Optional[str]) -> None:
+    global _worker_dgidb_client
+    get_maf_cache().max_bytes = max_cache_bytes
+    # The batch already uses every core; permutation tests stay in the worker.
+    os.environ["MAF_AI_PERMUTATION_WORKERS"] = "1"
+    set_sidecar_enabled(sidecar)
+    # Without a snapshot the workers use the shared DGIdb API client.
+    _worker_dgidb_client = DGIdbSnapshot.load(dgidb_snapshot) if dgidb_snapshot else None
+
+
+def analyze_cohort(
+    cohort: str, maf_file_path: str, output_dir: str, params: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Writes the report of one cohort and marks it done.
+
+    Runs in a worker process. The report is written first and the done marker
+    last, both atomically, so a crash never leaves a cohort marked done
+    without its report.
+
+    Returns:
+        The cohort's index entry.
+    """
+    start = time.perf_counter()
+    source = _source_state(maf_file_path)
+    report = run_pipeline(
+        maf_file_path, dgidb_client=_worker_dgidb_client, **params
+    )
+    report_name = cohort + ".md"
+    _write_atomic(os.path.join(output_dir, report_name), report)
+    # Cohorts are distinct files; drop this one before the worker moves on.
+    get_maf_cache().clear()
+    entry = {
+        "cohort": cohort,
+        "report": report_name,
+        "status": "done",
+        "elapsed": round(time.perf_counter() - start, 3),
+        "source": source,
+        "params": params,
+    }
+    _write_atomic(_marker_path(output_dir, cohort), json.dumps(entry, indent=2))
+    return entry
+
+
+def write_index(output_dir: str, entries: List[Dict[str, Any]]) -> None:
+    """
+    Writes index.json and index.md listing every cohort of the batch.
+    """
+    _write_atomic(os.path.join(output_dir, "index.json"), json.dumps(entries, indent=2))
+    lines = [
+        "# MAF Batch Analysis",
+        "",
+        "| Cohort | Status | Report | MAF File | Seconds |",
+        "|--------|--------|--------|----------|---------|",
+    ]
+    for entry in entries:
+        report = f"[{entry['report']}]({entry['report']})" if entry.get("report") else ""
+        status = entry["status"]
+        if entry.get("error"):
+            status += f": {entry['error']}"
+        lines.append(
+            f"| {entry['cohort']} | {status} | {report} "
+            f"| {entry['source']['maf_file_path']} | {entry.get('elapsed', '')} |"
+        )
+    _write_atomic(os.path.join(output_dir, "index.md"), "\n".join(lines) + "\n")
+
+
+def run_batch(
+    cohorts: List[Tuple[str, str]],
+    output_dir: str,
+    workers: Optional[int] = None,
+    params: Optional[Dict[str, Any]] = None,
+    sidecar: bool = False,
+    dgidb_snapshot: Optional[str] = None,
+    force: bool = False,
+    progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Analyzes many cohorts across a process pool.
+
+    Each worker process imports the tools once, keeps its own DGIdb backend
+    and MAF cache (with ``DEFAULT_MAX_BYTES`` split between the workers) and
+    analyzes cohorts until none are left; the largest files are scheduled
+    first so one big cohort does not finish last. Cohorts whose report is up
+    to date with their MAF file and parameters are skipped, so a batch
+    restarted after a crash only runs the unfinished cohorts.
+
+    Args:
+        cohorts: (cohort name, MAF path) pairs, e.g. from ``discover_cohorts``.
+        output_dir: Directory for the reports and the index.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        params: Analysis parameters passed to ``run_pipeline``.
+        sidecar: Write binary sidecars for the MAF files.
+        dgidb_snapshot: Local DGIdb snapshot to use instead of the API.
+        force: Re-run cohorts that are already done.
+        progress: Called with each cohort's index entry as it finishes.
+
+    Returns:
+        The index entries, in cohort order.
+
+    Raises:
+        ImportError: If ``sidecar`` is set and pyarrow is not installed.
+    """
+    if sidecar:
+        check_sidecar_support()
+    params = dict(params or {})
+    workers = max(1, workers or os.cpu_count() or 1)
+    os.makedirs(output_dir, exist_ok=True)
+
+    entries: Dict[str, Dict[str, Any]] = {}
+    pending = []
+    for cohort, maf_file_path in cohorts:
+        if not os.path.exists(maf_file_path):
+            entries[cohort] = {
+                "cohort": cohort,
+                "report": None,
+                "status": "failed",
+                "error": f"MAF file not found at {maf_file_path}",
+                "source": {"maf_file_path": os.path.abspath(maf_file_path)},
+            }
+        elif not force and is_done(output_dir, cohort, maf_file_path, params):
+            entries[cohort] = dict(_read_marker(output_dir, cohort), status="skipped")
+        else:
+            pending.append((cohort, maf_file_path))
+    for entry in entries.values():
+        if progress:
+            progress(entry)
+    pending.sort(key=lambda cohort: os.path.getsize(cohort[1]), reverse=True)
+
+    if pending:
+        with ProcessPoolExecutor(
+            max_workers=min(workers, len(pending)),
+            initializer=_init_worker,
+            initargs=(DEFAULT_MAX_BYTES // workers, sidecar, dgidb_snapshot),
+        ) as pool:
+            futures = {
+                pool.submit(analyze_cohort, cohort, path, output_dir, params): (cohort, path)
+                for cohort, path in pending
+            }
+            for future in as_completed(futures):
+                cohort, path = futures[future]
+                try:
+                    entry = future.result()
+                except Exception as e:
+                    entry = {
+                        "cohort": cohort,
+                        "report": None,
+                        "status": "failed",
+                        "error": str(e),
+                        "source": {"maf_file_path": os.path.abspath(path)},
+                    }
+                entries[cohort] = entry
+                if progress:
+                    progress(entry)
+
+    index = [entries[cohort] for cohort, _ in cohorts]
+    write_index(output_dir, index)
+    return index
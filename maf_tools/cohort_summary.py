@@ -0,0 +1,352 @@
+import json
+import threading
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.gene_ranking import (
+    GeneRanking,
+    cache_gene_ranking,
+    cached_gene_ranking,
+    gene_ranking,
+    ranking_columns,
+)
+from maf_tools.maf_cache import file_key, load_maf
+from maf_tools.maf_reader import (
+    CLASSIFICATION_COLUMN,
+    GENE_COLUMN,
+    REFERENCE_ALLELE_COLUMN,
+    SAMPLE_COLUMN,
+    TUMOR_ALLELE_COLUMN,
+    VARIANT_TYPE_COLUMN,
+    read_maf_chunks,
+    read_maf_header,
+)
+from maf_tools.maf_stream import sort_counts
+
+# Columns every summary needs, and columns summarized when the MAF has them.
+REQUIRED_COLUMNS = [SAMPLE_COLUMN, GENE_COLUMN, CLASSIFICATION_COLUMN]
+OPTIONAL_COLUMNS = [VARIANT_TYPE_COLUMN, REFERENCE_ALLELE_COLUMN, TUMOR_ALLELE_COLUMN]
+
+DEFAULT_TOP_N = 10
+
+# Single-base substitutions, folded onto the pyrimidine of the reference strand.
+SNV_CLASSES = {
+    "C>A": "C>A", "G>T": "C>A",
+    "C>G": "C>G", "G>C": "C>G",
+    "C>T": "C>T", "G>A": "C>T",
+    "T>A": "T>A", "A>T": "T>A",
+    "T>C": "T>C", "A>G": "T>C",
+    "T>G": "T>G", "A>C": "T>G",
+}
+
+
+def snv_class_counts(maf_df: pd.DataFrame) -> Dict[str, int]:
+    """
+    Counts the single-nucleotide variants of each substitution class.
+
+    Alleles are grouped first, so the class lookup runs once per distinct
+    (reference, tumor) allele pair instead of once per row.
+    """
+    if REFERENCE_ALLELE_COLUMN not in maf_df or TUMOR_ALLELE_COLUMN not in maf_df:
+        return {}
+    pairs = maf_df.groupby(
+        [REFERENCE_ALLELE_COLUMN, TUMOR_ALLELE_COLUMN], observed=True, sort=False
+    ).size()
+    counts: Counter = Counter()
+    for (reference, tumor), count in pairs.items():
+        snv_class = SNV_CLASSES.get(f"{str(reference).upper()}>{str(tumor).upper()}")
+        if snv_class is not None and count:
+            counts[snv_class] += int(count)
+    return dict(counts)
+
+
+def _counts(maf_df: pd.DataFrame, column: str) -> Dict[str, int]:
+    if column not in maf_df:
+        return {}
+    return maf_df[column].value_counts().to_dict()
+
+
+class CohortStats:
+    """
+    Per-sample mutation counts and the Variant_Classification, Variant_Type
+    and SNV class counts, accumulated one MAF chunk at a time for streamed
+    summaries. Genes are ranked by the shared GeneRanking index.
+    """
+
+    def __init__(self):
+        # All rows, including those without a sample barcode
+        self.n_rows = 0
+        self.sample_mutations: Counter = Counter()
+        self.classification_counts: Counter = Counter()
+        self.variant_type_counts: Counter = Counter()
+        self.snv_counts: Counter = Counter()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Adds the records of one MAF chunk to the statistics.
+        """
+        self.n_rows += len(chunk)
+        self.sample_mutations.update(_counts(chunk, SAMPLE_COLUMN))
+        self.classification_counts.update(_counts(chunk, CLASSIFICATION_COLUMN))
+        self.variant_type_counts.update(_counts(chunk, VARIANT_TYPE_COLUMN))
+        self.snv_counts.update(snv_class_counts(chunk))
+
+
+def _distribution(values: np.ndarray) -> Dict[str, float]:
+    if len(values) == 0:
+        return {}
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    return {
+        "min": float(values.min()),
+        "q1": float(q1),
+        "median": float(median),
+        "q3": float(q3),
+        "max": float(values.max()),
+        "mean": float(values.mean()),
+    }
+
+
+def _sorted_dict(counts) -> Dict[str, int]:
+    return sort_counts(pd.Series(counts, dtype=np.int64)).to_dict()
+
+
+class CohortSummary:
+    """
+    Statistics of a MAF cohort: sample, gene and mutation counts, the
+    per-sample mutation burden, the number of mutated samples per gene and
+    the Variant_Classification, Variant_Type and SNV class counts.
+
+    Gene frequencies are kept in ranked order (most mutated samples first,
+    ties by name), so the top genes for any N are a slice.
+    """
+
+    def __init__(
+        self,
+        sample_mutations: pd.Series,
+        gene_samples: pd.Series,
+        n_mutations: int,
+        variant_classifications: Dict[str, int],
+        variant_types: Optional[Dict[str, int]] = None,
+        snv_classes: Optional[Dict[str, int]] = None,
+    ):
+        self.sample_mutations = sample_mutations
+        self.gene_samples = sort_counts(gene_samples)
+        self.n_mutations = n_mutations
+        self.variant_classifications = _sorted_dict(variant_classifications)
+        self.variant_types = _sorted_dict(variant_types or {})
+        # All six classes in a fixed order, or none when alleles are unknown.
+        self.snv_classes = (
+            {
+                snv_class: int(snv_classes.get(snv_class, 0))
+                for snv_class in sorted(set(SNV_CLASSES.values()))
+            }
+            if snv_classes
+            else {}
+        )
+
+    @classmethod
+    def from_maf(
+        cls, maf_df: pd.DataFrame, ranking: Optional[GeneRanking] = None
+    ) -> "CohortSummary":
+        """
+        Summarizes a MAF DataFrame.
+
+        Args:
+            maf_df: MAF records.
+            ranking: Gene ranking index of the records. Built from them when omitted.
+        """
+        if ranking is None:
+            ranking = GeneRanking.from_maf(maf_df)
+        return cls(
+            sample_mutations=maf_df[SAMPLE_COLUMN].value_counts(),
+            gene_samples=ranking.ranking(),
+            n_mutations=len(maf_df),
+            variant_classifications=_counts(maf_df, CLASSIFICATION_COLUMN),
+            variant_types=_counts(maf_df, VARIANT_TYPE_COLUMN),
+            snv_classes=snv_class_counts(maf_df),
+        )
+
+    @classmethod
+    def from_stats(cls, stats: CohortStats, ranking: GeneRanking) -> "CohortSummary":
+        """
+        Summarizes statistics accumulated from MAF chunks, with the gene
+        ranking index of the same records.
+        """
+        return cls(
+            sample_mutations=pd.Series(stats.sample_mutations, dtype=np.int64),
+            gene_samples=ranking.ranking(),
+            n_mutations=stats.n_rows,
+            variant_classifications=stats.classification_counts,
+            variant_types=stats.variant_type_counts,
+            snv_classes=stats.snv_counts,
+        )
+
+    @property
+    def n_samples(self) -> int:
+        return int((self.sample_mutations > 0).sum())
+
+    @property
+    def n_genes(self) -> int:
+        return len(self.gene_samples)
+
+    def mutation_burden(self, capture_size_mb: Optional[float] = None) -> Dict[str, float]:
+        """
+        Returns the distribution (min, quartiles, max, mean) of mutations per
+        sample, or of mutations per megabase when the capture size is given.
+        """
+        burden = self.sample_mutations[self.sample_mutations > 0].to_numpy(dtype=float)
+        if capture_size_mb:
+            burden = burden / capture_size_mb
+        return _distribution(burden)
+
+    def top_genes(self, n: int) -> List[str]:
+        """
+        Returns the ``n`` genes mutated in the most samples.
+        """
+        return self.gene_samples.index[:n].tolist()
+
+    def gene_frequencies(self, n: Optional[int] = None) -> Dict[str, float]:
+        """
+        Returns the fraction of samples mutated in each gene, most frequent first.
+        """
+        counts = self.gene_samples if n is None else self.gene_samples.iloc[:n]
+        n_samples = max(self.n_samples, 1)
+        return {gene: round(count / n_samples, 4) for gene, count in counts.items()}
+
+    def to_dict(
+        self, top_n: int = DEFAULT_TOP_N, capture_size_mb: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Returns the summary as JSON-serializable data.
+
+        Args:
+            top_n: Number of top genes to include.
+            capture_size_mb: Capture size, to report the burden as mutations/Mb.
+        """
+        return {
+            "n_samples": self.n_samples,
+            "n_genes": self.n_genes,
+            "n_mutations": int(self.n_mutations),
+            "mutation_burden": {
+                "unit": "mutations/Mb" if capture_size_mb else "mutations",
+                **self.mutation_burden(capture_size_mb),
+            },
+            "variant_classifications": self.variant_classifications,
+            "variant_types": self.variant_types,
+            "snv_classes": self.snv_classes,
+            "top_genes": [
+                {
+                    "gene": gene,
+                    "mutated_samples": int(count),
+                    "frequency": round(count / max(self.n_samples, 1), 4),
+                }
+                for gene, count in self.gene_samples.iloc[:top_n].items()
+            ],
+        }
+
+    def to_json(self, top_n: int = DEFAULT_TOP_N, capture_size_mb: Optional[float] = None) -> str:
+        return json.dumps(self.to_dict(top_n, capture_size_mb))
+
+    def to_text(self, top_n: int = DEFAULT_TOP_N, capture_size_mb: Optional[float] = None) -> str:
+        """
+        Formats the summary as text. The first lines keep the format of the
+        original MAF summary.
+        """
+        lines = [
+            "MAF Summary:",
+            f"  Number of Samples: {self.n_samples}",
+            f"  Number of Genes: {self.n_genes}",
+            f"  Variant Classifications: {self.variant_classifications}",
+            f"  Number of Mutations: {self.n_mutations}",
+        ]
+        burden = self.mutation_burden(capture_size_mb)
+        if burden:
+            unit = "mutations/Mb" if capture_size_mb else "mutations"
+            lines.append(
+                f"  Mutation Burden ({unit} per sample): median {burden['median']:g}, "
+                f"mean {burden['mean']:.2f}, IQR {burden['q1']:g}-{burden['q3']:g}, "
+                f"range {burden['min']:g}-{burden['max']:g}"
+            )
+        if self.variant_types:
+            lines.append(f"  Variant Types: {self.variant_types}")
+        if self.snv_classes:
+            lines.append(f"  SNV Classes: {self.snv_classes}")
+        top = ", ".join(
+            f"{gene} ({frequency:.1%})"
+            for gene, frequency in self.gene_frequencies(top_n).items()
+        )
+        lines.append(f"  Top {top_n} Mutated Genes (by samples): {top}")
+        return "\n".join(lines)
+
+
+def summary_columns(maf_file_path: str) -> List[str]:
+    """
+    Returns the columns a summary of the file reads: the required ones plus
+    whichever optional ones the file has.
+    """
+    header, _ = read_maf_header(maf_file_path)
+    return REQUIRED_COLUMNS + [column for column in OPTIONAL_COLUMNS if column in header]
+
+
+_summaries: "OrderedDict[tuple, CohortSummary]" = OrderedDict()
+_summaries_lock = threading.Lock()
+_MAX_SUMMARIES = 16
+
+
+def summarize_cohort(maf_file_path: str, chunksize: Optional[int] = None) -> CohortSummary:
+    """
+    Summarizes a MAF file in one pass over its records.
+
+    The records come from the shared MAF cache, or are streamed in chunks of
+    ``chunksize`` rows. Genes are counted by the shared gene ranking index,
+    which a streamed summary builds in the same pass when it is not cached.
+    Summaries are memoized per file version, so other tools can reuse them
+    (e.g. the top genes) without recomputing.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        chunksize: If set, stream the file in chunks of this many rows.
+
+    Returns:
+        The cohort summary.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        KeyError: If a required column is missing.
+    """
+    key = file_key(maf_file_path)
+    with _summaries_lock:
+        if key in _summaries:
+            _summaries.move_to_end(key)
+            return _summaries[key]
+
+    columns = summary_columns(maf_file_path)
+    if chunksize:
+        ranking = cached_gene_ranking(maf_file_path)
+        ranked_columns = ranking_columns(maf_file_path)
+        stats = CohortStats()
+
+        def counted_chunks():
+            for chunk in read_maf_chunks(maf_file_path, columns, chunksize):
+                stats.update(chunk)
+                yield chunk[ranked_columns]
+
+        if ranking is None:
+            ranking = cache_gene_ranking(maf_file_path, GeneRanking.from_chunks(counted_chunks()))
+        else:
+            for _ in counted_chunks():
+                pass
+        summary = CohortSummary.from_stats(stats, ranking)
+    else:
+        summary = CohortSummary.from_maf(
+            load_maf(maf_file_path, columns=columns), gene_ranking(maf_file_path)
+        )
+
+    with _summaries_lock:
+        _summaries[key] = summary
+        while len(_summaries) > _MAX_SUMMARIES:
+            _summaries.popitem(last=False)
+    return summary
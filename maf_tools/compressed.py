@@ -0,0 +1,330 @@
+import gzip
+import io
+import os
+import queue
+import struct
+import threading
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, List, Optional, Tuple
+
+# Compressed MAF input. BGZF files (bgzip) are a series of independent gzip
+# blocks of at most 64 KiB, so batches of blocks are inflated on a thread pool
+# (zlib releases the GIL) while the parser consumes the output in order.
+# Plain gzip files cannot be split; they are inflated on one background
+# thread, which still overlaps decompression with parsing.
+
+# Threads inflating BGZF blocks. Defaults to the number of CPUs.
+DEFAULT_THREADS = int(os.environ.get("MAF_AI_DECOMPRESS_THREADS", 0)) or os.cpu_count() or 1
+
+# BGZF blocks inflated per task; 64 blocks are up to 4 MiB of output.
+BLOCKS_PER_TASK = 64
+# Compressed bytes read from the file at a time.
+_READ_SIZE = 4 * 1024 * 1024
+# Largest BGZF block, compressed bytes read at a time without readahead.
+_BGZF_MAX_BLOCK = 64 * 1024
+# Size of the buffer between the decompressor and the parser.
+_BUFFER_SIZE = 1024 * 1024
+
+_GZIP_MAGIC = b"\x1f\x8b\x08"
+_BGZF_MAGIC = b"\x1f\x8b\x08\x04"
+# Largest uncompressed payload bgzip puts in one block.
+_BGZF_BLOCK_DATA = 0xFF00
+# Empty block bgzip writes at the end of a file.
+BGZF_EOF = bytes.fromhex("1f8b08040000000000ff0600424302001b0003000000000000000000")
+
+
+def _bgzf_block_size(data: bytes, pos: int) -> Optional[int]:
+    """
+    Returns the total size of the BGZF block at ``pos`` (from its BC extra
+    subfield), or None if the gzip header there has no BC subfield.
+    """
+    (xlen,) = struct.unpack_from("<H", data, pos + 10)
+    extra, end = pos + 12, pos + 12 + xlen
+    while extra + 4 <= end:
+        (slen,) = struct.unpack_from("<H", data, extra + 2)
+        if data[extra : extra + 2] == b"BC" and slen == 2:
+            return struct.unpack_from("<H", data, extra + 4)[0] + 1
+        extra += 4 + slen
+    return None
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Returns "bgzf", "gzip" or None (uncompressed), from the first bytes of the file.
+    """
+    with open(path, "rb") as f:
+        head = f.read(64)
+    if not head.startswith(_GZIP_MAGIC):
+        return None
+    if head.startswith(_BGZF_MAGIC) and len(head) >= 18 and _bgzf_block_size(head, 0):
+        return "bgzf"
+    return "gzip"
+
+
+def _split_blocks(data: bytes) -> Tuple[List[Tuple[bytes, int, int]], int]:
+    """
+    Splits complete BGZF blocks off the start of ``data``.
+
+    Returns:
+        (deflate data, CRC32, uncompressed size) per block, and the number of
+        bytes consumed.
+
+    Raises:
+        OSError: If the data is not BGZF.
+    """
+    blocks = []
+    pos = 0
+    while pos + 18 <= len(data):
+        if data[pos : pos + 4] != _BGZF_MAGIC:
+            raise OSError("Not a BGZF block; the file is corrupt or not bgzip-compressed")
+        size = _bgzf_block_size(data, pos)
+        if size is None:
+            raise OSError("BGZF block without a BC size field")
+        if pos + size > len(data):
+            break
+        (xlen,) = struct.unpack_from("<H", data, pos + 10)
+        crc, isize = struct.unpack_from("<II", data, pos + size - 8)
+        blocks.append((data[pos + 12 + xlen : pos + size - 8], crc, isize))
+        pos += size
+    return blocks, pos
+
+
+def _inflate_blocks(blocks: List[Tuple[bytes, int, int]]) -> bytes:
+    output = []
+    for deflated, crc, isize in blocks:
+        try:
+            data = zlib.decompress(deflated, -15)
+        except zlib.error as e:
+            raise OSError(f"Corrupt BGZF block: {e}") from e
+        if len(data) != isize or zlib.crc32(data) != crc:
+            raise OSError("BGZF block failed its CRC check; the file is corrupt")
+        output.append(data)
+    return b"".join(output)
+
+
+class BGZFReader(io.RawIOBase):
+    """
+    Reads the decompressed stream of a BGZF file, inflating blocks on a thread pool.
+
+    Up to ``2 * threads`` tasks of ``BLOCKS_PER_TASK`` blocks are in flight
+    ahead of the reader, so memory stays bounded whatever the file size.
+    Without readahead, blocks are inflated one at a time as they are read,
+    so reading the first lines only inflates the first block.
+    """
+
+    def __init__(self, path: str, threads: Optional[int] = None, readahead: bool = True):
+        super().__init__()
+        self.threads = max(1, threads or DEFAULT_THREADS)
+        self._raw = open(path, "rb")
+        self._pool = ThreadPoolExecutor(max_workers=self.threads) if readahead else None
+        self._tasks = 2 * self.threads if readahead else 1
+        self._task_blocks = BLOCKS_PER_TASK if readahead else 1
+        self._read_size = _READ_SIZE if readahead else _BGZF_MAX_BLOCK
+        self._pending: deque = deque()
+        self._compressed = b""
+        self._blocks: List[Tuple[bytes, int, int]] = []
+        self._raw_eof = False
+        self._output = memoryview(b"")
+
+    def _submit(self) -> None:
+        # Keep the pool busy: read and split compressed data until enough
+        # tasks are queued or the file is exhausted.
+        while len(self._pending) < self._tasks:
+            while len(self._blocks) < self._task_blocks and not self._raw_eof:
+                data = self._raw.read(self._read_size)
+                if not data:
+                    self._raw_eof = True
+                    if self._compressed:
+                        raise OSError("Truncated BGZF file")
+                    break
+                data = self._compressed + data
+                blocks, consumed = _split_blocks(data)
+                self._compressed = data[consumed:]
+                self._blocks.extend(blocks)
+            if not self._blocks:
+                return
+            task = self._blocks[: self._task_blocks]
+            self._blocks = self._blocks[self._task_blocks :]
+            if self._pool is None:
+                self._pending.append(_inflate_blocks(task))
+            else:
+                self._pending.append(self._pool.submit(_inflate_blocks, task))
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not len(self._output):
+            self._submit()
+            if not self._pending:
+                return 0
+            output = self._pending.popleft()
+            self._output = memoryview(output if self._pool is None else output.result())
+        n = min(len(buffer), len(self._output))
+        buffer[:n] = self._output[:n]
+        self._output = self._output[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+            self._raw.close()
+        super().close()
+
+
+class GzipReader(io.RawIOBase):
+    """
+    Reads the decompressed stream of a gzip file, inflating it on a background
+    thread. Concatenated gzip members are read in sequence.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self._raw = open(path, "rb")
+        self._chunks: "queue.Queue" = queue.Queue(maxsize=8)
+        self._stop = threading.Event()
+        self._output = memoryview(b"")
+        self._done = False
+        self._thread = threading.Thread(target=self._inflate, daemon=True)
+        self._thread.start()
+
+    def _inflate(self) -> None:
+        try:
+            decompressor = None
+            while not self._stop.is_set():
+                data = self._raw.read(_READ_SIZE)
+                if not data:
+                    break
+                while data:
+                    if decompressor is None:
+                        decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+                    try:
+                        self._put(decompressor.decompress(data))
+                    except zlib.error as e:
+                        raise OSError(f"Corrupt gzip file: {e}") from e
+                    if not decompressor.eof:
+                        break
+                    # The rest of the data starts the next gzip member
+                    data, decompressor = decompressor.unused_data, None
+            if self._stop.is_set():
+                return
+            if decompressor is not None:
+                raise OSError("Truncated gzip file")
+            self._put(None)
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item) -> None:
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not len(self._output):
+            if self._done:
+                return 0
+            item = self._chunks.get()
+            if item is None:
+                self._done = True
+                return 0
+            if isinstance(item, Exception):
+                self._done = True
+                raise item
+            self._output = memoryview(item)
+        n = min(len(buffer), len(self._output))
+        buffer[:n] = self._output[:n]
+        self._output = self._output[n:]
+        return n
+
+    def close(self) -> None:
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            self._raw.close()
+        super().close()
+
+
+def open_maf(path: str, threads: Optional[int] = None, readahead: bool = True) -> BinaryIO:
+    """
+    Opens a MAF file for binary reading, decompressing gzip and BGZF files on the fly.
+
+    Args:
+        path: Path to the MAF file.
+        threads: Threads inflating BGZF blocks. Defaults to DEFAULT_THREADS.
+        readahead: Decompress ahead of the reader on other threads. Turn it
+            off when only the first lines are read (e.g. the header), so
+            the rest of the file is not inflated.
+
+    Returns:
+        A buffered binary stream of the uncompressed MAF text.
+    """
+    compression = detect_compression(path)
+    if compression == "bgzf":
+        if not readahead:
+            return io.BufferedReader(BGZFReader(path, threads, readahead=False))
+        return io.BufferedReader(BGZFReader(path, threads), buffer_size=_BUFFER_SIZE)
+    if compression == "gzip":
+        if not readahead:
+            return gzip.open(path, "rb")
+        return io.BufferedReader(GzipReader(path), buffer_size=_BUFFER_SIZE)
+    return open(path, "rb")
+
+
+def _bgzf_block(data: bytes, level: int) -> bytes:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    deflated = compressor.compress(data) + compressor.flush()
+    header = _BGZF_MAGIC + struct.pack(
+        "<IBBHBBHH", 0, 0, 0xFF, 6, ord("B"), ord("C"), 2, len(deflated) + 25
+    )
+    return header + deflated + struct.pack("<II", zlib.crc32(data), len(data))
+
+
+class BGZFWriter(io.RawIOBase):
+    """
+    Writes BGZF, the format written by bgzip, to a binary file object one
+    block at a time, so at most one block of data is held in memory. The
+    end-of-file block is written on close; the file object is not closed.
+    """
+
+    def __init__(self, raw: BinaryIO, level: int = 6):
+        super().__init__()
+        self._raw = raw
+        self.level = level
+        self._buffer = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        while len(self._buffer) >= _BGZF_BLOCK_DATA:
+            self._raw.write(_bgzf_block(bytes(self._buffer[:_BGZF_BLOCK_DATA]), self.level))
+            del self._buffer[:_BGZF_BLOCK_DATA]
+        return len(data)
+
+    def close(self) -> None:
+        if not self.closed:
+            if self._buffer:
+                self._raw.write(_bgzf_block(bytes(self._buffer), self.level))
+                self._buffer.clear()
+            self._raw.write(BGZF_EOF)
+        super().close()
+
+
+def bgzf_compress(data: bytes, level: int = 6) -> bytes:
+    """
+    Compresses data as BGZF, the format written by bgzip, including the end-of-file block.
+    """
+    output = io.BytesIO()
+    with BGZFWriter(output, level) as writer:
+        writer.write(data)
+    return output.getvalue()
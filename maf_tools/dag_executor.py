@@ -0,0 +1,119 @@
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class TaskFailedError(RuntimeError):
+    """
+    Recorded for tasks that did not run because a dependency failed.
+    """
+
+
+class TaskGraph:
+    """
+    Dependency graph of named tasks, executed on a thread pool.
+
+    Each task is a callable taking the results of its dependencies as keyword
+    arguments (by dependency name). A task starts as soon as all of its
+    dependencies have finished, so independent tasks run at the same time and
+    the wall-clock time of a run is that of the longest dependency chain.
+    """
+
+    def __init__(self):
+        self.tasks: Dict[str, Callable[..., Any]] = {}
+        self.dependencies: Dict[str, List[str]] = {}
+
+    def add(
+        self, name: str, func: Callable[..., Any], depends_on: Iterable[str] = ()
+    ) -> None:
+        """
+        Adds a task. Dependencies may be added later, but must exist before ``run``.
+        """
+        if name in self.tasks:
+            raise ValueError(f"Duplicate task: {name}")
+        self.tasks[name] = func
+        self.dependencies[name] = list(depends_on)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.tasks
+
+    def order(self) -> List[str]:
+        """
+        Returns the task names in a dependency-respecting order.
+
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle.
+        """
+        for name, dependencies in self.dependencies.items():
+            for dependency in dependencies:
+                if dependency not in self.tasks:
+                    raise ValueError(f"Task {name} depends on unknown task {dependency}")
+        remaining = {name: set(deps) for name, deps in self.dependencies.items()}
+        order = []
+        while remaining:
+            ready = [name for name, deps in remaining.items() if not deps]
+            if not ready:
+                raise ValueError(f"Cycle between tasks: {', '.join(sorted(remaining))}")
+            for name in ready:
+                del remaining[name]
+                order.append(name)
+            for deps in remaining.values():
+                deps.difference_update(ready)
+        return order
+
+    def run(self, max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Executes all tasks, running independent ones concurrently.
+
+        Args:
+            max_workers: Size of the thread pool. Defaults to the number of tasks.
+
+        Returns:
+            The result of every task by name. A task that raised has the
+            exception as its result; tasks depending on it are not run and
+            get a TaskFailedError.
+        """
+        order = self.order()
+        results: Dict[str, Any] = {}
+        failed = set()
+        waiting = {name: set(self.dependencies[name]) for name in order}
+        if not order:
+            return results
+
+        with ThreadPoolExecutor(max_workers=max_workers or len(order)) as pool:
+            running = {}
+
+            def submit_ready():
+                for name in [name for name in order if name in waiting]:
+                    if waiting[name]:
+                        continue
+                    del waiting[name]
+                    failed_dependencies = [
+                        dep for dep in self.dependencies[name] if dep in failed
+                    ]
+                    if failed_dependencies:
+                        failed.add(name)
+                        results[name] = TaskFailedError(
+                            f"Skipped because {', '.join(failed_dependencies)} failed"
+                        )
+                        finish(name)
+                        continue
+                    kwargs = {dep: results[dep] for dep in self.dependencies[name]}
+                    running[pool.submit(self.tasks[name], **kwargs)] = name
+
+            def finish(name):
+                for deps in waiting.values():
+                    deps.discard(name)
+
+            submit_ready()
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        failed.add(name)
+                        results[name] = e
+                    finish(name)
+                submit_ready()
+        return {name: results[name] for name in order}
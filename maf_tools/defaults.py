@@ -0,0 +1,14 @@
+# Analysis parameters used unless overridden. Kept in a module without
+# dependencies, so the CLI can build its options without importing pandas,
+# SciPy or CrewAI.
+
+# Somatic interactions: number of top mutated genes and adjusted p-value cutoff.
+DEFAULT_TOP_N = 25
+DEFAULT_PVALUE_CUTOFF = 0.05
+
+# Drug-gene interactions: genes looked up in DGIdb and interactions per gene.
+DEFAULT_NUM_GENES = 5
+DEFAULT_NUM_INTERACTIONS = 10
+
+# Permutations for the permutation test of somatic interactions.
+DEFAULT_PERMUTATIONS = 10_000
@@ -0,0 +1,300 @@
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Sequence
+
+from maf_tools.persistent_cache import PersistentCache, default_cache_path
+
+if TYPE_CHECKING:
+    import requests
+
+DGIDB_GRAPHQL_URL = os.environ.get("DGIDB_GRAPHQL_URL", "https://dgidb.org/api/graphql")
+
+# Defaults, overridable through the environment for batch jobs.
+DEFAULT_BATCH_SIZE = int(os.environ.get("DGIDB_BATCH_SIZE", 25))
+DEFAULT_MAX_WORKERS = int(os.environ.get("DGIDB_MAX_WORKERS", 4))
+DEFAULT_TIMEOUT = float(os.environ.get("DGIDB_TIMEOUT", 30))
+DEFAULT_MAX_RETRIES = int(os.environ.get("DGIDB_MAX_RETRIES", 3))
+
+# Local cache of DGIdb results. DGIDB_CACHE=0 disables it; DGIDB_OFFLINE=1
+# answers from the cache only, without any network access.
+DGIDB_CACHE_ENABLED = os.environ.get("DGIDB_CACHE", "1") != "0"
+DGIDB_CACHE_PATH = os.environ.get("DGIDB_CACHE_PATH", default_cache_path("dgidb"))
+DGIDB_CACHE_TTL = float(os.environ.get("DGIDB_CACHE_TTL", 7 * 24 * 3600))
+DGIDB_CACHE_MAX_ENTRIES = int(os.environ.get("DGIDB_CACHE_MAX_ENTRIES", 50_000))
+DGIDB_OFFLINE = os.environ.get("DGIDB_OFFLINE", "0") == "1"
+# Local index built with `main.py build-dgidb-snapshot`; replaces the API when set.
+DGIDB_SNAPSHOT = os.environ.get("DGIDB_SNAPSHOT")
+
+_INTERACTION_FIELDS = """
+        drug {
+          name
+          conceptId
+        }
+        interactionScore
+        interactionTypes {
+          type
+          directionality
+        }
+        interactionAttributes {
+          name
+          value
+        }
+        publications {
+          pmid
+        }
+        sources {
+          sourceDbName
+        }
+"""
+
+
+class DGIdbError(RuntimeError):
+    """
+    Raised when a DGIdb request fails after all retries.
+    """
+
+
+class DGIdbLookup(NamedTuple):
+    """
+    Result of looking up many genes.
+
+    ``interactions`` maps each gene found in DGIdb to its interactions and
+    ``errors`` maps genes that could not be looked up to the error message.
+    """
+
+    interactions: Dict[str, List[dict]]
+    errors: Dict[str, str]
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+
+def cache_key(gene: str, num_interactions: int) -> str:
+    return f"{gene.upper()}:{num_interactions}"
+
+
+def build_query(genes: Sequence[str], num_interactions: int) -> str:
+    """
+    Builds a GraphQL query fetching the top interactions of several genes at once.
+    """
+    # JSON string literals are valid GraphQL string literals.
+    names = ", ".join(json.dumps(gene) for gene in genes)
+    return """
+    {
+      genes(names: [%s]) {
+        nodes {
+          name
+          interactions(first: %d) {%s      }
+        }
+      }
+    }
+    """ % (names, num_interactions, _INTERACTION_FIELDS)
+
+
+def _make_session(max_workers: int, max_retries: int, backoff_factor: float):
+    # Imported here so offline lookups (snapshots, DGIdbLookup) skip requests.
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"POST"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=max_workers, pool_maxsize=max_workers, max_retries=retry
+    )
+    session = requests.Session()
+    session.headers.update({"Content-Type": "application/json"})
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+class DGIdbClient:
+    """
+    Batched, concurrent client for the DGIdb GraphQL API.
+
+    Genes are grouped into batches of ``batch_size`` names per query and up to
+    ``max_workers`` batches are in flight at once over a pooled HTTP session.
+    Failed requests (connection errors, 429 and 5xx responses) are retried with
+    exponential backoff. With a ``cache``, genes already looked up with the
+    same ``num_interactions`` are answered locally, and ``cache_only`` turns
+    off network access entirely.
+    """
+
+    def __init__(
+        self,
+        url: str = DGIDB_GRAPHQL_URL,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        timeout: float = DEFAULT_TIMEOUT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_factor: float = 0.5,
+        session: Optional["requests.Session"] = None,
+        cache: Optional[PersistentCache] = None,
+        cache_only: bool = False,
+    ):
+        self.url = url
+        self.cache = cache
+        self.cache_only = cache_only
+        self.batch_size = max(1, batch_size)
+        self.max_workers = max(1, max_workers)
+        self.timeout = timeout
+        self.session = session or _make_session(
+            self.max_workers, max_retries, backoff_factor
+        )
+
+    def fetch_batch(
+        self, genes: Sequence[str], num_interactions: int
+    ) -> Dict[str, List[dict]]:
+        """
+        Fetches the interactions of one batch of genes with a single query.
+
+        Returns:
+            Interactions keyed by the upper-cased gene symbol returned by DGIdb.
+            DGIdb answers an alias with its canonical symbol, so a single
+            gene is keyed by the queried symbol whatever name comes back.
+            Genes unknown to DGIdb are absent.
+
+        Raises:
+            DGIdbError: If the request fails or the response is malformed.
+        """
+        import requests
+
+        try:
+            response = self.session.post(
+                self.url,
+                json={"query": build_query(genes, num_interactions)},
+                timeout=self.timeout,
+            )
+        except requests.RequestException as e:
+            raise DGIdbError(f"Error retrieving data from DGIdb: {e}") from e
+        if response.status_code != 200:
+            raise DGIdbError(
+                f"Error retrieving data from DGIdb. HTTP Status Code: {response.status_code}"
+            )
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise DGIdbError(f"Invalid JSON in DGIdb response: {e}") from e
+        try:
+            nodes = (data.get("data") or {})["genes"]["nodes"]
+        except (KeyError, TypeError) as e:
+            raise DGIdbError(f"Unexpected DGIdb response: {data.get('errors', data)}") from e
+        if len(genes) == 1 and nodes:
+            return {genes[0].upper(): nodes[0].get("interactions") or []}
+        return {
+            str(node.get("name", "")).upper(): node.get("interactions") or []
+            for node in nodes
+        }
+
+    def fetch_interactions(
+        self,
+        genes: Sequence[str],
+        num_interactions: int,
+        cache_only: Optional[bool] = None,
+    ) -> DGIdbLookup:
+        """
+        Fetches the top interactions of many genes, batching and parallelizing requests.
+
+        Args:
+            genes: Gene symbols to look up.
+            num_interactions: Number of top interactions to retrieve per gene.
+            cache_only: Overrides the client's ``cache_only`` setting.
+
+        Returns:
+            The interactions found, per-gene errors and cache hit/miss counts.
+        """
+        cache_only = self.cache_only if cache_only is None else cache_only
+        interactions: Dict[str, List[dict]] = {}
+        errors: Dict[str, str] = {}
+        cache_hits = 0
+        pending = []
+        for gene in dict.fromkeys(genes):
+            cached = (
+                self.cache.get(cache_key(gene, num_interactions))
+                if self.cache is not None
+                else None
+            )
+            if cached is None:
+                pending.append(gene)
+                continue
+            cache_hits += 1
+            if cached:
+                interactions[gene] = cached
+
+        if cache_only:
+            for gene in pending:
+                errors[gene] = "Not in the local DGIdb cache (offline mode)."
+            return DGIdbLookup(interactions, errors, cache_hits, len(pending))
+
+        batches = [
+            pending[i : i + self.batch_size]
+            for i in range(0, len(pending), self.batch_size)
+        ]
+        if not batches:
+            return DGIdbLookup(interactions, errors, cache_hits, 0)
+
+        def run(batch):
+            try:
+                found = self.fetch_batch(batch, num_interactions)
+                if len(batch) > 1:
+                    # Aliases and non-canonical symbols come back under another
+                    # name; look the genes missing from the batch up one by one.
+                    for gene in batch:
+                        if gene.upper() not in found:
+                            found.update(self.fetch_batch([gene], num_interactions))
+                return batch, found, None
+            except DGIdbError as e:
+                return batch, None, str(e)
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(batches))) as pool:
+            for batch, found, error in pool.map(run, batches):
+                for gene in batch:
+                    if error is not None:
+                        errors[gene] = error
+                        continue
+                    gene_interactions = found.get(gene.upper(), [])
+                    if gene_interactions:
+                        interactions[gene] = gene_interactions
+                    if self.cache is not None:
+                        # Genes without interactions are cached too.
+                        self.cache.set(
+                            cache_key(gene, num_interactions), gene_interactions
+                        )
+        return DGIdbLookup(interactions, errors, cache_hits, len(pending))
+
+
+_default_client: Optional[DGIdbClient] = None
+_default_client_lock = threading.Lock()
+
+
+def get_dgidb_client():
+    """
+    Returns the process-wide DGIdb backend, so every tool call reuses one
+    connection pool. When DGIDB_SNAPSHOT points to a local snapshot, that
+    snapshot is used instead of the API.
+    """
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None and DGIDB_SNAPSHOT:
+            from maf_tools.dgidb_snapshot import DGIdbSnapshot
+
+            _default_client = DGIdbSnapshot.load(DGIDB_SNAPSHOT)
+        if _default_client is None:
+            cache = (
+                PersistentCache(
+                    DGIDB_CACHE_PATH,
+                    ttl=DGIDB_CACHE_TTL,
+                    max_entries=DGIDB_CACHE_MAX_ENTRIES,
+                )
+                if DGIDB_CACHE_ENABLED
+                else None
+            )
+            _default_client = DGIdbClient(cache=cache, cache_only=DGIDB_OFFLINE)
+        return _default_client
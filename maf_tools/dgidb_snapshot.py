@@ -0,0 +1,183 @@
+import json
+import math
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import pandas as pd
+
+from maf_tools.dgidb_client import DGIdbLookup
+
+_FORMAT_VERSION = 1
+
+
+def _is_null(value) -> bool:
+    return value is None or (isinstance(value, float) and math.isnan(value))
+
+
+def _read_tsv(path: str) -> pd.DataFrame:
+    # DGIdb exports write missing values as the string "NULL".
+    return pd.read_csv(
+        path, sep="\t", dtype=str, na_values=["NULL", ""], keep_default_na=False
+    )
+
+
+def _parse_bool(value) -> Optional[bool]:
+    if _is_null(value):
+        return None
+    return str(value).strip().lower() == "true"
+
+
+class DGIdbSnapshot:
+    """
+    Local, network-free index of a DGIdb bulk export.
+
+    Interactions are grouped by gene symbol (one entry per gene and drug, with
+    the types and sources of all matching claims merged) and stored sorted by
+    descending interactionScore, so a lookup is one dict access and the top-k
+    interactions are a slice. Interactions use the same shape as the GraphQL
+    API, so callers can use either backend.
+    """
+
+    cache = None  # Lookups are local; there is no result cache to report.
+
+    def __init__(self, genes: Dict[str, List[dict]], aliases: Optional[Dict[str, str]] = None):
+        self.genes = genes
+        self.aliases = aliases or {}
+
+    @classmethod
+    def build(
+        cls,
+        interactions_path: str,
+        drugs_path: Optional[str] = None,
+        genes_path: Optional[str] = None,
+    ) -> "DGIdbSnapshot":
+        """
+        Builds the index from DGIdb TSV exports.
+
+        Args:
+            interactions_path: Path to interactions.tsv.
+            drugs_path: Optional path to drugs.tsv, used for approval status.
+            genes_path: Optional path to genes.tsv, used to resolve gene aliases.
+
+        Returns:
+            The snapshot.
+        """
+        interactions_df = _read_tsv(interactions_path)
+        interactions_df = interactions_df.dropna(subset=["gene_name", "drug_name"])
+        interactions_df["score"] = pd.to_numeric(
+            interactions_df["interaction_score"], errors="coerce"
+        )
+
+        approved: Dict[str, Optional[bool]] = {}
+        if drugs_path:
+            drugs_df = _read_tsv(drugs_path).dropna(subset=["drug_concept_id"])
+            for concept_id, value in zip(drugs_df["drug_concept_id"], drugs_df["approved"]):
+                approved.setdefault(concept_id, _parse_bool(value))
+
+        genes: Dict[str, List[dict]] = {}
+        for (gene, drug), group in interactions_df.groupby(
+            [interactions_df["gene_name"].str.upper(), "drug_name"], sort=False
+        ):
+            concept_id = group["drug_concept_id"].dropna()
+            concept_id = concept_id.iloc[0] if len(concept_id) else None
+            score = group["score"].max()
+            drug_approved = approved.get(concept_id)
+            if drug_approved is None and "approved" in group:
+                drug_approved = _parse_bool(group["approved"].iloc[0])
+            genes.setdefault(gene, []).append(
+                {
+                    "drug": {
+                        "name": drug,
+                        "conceptId": concept_id,
+                        "approved": drug_approved,
+                    },
+                    "interactionScore": None if _is_null(score) else float(score),
+                    "interactionTypes": [
+                        {"type": interaction_type, "directionality": None}
+                        for interaction_type in sorted(
+                            set(group["interaction_type"].dropna())
+                        )
+                    ],
+                    "sources": [
+                        {"sourceDbName": source}
+                        for source in sorted(
+                            set(group["interaction_source_db_name"].dropna())
+                        )
+                    ],
+                }
+            )
+
+        for gene_interactions in genes.values():
+            gene_interactions.sort(
+                key=lambda i: (
+                    i["interactionScore"] is None,
+                    -(i["interactionScore"] or 0.0),
+                    i["drug"]["name"],
+                )
+            )
+
+        aliases: Dict[str, str] = {}
+        if genes_path:
+            genes_df = _read_tsv(genes_path).dropna(subset=["gene_claim_name", "gene_name"])
+            for claim, name in zip(genes_df["gene_claim_name"], genes_df["gene_name"]):
+                claim, name = claim.upper(), name.upper()
+                if claim != name and claim not in genes:
+                    aliases.setdefault(claim, name)
+        return cls(genes, aliases)
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index as JSON.
+        """
+        tmp_path = f"{path}.tmp{os.getpid()}"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"version": _FORMAT_VERSION, "genes": self.genes, "aliases": self.aliases},
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "DGIdbSnapshot":
+        """
+        Loads an index written by ``save``. Repeated loads of an unchanged file
+        return the same in-memory index.
+        """
+        stat = os.stat(path)
+        return _load_snapshot(os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+
+    def lookup(self, gene: str, k: Optional[int] = None) -> List[dict]:
+        """
+        Returns the ``k`` highest-scoring interactions of a gene (all when ``k`` is None).
+        """
+        symbol = gene.upper()
+        gene_interactions = self.genes.get(symbol)
+        if gene_interactions is None:
+            gene_interactions = self.genes.get(self.aliases.get(symbol, ""), [])
+        return gene_interactions[:k]
+
+    def fetch_interactions(
+        self,
+        genes: Sequence[str],
+        num_interactions: int,
+        cache_only: Optional[bool] = None,
+    ) -> DGIdbLookup:
+        """
+        Looks up many genes; same interface as DGIdbClient.fetch_interactions.
+        """
+        interactions = {}
+        for gene in dict.fromkeys(genes):
+            gene_interactions = self.lookup(gene, num_interactions)
+            if gene_interactions:
+                interactions[gene] = gene_interactions
+        return DGIdbLookup(interactions, {})
+
+
+@lru_cache(maxsize=4)
+def _load_snapshot(path: str, mtime_ns: int, size: int) -> DGIdbSnapshot:
+    with open(path) as f:
+        data = json.load(f)
+    if data.get("version") != _FORMAT_VERSION:
+        raise ValueError(f"Unsupported DGIdb snapshot format in {path}")
+    return DGIdbSnapshot(data["genes"], data.get("aliases", {}))
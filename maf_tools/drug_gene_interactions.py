@@ -1,8 +1,11 @@
-import requests
-import pandas as pd
-from typing import Type
+import asyncio
+from typing import List, Optional, Type, Union
 from crewai.tools import BaseTool  # Ensure this is the correct BaseTool
 from pydantic import BaseModel, Field
+from maf_tools.analyses import drug_gene_interactions
+from maf_tools.dgidb_client import DGIdbClient
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+from maf_tools.tool_output import DEFAULT_MAX_ROWS
 
 
 # Define the input schema for the tool
@@ -12,6 +15,20 @@ class DrugGeneInteractionInput(BaseModel):
     num_interactions: int = Field(
         5, description="Number of top interactions to retrieve per gene."
     )
+    chunksize: Optional[int] = Field(
+        None,
+        description="Stream the MAF file in chunks of this many rows instead of loading it into memory.",
+    )
+    exclude_classifications: Optional[List[str]] = Field(
+        None, description="Variant classifications to ignore when ranking genes (e.g. ['Silent'])."
+    )
+    output_format: str = Field(
+        "json", description="'json' for a compact table of interactions, or 'text' for one line each."
+    )
+    max_rows: Optional[int] = Field(
+        DEFAULT_MAX_ROWS,
+        description="Most interactions to return in JSON output; the rest are counted as truncated.",
+    )
 
 
 class DrugGeneInteractionTool(BaseTool):
@@ -19,110 +36,70 @@ class DrugGeneInteractionTool(BaseTool):
     description: str = (
         "Identifies potential therapeutic targets based on drug-gene interaction data from DGIdb. "
         "The input should include the path to a MAF file, the number of top mutated genes to analyze, "
-        "and the number of top interactions to retrieve per gene."
+        "and the number of top interactions to retrieve per gene. Returns JSON with the "
+        "interactions as 'columns' and 'rows'."
     )
     args_schema: Type[BaseModel] = DrugGeneInteractionInput  # Specify the input schema
-
-    def _run(self, maf_file_path: str, num_genes: int, num_interactions: int) -> str:
+    # DGIdb backend: the GraphQL client or a local snapshot. Defaults to the shared backend.
+    client: Optional[Union[DGIdbClient, DGIdbSnapshot]] = None
+
+    def _run(
+        self,
+        maf_file_path: str,
+        num_genes: int,
+        num_interactions: int,
+        chunksize: Optional[int] = None,
+        exclude_classifications: Optional[List[str]] = None,
+        output_format: str = "json",
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    ) -> str:
         """
-        Identifies drug-gene interactions for the top mutated genes in a MAF file using a GraphQL query.
+        Identifies drug-gene interactions for the top mutated genes in a MAF file using batched GraphQL queries.
 
         Args:
             maf_file_path: Path to the MAF file.
             num_genes: Number of top mutated genes to analyze.
             num_interactions: Number of top interactions to retrieve per gene.
+            chunksize: If set, stream the file in chunks of this many rows.
+            exclude_classifications: Variant classifications to ignore (e.g. Silent).
+            output_format: "json" or "text".
+            max_rows: Most interactions to include in JSON output.
 
         Returns:
             A summary of drug-gene interactions for the specified genes.
         """
-        try:
-            # Read the MAF file
-            maf_df = pd.read_csv(maf_file_path, sep="\t", comment="#")
-
-            # Get the top mutated genes
-            gene_counts = maf_df["Hugo_Symbol"].value_counts().nlargest(num_genes)
-            top_genes = gene_counts.index.tolist()
-
-            interactions = []
-
-            for gene in top_genes:
-                # GraphQL query
-                query = """
-                {
-                  genes(names: ["%s"]) {
-                    nodes {
-                      interactions(first: %d) {
-                        drug {
-                          name
-                          conceptId
-                        }
-                        interactionScore
-                        interactionTypes {
-                          type
-                          directionality
-                        }
-                        interactionAttributes {
-                          name
-                          value
-                        }
-                        publications {
-                          pmid
-                        }
-                        sources {
-                          sourceDbName
-                        }
-                      }
-                    }
-                  }
-                }
-                """ % (gene, num_interactions)
-
-                # Send the GraphQL request
-                url = "https://dgidb.org/api/graphql"
-                headers = {"Content-Type": "application/json"}
-                response = requests.post(url, json={"query": query}, headers=headers)
-
-                if response.status_code == 200:
-                    data = response.json()
-
-                    # Validate API response structure
-                    if "data" in data and data["data"]["genes"]["nodes"]:
-                        for interaction in data["data"]["genes"]["nodes"][0].get(
-                            "interactions", []
-                        ):
-                            drug_name = interaction["drug"]["name"]
-                            interaction_types = [
-                                f"{t['type']} ({t['directionality']})"
-                                for t in interaction.get("interactionTypes", [])
-                            ]
-                            sources = ", ".join(
-                                source["sourceDbName"]
-                                for source in interaction.get("sources", [])
-                            )
-                            interactions.append(
-                                f"{gene}: {drug_name} - Types: {', '.join(interaction_types)} - Sources: {sources}"
-                            )
-                    else:
-                        interactions.append(f"{gene}: No interactions found.")
-                else:
-                    interactions.append(
-                        f"{gene}: Error retrieving data from DGIdb. HTTP Status Code: {response.status_code}"
-                    )
-
-            if interactions:
-                return "\n".join(interactions)
-            else:
-                return "No drug-gene interactions found for the specified genes."
-
-        except FileNotFoundError:
-            return f"Error: MAF file not found at {maf_file_path}"
-        except KeyError as e:
-            return f"Error: Required column not found in MAF file: {e}"
-        except Exception as e:
-            raise RuntimeError(f"Error during drug-gene interaction analysis: {e}")
-
-    async def _arun(self, maf_file_path: str, num_genes: int, num_interactions: int):
+        return drug_gene_interactions(
+            maf_file_path,
+            num_genes,
+            num_interactions,
+            chunksize,
+            exclude_classifications,
+            output_format,
+            max_rows,
+            client=self.client,
+        )
+
+    async def _arun(
+        self,
+        maf_file_path: str,
+        num_genes: int,
+        num_interactions: int,
+        chunksize: Optional[int] = None,
+        exclude_classifications: Optional[List[str]] = None,
+        output_format: str = "json",
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+    ) -> str:
         """
-        Asynchronous execution is not supported.
+        Runs the analysis without blocking the event loop. DGIdb requests are
+        still batched and sent concurrently by the client's thread pool.
         """
-        raise NotImplementedError("This tool does not support asynchronous execution")
+        return await asyncio.to_thread(
+            self._run,
+            maf_file_path,
+            num_genes,
+            num_interactions,
+            chunksize,
+            exclude_classifications,
+            output_format,
+            max_rows,
+        )
@@ -0,0 +1,224 @@
+from functools import lru_cache
+from typing import Tuple
+
+import numpy as np
+
+# Relative tolerance when comparing table probabilities, so that tables that
+# are equally likely in exact arithmetic are not split by rounding error.
+RELATIVE_TOLERANCE = 1e-7
+_LOG_TOLERANCE = np.log1p(RELATIVE_TOLERANCE)
+# Tables summed by pvalue_lower_bounds.
+TAIL_TERMS = 8
+
+
+@lru_cache(maxsize=8)
+def log_factorials(n: int) -> np.ndarray:
+    """
+    Returns log(k!) for k = 0..n. Cached, as every table of a cohort shares
+    the same sample total.
+    """
+    # SciPy is imported on first use, so modules that only import this one start fast.
+    from scipy.special import gammaln
+
+    table = gammaln(np.arange(n + 1, dtype=np.float64) + 1)
+    table.setflags(write=False)
+    return table
+
+
+def _log_pmf(x, r1, r2, c1, n, lf):
+    """
+    Hypergeometric log-probability of n11 = x given the table margins.
+    """
+    return (
+        lf[r1] - lf[x] - lf[r1 - x]
+        + lf[r2] - lf[c1 - x] - lf[r2 - c1 + x]
+        - lf[n] + lf[c1] + lf[n - c1]
+    )
+
+
+def _search_right(lo, hi, threshold, r1, r2, c1, n, lf):
+    """
+    Smallest y in [lo, hi] with log_pmf(y) <= threshold, where log_pmf is
+    decreasing on [lo, hi] and log_pmf(hi) <= threshold.
+    """
+    lo, hi = lo.copy(), hi.copy()
+    active = lo < hi
+    while active.any():
+        mid = (lo + hi) // 2
+        below = _log_pmf(mid, r1, r2, c1, n, lf) <= threshold
+        hi = np.where(active & below, mid, hi)
+        lo = np.where(active & ~below, mid + 1, lo)
+        active = lo < hi
+    return lo
+
+
+def _search_left(lo, hi, threshold, r1, r2, c1, n, lf):
+    """
+    Largest y in [lo, hi] with log_pmf(y) <= threshold, where log_pmf is
+    increasing on [lo, hi] and log_pmf(lo) <= threshold.
+    """
+    lo, hi = lo.copy(), hi.copy()
+    active = lo < hi
+    while active.any():
+        mid = (lo + hi + 1) // 2
+        below = _log_pmf(mid, r1, r2, c1, n, lf) <= threshold
+        lo = np.where(active & below, mid, lo)
+        hi = np.where(active & ~below, mid - 1, hi)
+        active = lo < hi
+    return lo
+
+
+def _two_sided_pvalues(a, b, c, d) -> np.ndarray:
+    """
+    Two-sided p-values of tables [[a, b], [c, d]] with non-zero margins.
+
+    Follows scipy.stats.fisher_exact: the p-value is the total probability of
+    the tables at least as unlikely as the observed one. The distribution is
+    unimodal, so those tables form two tails; the tail on the far side of the
+    mode is located with a vectorized binary search.
+    """
+    from scipy.stats import hypergeom
+
+    r1, r2, c1 = a + b, c + d, a + c
+    n = r1 + r2
+    lf = log_factorials(int(n.max()))
+
+    support_lo = np.maximum(0, c1 - r2)
+    support_hi = np.minimum(r1, c1)
+    mode = np.clip((c1 + 1) * (r1 + 1) // (n + 2), support_lo, support_hi)
+
+    log_p_obs = _log_pmf(a, r1, r2, c1, n, lf)
+    threshold = log_p_obs + _LOG_TOLERANCE
+    pvalues = np.ones(len(a))
+
+    # Observed table left of the mode: add the matching right tail.
+    left = (a < mode) & (log_p_obs + _LOG_TOLERANCE < _log_pmf(mode, r1, r2, c1, n, lf))
+    if left.any():
+        args = (r1[left], r2[left], c1[left], n[left])
+        pvalue = hypergeom.cdf(a[left], n[left], r1[left], c1[left])
+        has_tail = _log_pmf(support_hi[left], *args, lf) <= threshold[left]
+        start = _search_right(
+            mode[left], support_hi[left], threshold[left], *args, lf
+        )
+        pvalue += np.where(
+            has_tail, hypergeom.sf(start - 1, n[left], r1[left], c1[left]), 0.0
+        )
+        pvalues[left] = pvalue
+
+    # Observed table right of the mode: add the matching left tail.
+    right = (a > mode) & (log_p_obs + _LOG_TOLERANCE < _log_pmf(mode, r1, r2, c1, n, lf))
+    if right.any():
+        args = (r1[right], r2[right], c1[right], n[right])
+        pvalue = hypergeom.sf(a[right] - 1, n[right], r1[right], c1[right])
+        has_tail = _log_pmf(support_lo[right], *args, lf) <= threshold[right]
+        end = _search_left(support_lo[right], mode[right], threshold[right], *args, lf)
+        pvalue += np.where(
+            has_tail, hypergeom.cdf(end, n[right], r1[right], c1[right]), 0.0
+        )
+        pvalues[right] = pvalue
+
+    return np.minimum(pvalues, 1.0)
+
+
+def fisher_exact_batch(
+    n11: np.ndarray, n10: np.ndarray, n01: np.ndarray, n00: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Two-sided Fisher's exact test over arrays of 2x2 tables [[n11, n10], [n01, n00]].
+
+    Identical tables are tested once, and hypergeometric probabilities are
+    evaluated from a cached log-factorial table instead of per-call special
+    functions.
+
+    Args:
+        n11: Counts of samples with both genes mutated.
+        n10: Counts of samples with only the first gene mutated.
+        n01: Counts of samples with only the second gene mutated.
+        n00: Counts of samples with neither gene mutated.
+
+    Returns:
+        Arrays of odds ratios and p-values, matching scipy.stats.fisher_exact.
+    """
+    tables = np.stack(
+        [np.asarray(n, dtype=np.int64).ravel() for n in (n11, n10, n01, n00)], axis=1
+    )
+    if len(tables) == 0:
+        return np.empty(0), np.empty(0)
+    if (tables < 0).any():
+        raise ValueError("All values in the contingency tables must be nonnegative.")
+
+    unique_tables, inverse = np.unique(tables, axis=0, return_inverse=True)
+    a, b, c, d = unique_tables.T
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        oddsratios = np.where((b > 0) & (c > 0), (a * d) / (b * c), np.inf)
+    pvalues = np.ones(len(unique_tables))
+
+    # Tables with an empty row or column have p = 1 and an undefined odds ratio.
+    degenerate = (a + b == 0) | (c + d == 0) | (a + c == 0) | (b + d == 0)
+    oddsratios[degenerate] = np.nan
+    valid = ~degenerate
+    if valid.any():
+        pvalues[valid] = _two_sided_pvalues(a[valid], b[valid], c[valid], d[valid])
+
+    inverse = inverse.ravel()
+    return oddsratios[inverse], pvalues[inverse]
+
+
+def pvalue_lower_bounds(
+    n11: np.ndarray, r1: np.ndarray, c1: np.ndarray, n: int, terms: int = TAIL_TERMS
+) -> np.ndarray:
+    """
+    Cheap lower bounds on the two-sided Fisher p-values of tables with
+    ``n11`` co-mutated samples, row total ``r1`` and column total ``c1`` out
+    of ``n``.
+
+    The hypergeometric distribution is unimodal, so the tables further from
+    the mode than the observed one, on its side, are no more likely than it
+    and count towards its p-value. The bound adds up the observed table and
+    the next ``terms - 1`` of them, far cheaper than the exact tails.
+    """
+    n11, r1, c1 = np.broadcast_arrays(
+        *(np.asarray(values, dtype=np.int64) for values in (n11, r1, c1))
+    )
+    lf = log_factorials(n)
+    r2 = n - r1
+    lo = np.maximum(0, c1 - r2)
+    hi = np.minimum(r1, c1)
+    mode = np.clip((c1 + 1) * (r1 + 1) // (n + 2), lo, hi)
+    step = np.where(n11 < mode, -1, 1)
+    bounds = np.zeros(n11.shape)
+    for k in range(terms):
+        x = n11 + k * step
+        inside = (x >= lo) & (x <= hi)
+        bounds += np.where(inside, np.exp(_log_pmf(np.clip(x, lo, hi), r1, r2, c1, n, lf)), 0.0)
+    return np.minimum(bounds, 1.0)
+
+
+def min_pvalue_bounds(r1: np.ndarray, c1: np.ndarray, n: int) -> np.ndarray:
+    """
+    Lower bounds on the two-sided Fisher p-value of any table with row total
+    ``r1`` and column total ``c1`` out of ``n``, whatever its n11.
+
+    A p-value is at least the probability of its own table, and the least
+    likely table lies at one end of the (unimodal) hypergeometric support, so
+    the smaller end probability bounds every p-value the margins allow. Pairs
+    whose bound exceeds a cutoff cannot reach it and need not be tested.
+
+    Args:
+        r1: Mutated samples of the first gene of each pair.
+        c1: Mutated samples of the second gene (broadcast against ``r1``).
+        n: Number of samples.
+
+    Returns:
+        The bounds, shaped like ``r1`` and ``c1`` broadcast together.
+    """
+    r1, c1 = np.broadcast_arrays(np.asarray(r1, dtype=np.int64), np.asarray(c1, dtype=np.int64))
+    lf = log_factorials(n)
+    r2 = n - r1
+    lo = np.maximum(0, c1 - r2)
+    hi = np.minimum(r1, c1)
+    log_bound = np.minimum(
+        _log_pmf(lo, r1, r2, c1, n, lf), _log_pmf(hi, r1, r2, c1, n, lf)
+    )
+    return np.minimum(np.exp(log_bound), 1.0)
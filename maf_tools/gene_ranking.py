@@ -0,0 +1,347 @@
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.incidence import IncidenceMatrix
+from maf_tools.maf_cache import file_key, load_maf
+from maf_tools.maf_sidecar import read_ranking_sidecar, sidecar_enabled, write_ranking_sidecar
+from maf_tools.maf_reader import (
+    CLASSIFICATION_COLUMN,
+    GENE_COLUMN,
+    SAMPLE_COLUMN,
+    read_maf_chunks,
+    read_maf_header,
+)
+from maf_tools.maf_stream import Labels, SortedKeys, pack_records, sort_counts, unpack_records
+
+# Columns the ranking needs; Variant_Classification is used when the file has it.
+RANKING_COLUMNS = [SAMPLE_COLUMN, GENE_COLUMN]
+
+Filter = Tuple[Optional[FrozenSet[str]], FrozenSet[str]]
+
+
+def _plain_index(values) -> pd.Index:
+    return pd.Index(np.asarray(values, dtype=object))
+
+
+def _factorize(values: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), _plain_index(uniques)
+
+
+def _sorted_labels(labels: Labels, codes: np.ndarray) -> Tuple[np.ndarray, pd.Index]:
+    # Recodes labels numbered in order of appearance in sorted order, like _factorize.
+    names = np.asarray(labels.names, dtype=object)
+    order = np.argsort(names, kind="stable")
+    ranks = np.empty(len(order) + 1, dtype=np.int64)
+    ranks[order] = np.arange(len(order))
+    ranks[-1] = -1
+    return ranks[codes], _plain_index(names[order])
+
+
+class GeneRanking:
+    """
+    Ranks the genes of a MAF cohort by the number of distinct samples mutated
+    in them.
+
+    The index holds each distinct (gene, sample, Variant_Classification)
+    record once, as integer codes. Counting samples rather than mutation rows
+    keeps long genes such as TTN, which collect many mutations per sample,
+    from crowding out the ranking. Each ranking is sorted once per set of
+    classification filters and cached, so any top-k query is a slice.
+    """
+
+    def __init__(
+        self,
+        samples: pd.Index,
+        genes: pd.Index,
+        classifications: pd.Index,
+        sample_codes: np.ndarray,
+        gene_codes: np.ndarray,
+        classification_codes: np.ndarray,
+    ):
+        self.samples = samples
+        self.genes = genes
+        self.classifications = classifications
+        self.sample_codes = sample_codes
+        self.gene_codes = gene_codes
+        # -1 marks records without a Variant_Classification.
+        self.classification_codes = classification_codes
+        self._rankings: Dict[Filter, pd.Series] = {}
+
+    @classmethod
+    def from_maf(cls, maf_df: pd.DataFrame) -> "GeneRanking":
+        """
+        Builds the ranking index of a MAF DataFrame.
+
+        Args:
+            maf_df: MAF records with Tumor_Sample_Barcode and Hugo_Symbol
+                columns, and optionally Variant_Classification.
+        """
+        sample_codes, samples = _factorize(maf_df[SAMPLE_COLUMN])
+        gene_codes, genes = _factorize(maf_df[GENE_COLUMN])
+        if CLASSIFICATION_COLUMN in maf_df:
+            classification_codes, classifications = _factorize(maf_df[CLASSIFICATION_COLUMN])
+        else:
+            classification_codes = np.full(len(maf_df), -1, dtype=np.int64)
+            classifications = pd.Index([], dtype=object)
+
+        # Keep each (gene, sample, classification) record once.
+        keep = (sample_codes >= 0) & (gene_codes >= 0)
+        n_samples, n_classifications = len(samples), len(classifications) + 1
+        records = np.unique(
+            (gene_codes[keep] * n_samples + sample_codes[keep]) * n_classifications
+            + classification_codes[keep]
+            + 1
+        )
+        pairs, classification_codes = np.divmod(records, n_classifications)
+        gene_codes, sample_codes = np.divmod(pairs, n_samples)
+        return cls(
+            samples,
+            genes,
+            classifications,
+            sample_codes,
+            gene_codes,
+            classification_codes - 1,
+        )
+
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[pd.DataFrame]) -> "GeneRanking":
+        """
+        Builds the ranking index from MAF chunks. Each chunk is encoded into
+        integer codes and merged into the set of distinct packed records
+        before the next one is read, so memory grows with the chunk size and
+        the number of distinct (gene, sample, classification) records, not
+        with the file.
+        """
+        samples, genes, classifications = Labels(), Labels(), Labels()
+        records = SortedKeys()
+        for chunk in chunks:
+            sample_codes = samples.encode(chunk[SAMPLE_COLUMN])
+            gene_codes = genes.encode(chunk[GENE_COLUMN])
+            if CLASSIFICATION_COLUMN in chunk:
+                classification_codes = classifications.encode(chunk[CLASSIFICATION_COLUMN])
+            else:
+                classification_codes = np.full(len(chunk), -1, dtype=np.int64)
+            keep = (sample_codes >= 0) & (gene_codes >= 0)
+            records.add(
+                pack_records(gene_codes[keep], sample_codes[keep], classification_codes[keep])
+            )
+
+        gene_codes, sample_codes, classification_codes = unpack_records(records.values())
+        sample_codes, sample_index = _sorted_labels(samples, sample_codes)
+        gene_codes, gene_index = _sorted_labels(genes, gene_codes)
+        classification_codes, classification_index = _sorted_labels(
+            classifications, classification_codes
+        )
+        # In record order, like from_maf
+        gene_codes, sample_codes, classification_codes = unpack_records(
+            np.sort(pack_records(gene_codes, sample_codes, classification_codes))
+        )
+        return cls(
+            sample_index,
+            gene_index,
+            classification_index,
+            sample_codes,
+            gene_codes,
+            classification_codes,
+        )
+
+    def _mask(self, include: Optional[FrozenSet[str]], exclude: FrozenSet[str]) -> np.ndarray:
+        allowed = np.ones(len(self.classifications) + 1, dtype=bool)
+        names = self.classifications
+        if include is not None:
+            allowed[1:] = names.isin(list(include))
+            # Records without a classification cannot match an explicit filter.
+            allowed[0] = False
+        if exclude:
+            allowed[1:] &= ~names.isin(list(exclude))
+        return allowed[self.classification_codes + 1]
+
+    def ranking(
+        self,
+        exclude_classifications: Optional[Iterable[str]] = None,
+        include_classifications: Optional[Iterable[str]] = None,
+    ) -> pd.Series:
+        """
+        Returns the number of mutated samples per gene, most mutated first
+        (ties by gene name).
+
+        Args:
+            exclude_classifications: Variant classifications to ignore (e.g. Silent).
+            include_classifications: If given, only these variant classifications count.
+
+        Returns:
+            Mutated-sample counts indexed by gene. Genes with no qualifying
+            mutation are left out.
+        """
+        include = (
+            frozenset(include_classifications) if include_classifications is not None else None
+        )
+        exclude = frozenset(exclude_classifications or ())
+        key = (include, exclude)
+        ranking = self._rankings.get(key)
+        if ranking is None:
+            mask = self._mask(include, exclude)
+            # A sample counts once per gene, whatever its number of records.
+            pairs = np.unique(
+                self.gene_codes[mask] * len(self.samples) + self.sample_codes[mask]
+            )
+            counts = np.bincount(pairs // max(len(self.samples), 1), minlength=len(self.genes))
+            ranking = sort_counts(pd.Series(counts, index=self.genes))
+            self._rankings[key] = ranking
+        return ranking
+
+    def top_genes(
+        self,
+        n: int,
+        exclude_classifications: Optional[Iterable[str]] = None,
+        include_classifications: Optional[Iterable[str]] = None,
+    ) -> List[str]:
+        """
+        Returns the ``n`` genes mutated in the most samples.
+        """
+        ranking = self.ranking(exclude_classifications, include_classifications)
+        return ranking.index[:n].tolist()
+
+    def incidence(
+        self,
+        genes: Iterable[str],
+        exclude_classifications: Optional[Iterable[str]] = None,
+        include_classifications: Optional[Iterable[str]] = None,
+        samples: Optional[Iterable[str]] = None,
+    ) -> IncidenceMatrix:
+        """
+        Builds the sample x gene incidence matrix of the given genes, counting
+        only the mutations that pass the filters.
+
+        Rows are all samples of the cohort, or ``samples`` in the given order
+        when set (e.g. grouped so each group is a contiguous block of rows).
+        """
+        genes = pd.Index(genes)
+        samples = None if samples is None else _plain_index(samples)
+        rows, columns = self.incidence_entries(
+            genes, exclude_classifications, include_classifications, samples
+        )
+        if samples is None:
+            samples = self.samples
+        matrix = np.zeros((len(samples), len(genes)), dtype=np.uint8)
+        matrix[rows, columns] = 1
+        return IncidenceMatrix(samples, _plain_index(genes), matrix)
+
+    def incidence_entries(
+        self,
+        genes: Iterable[str],
+        exclude_classifications: Optional[Iterable[str]] = None,
+        include_classifications: Optional[Iterable[str]] = None,
+        samples: Optional[Iterable[str]] = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the (row, column) positions of the mutated entries of the
+        incidence matrix built by ``incidence``. A position may repeat when a
+        sample has records of several classifications in a gene.
+        """
+        genes = pd.Index(genes)
+        include = (
+            frozenset(include_classifications) if include_classifications is not None else None
+        )
+        mask = self._mask(include, frozenset(exclude_classifications or ()))
+        columns = genes.get_indexer(self.genes)[self.gene_codes[mask]]
+        rows = self.sample_codes[mask]
+        if samples is not None:
+            rows = pd.Index(samples).get_indexer(self.samples)[rows]
+        keep = (columns >= 0) & (rows >= 0)
+        return rows[keep], columns[keep]
+
+
+def ranking_columns(maf_file_path: str) -> List[str]:
+    """
+    Returns the columns the ranking reads from the file.
+    """
+    header, _ = read_maf_header(maf_file_path)
+    if CLASSIFICATION_COLUMN in header:
+        return RANKING_COLUMNS + [CLASSIFICATION_COLUMN]
+    return list(RANKING_COLUMNS)
+
+
+_rankings: "OrderedDict[tuple, GeneRanking]" = OrderedDict()
+_rankings_lock = threading.Lock()
+_MAX_RANKINGS = 16
+
+
+def _share(key: tuple, ranking: GeneRanking) -> GeneRanking:
+    with _rankings_lock:
+        _rankings[key] = ranking
+        _rankings.move_to_end(key)
+        while len(_rankings) > _MAX_RANKINGS:
+            _rankings.popitem(last=False)
+    return ranking
+
+
+def cached_gene_ranking(maf_file_path: str) -> Optional[GeneRanking]:
+    """
+    Returns the shared gene ranking index of the current version of a MAF
+    file if it was built already, in this process or into an up-to-date
+    ranking sidecar, or None.
+    """
+    key = file_key(maf_file_path)
+    with _rankings_lock:
+        if key in _rankings:
+            _rankings.move_to_end(key)
+            return _rankings[key]
+    arrays = read_ranking_sidecar(maf_file_path)
+    if arrays is None:
+        return None
+    return _share(key, GeneRanking(*arrays))
+
+
+def cache_gene_ranking(maf_file_path: str, ranking: GeneRanking) -> GeneRanking:
+    """
+    Shares a gene ranking index built by the caller from the current version
+    of a MAF file (e.g. while streaming it for other statistics). When
+    sidecars are enabled, its records are also written to a ranking sidecar.
+
+    Returns:
+        The ranking.
+    """
+    if sidecar_enabled():
+        try:
+            write_ranking_sidecar(maf_file_path, ranking)
+        except (ImportError, OSError):
+            # Without pyarrow the MAF cache warns when sidecars are used
+            pass
+    return _share(file_key(maf_file_path), ranking)
+
+
+def gene_ranking(maf_file_path: str, chunksize: Optional[int] = None) -> GeneRanking:
+    """
+    Returns the gene ranking index of a MAF file, shared by all tools.
+
+    The index is built once per file version, from the shared MAF cache or
+    by streaming the file in chunks of ``chunksize`` rows, and reused by every
+    later query.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        chunksize: If set, stream the file in chunks of this many rows.
+
+    Returns:
+        The gene ranking index.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        KeyError: If a required column is missing.
+    """
+    ranking = cached_gene_ranking(maf_file_path)
+    if ranking is not None:
+        return ranking
+
+    columns = ranking_columns(maf_file_path)
+    if chunksize:
+        ranking = GeneRanking.from_chunks(read_maf_chunks(maf_file_path, columns, chunksize))
+    else:
+        ranking = GeneRanking.from_maf(load_maf(maf_file_path, columns=columns))
+    return cache_gene_ranking(maf_file_path, ranking)
@@ -0,0 +1,153 @@
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.fisher import fisher_exact_batch
+from maf_tools.maf_reader import GENE_COLUMN, SAMPLE_COLUMN
+
+INTERACTION_COLUMNS = [
+    "gene1",
+    "gene2",
+    "pValue",
+    "oddsRatio",
+    "00",
+    "01",
+    "11",
+    "10",
+    "Event",
+]
+
+
+def _plain_index(values) -> pd.Index:
+    return pd.Index(np.asarray(values, dtype=object))
+
+
+def _codes_in(values: pd.Series, index: pd.Index) -> np.ndarray:
+    """
+    Returns the position of each value in ``index``, or -1 when absent.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        # Look up each category once instead of every row.
+        category_codes = np.append(index.get_indexer(values.cat.categories), -1)
+        return category_codes[values.cat.codes.to_numpy()]
+    return index.get_indexer(values)
+
+
+class IncidenceMatrix:
+    """
+    Binary sample x gene matrix; entry (i, j) is 1 when sample i carries at
+    least one mutation in gene j.
+    """
+
+    def __init__(self, samples: pd.Index, genes: pd.Index, matrix: np.ndarray):
+        self.samples = pd.Index(samples)
+        self.genes = pd.Index(genes)
+        self.matrix = matrix
+
+    @classmethod
+    def from_maf(
+        cls, maf_df: pd.DataFrame, genes: Optional[Sequence[str]] = None
+    ) -> "IncidenceMatrix":
+        """
+        Builds the incidence matrix of a MAF DataFrame.
+
+        Every sample in the MAF gets a row, including samples with no mutation
+        in the selected genes, so the row count is the cohort size.
+
+        Args:
+            maf_df: MAF records with Tumor_Sample_Barcode and Hugo_Symbol columns.
+            genes: Genes to keep, in column order. All genes when omitted.
+
+        Returns:
+            The incidence matrix.
+        """
+        sample_codes, samples = pd.factorize(maf_df[SAMPLE_COLUMN], sort=True)
+        if genes is None:
+            gene_codes, genes = pd.factorize(maf_df[GENE_COLUMN], sort=True)
+        else:
+            genes = pd.Index(genes)
+            gene_codes = _codes_in(maf_df[GENE_COLUMN], genes)
+
+        keep = (gene_codes >= 0) & (sample_codes >= 0)
+        matrix = np.zeros((len(samples), len(genes)), dtype=np.uint8)
+        matrix[sample_codes[keep], gene_codes[keep]] = 1
+        return cls(_plain_index(samples), _plain_index(genes), matrix)
+
+    @property
+    def n_samples(self) -> int:
+        return self.matrix.shape[0]
+
+    def mutated_counts(self) -> np.ndarray:
+        """
+        Returns the number of mutated samples per gene.
+        """
+        return self.matrix.sum(axis=0, dtype=np.int64)
+
+    def co_mutation_counts(self) -> np.ndarray:
+        """
+        Returns the gene x gene matrix of samples mutated in both genes.
+        """
+        # BLAS only handles floating point; float32 is exact below 2**24 samples.
+        dtype = np.float32 if self.n_samples < 2**24 else np.float64
+        x = self.matrix.astype(dtype)
+        return np.rint(x.T @ x).astype(np.int64)
+
+
+def pairwise_interactions(incidence: IncidenceMatrix) -> pd.DataFrame:
+    """
+    Runs Fisher's exact test on every pair of genes of an incidence matrix.
+
+    Pairs are reported in the order (i, j) for i < j over the matrix columns.
+
+    Args:
+        incidence: Sample x gene incidence matrix.
+
+    Returns:
+        A DataFrame with one row per gene pair and the columns gene1, gene2,
+        pValue, oddsRatio, 00, 01, 11, 10 and Event.
+    """
+    return interactions_from_counts(
+        incidence.genes, incidence.co_mutation_counts(), incidence.n_samples
+    )
+
+
+def interactions_from_counts(
+    genes: Sequence[str], n11_matrix: np.ndarray, n_samples: int
+) -> pd.DataFrame:
+    """
+    Runs Fisher's exact test on every pair of genes from their co-mutation counts.
+
+    Args:
+        genes: Gene names, in the order of the matrix.
+        n11_matrix: Gene x gene matrix of samples mutated in both genes; the
+            diagonal holds the mutated samples of each gene.
+        n_samples: Number of samples in the cohort.
+
+    Returns:
+        The same table as ``pairwise_interactions``.
+    """
+    genes = _plain_index(genes)
+    mutated = np.diag(n11_matrix)
+    i, j = np.triu_indices(len(genes), k=1)
+
+    n11 = n11_matrix[i, j]
+    n10 = mutated[i] - n11
+    n01 = mutated[j] - n11
+    n00 = n_samples - n11 - n10 - n01
+    oddsratios, pvalues = fisher_exact_batch(n11, n10, n01, n00)
+
+    return pd.DataFrame(
+        {
+            "gene1": genes[i],
+            "gene2": genes[j],
+            "pValue": pvalues,
+            "oddsRatio": oddsratios,
+            "00": n00,
+            "01": n01,
+            "11": n11,
+            "10": n10,
+            "Event": np.where(oddsratios > 1, "Co_Occurence", "Mutually_Exclusive"),
+        },
+        columns=INTERACTION_COLUMNS,
+    )
@@ -0,0 +1,556 @@
+import hashlib
+import json
+import os
+import threading
+from collections import Counter, OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.cohort_summary import (
+    REQUIRED_COLUMNS,
+    CohortSummary,
+    snv_class_counts,
+    summary_columns,
+)
+from maf_tools.compressed import detect_compression
+from maf_tools.incidence import interactions_from_counts
+from maf_tools.maf_reader import (
+    CLASSIFICATION_COLUMN,
+    GENE_COLUMN,
+    SAMPLE_COLUMN,
+    VARIANT_TYPE_COLUMN,
+    check_columns,
+    read_appended_chunks,
+    read_maf_chunks,
+    read_maf_header,
+)
+from maf_tools.maf_stream import (
+    DEFAULT_CHUNKSIZE,
+    Labels,
+    SortedKeys,
+    pack_records,
+    sort_counts,
+    unpack_records,
+)
+
+# Incremental re-analysis of growing MAF files. The state of a cohort (the
+# distinct mutation records, the summary counters and, per classification
+# filter, the mutated samples per gene and the co-mutation counts of the top
+# genes) is saved next to the MAF file. When rows are appended to the file,
+# or a delta MAF is given, only the new rows are read and folded into the
+# stores; the Fisher tests and BH adjustment then run on the updated counts.
+
+STATE_SUFFIX = ".maf_ai.state.npz"
+_FORMAT_VERSION = 1
+
+# The head of the file identifies it; the bytes before the last read offset
+# show whether it was only appended to since.
+_HEAD_BYTES = 64 * 1024
+_TAIL_BYTES = 4 * 1024
+
+# Distinct (gene, sample, classification) records are packed by pack_records;
+# (gene, sample) pairs use the gene above the low 32 bits.
+_PAIR_SHIFT = 32
+
+Exclusion = FrozenSet[str]
+
+
+def _grow(array: np.ndarray, length: int, axis: int = 0) -> np.ndarray:
+    """
+    Returns ``array`` with at least ``length`` entries along ``axis``, padded
+    with zeros. The capacity at least doubles when it grows, so growing one
+    entry at a time copies each entry O(1) times on average; callers keep
+    track of the length in use.
+    """
+    if array.shape[axis] >= length:
+        return array
+    shape = list(array.shape)
+    shape[axis] = max(length, 2 * array.shape[axis])
+    grown = np.zeros(shape, dtype=array.dtype)
+    grown[tuple(slice(0, size) for size in array.shape)] = array
+    return grown
+
+
+def _rank_counts(counts: np.ndarray, names: List[str], n: Optional[int] = None) -> pd.Series:
+    """
+    Orders the nonzero counts of coded labels like ``sort_counts``. With
+    ``n``, only the first ``n`` are returned, found by a partial sort so the
+    cost grows with the number of labels rather than being a full sort.
+    """
+    codes = np.flatnonzero(counts)
+    if n is not None and n < len(codes):
+        if n <= 0:
+            codes = codes[:0]
+        else:
+            # Labels tied with the n-th largest count compete by name.
+            threshold = np.partition(counts[codes], len(codes) - n)[len(codes) - n]
+            codes = codes[counts[codes] >= threshold]
+    ranked = sort_counts(
+        pd.Series(counts[codes], index=pd.Index([names[code] for code in codes], dtype=object))
+    )
+    return ranked if n is None else ranked.iloc[:n]
+
+
+class PairStore:
+    """
+    Mutated samples per gene and co-mutation counts under one classification filter.
+
+    ``pairs`` holds the distinct (gene, sample) pairs that pass the filter
+    and ``gene_counts`` the number of mutated samples per gene. Co-mutation
+    counts are kept for the ``tracked`` genes only, along with their sample x
+    gene incidence matrix, so adding samples costs time proportional to the
+    new pairs. A gene is tracked once it is among the top genes of a query.
+    Arrays indexed by sample or gene have spare capacity; only the first
+    ``n_samples`` samples and ``n_genes`` genes are in use.
+    """
+
+    def __init__(
+        self,
+        pairs: Optional[np.ndarray] = None,
+        gene_counts: Optional[np.ndarray] = None,
+        tracked: Optional[np.ndarray] = None,
+        incidence: Optional[np.ndarray] = None,
+        co_counts: Optional[np.ndarray] = None,
+    ):
+        self.pairs = SortedKeys(pairs)
+        self.gene_counts = gene_counts if gene_counts is not None else np.empty(0, dtype=np.int64)
+        self.tracked = tracked if tracked is not None else np.empty(0, dtype=np.int64)
+        self.incidence = incidence if incidence is not None else np.empty((0, 0), dtype=np.uint8)
+        self.co_counts = co_counts if co_counts is not None else np.empty((0, 0), dtype=np.int64)
+        self.n_samples = len(self.incidence)
+        self.n_genes = len(self.gene_counts)
+
+    def add(
+        self, gene_codes: np.ndarray, sample_codes: np.ndarray, n_samples: int, n_genes: int
+    ) -> None:
+        """
+        Adds (gene, sample) pairs; pairs already present are ignored.
+        """
+        novel = self.pairs.add((gene_codes << _PAIR_SHIFT) | sample_codes)
+        self.n_samples, self.n_genes = max(self.n_samples, n_samples), max(self.n_genes, n_genes)
+        self.incidence = _grow(self.incidence, self.n_samples)
+        self.gene_counts = _grow(self.gene_counts, self.n_genes)
+        genes, samples = novel >> _PAIR_SHIFT, novel & ((1 << _PAIR_SHIFT) - 1)
+        self.gene_counts[: self.n_genes] += np.bincount(genes, minlength=self.n_genes)
+
+        columns = pd.Index(self.tracked).get_indexer(genes)
+        keep = columns >= 0
+        if not keep.any():
+            return
+        # Recount the co-mutations of the touched samples only.
+        n_tracked = len(self.tracked)
+        touched = np.unique(samples[keep])
+        before = self.incidence[touched, :n_tracked].astype(np.float64)
+        self.incidence[samples[keep], columns[keep]] = 1
+        after = self.incidence[touched, :n_tracked].astype(np.float64)
+        self.co_counts += np.rint(after.T @ after - before.T @ before).astype(np.int64)
+
+    def counts(self) -> np.ndarray:
+        """
+        Returns the number of mutated samples per gene.
+        """
+        return self.gene_counts[: self.n_genes]
+
+    def _columns(self, gene_codes: np.ndarray) -> np.ndarray:
+        columns = np.zeros((self.n_samples, len(gene_codes)), dtype=np.uint8)
+        for column, gene in enumerate(gene_codes):
+            pairs = self.pairs.range(gene << _PAIR_SHIFT, (gene + 1) << _PAIR_SHIFT)
+            columns[pairs & ((1 << _PAIR_SHIFT) - 1), column] = 1
+        return columns
+
+    def track(self, gene_codes: Iterable[int], n_samples: int) -> None:
+        """
+        Starts keeping co-mutation counts for genes not tracked yet.
+        """
+        tracked = set(self.tracked.tolist())
+        new = np.array(
+            [gene for gene in dict.fromkeys(gene_codes) if gene not in tracked],
+            dtype=np.int64,
+        )
+        if not len(new):
+            return
+        self.n_samples = max(self.n_samples, n_samples)
+        n_tracked, n_columns = len(self.tracked), len(self.tracked) + len(new)
+        self.incidence = _grow(_grow(self.incidence, self.n_samples), n_columns, axis=1)
+        columns = self._columns(new)
+        old = self.incidence[: self.n_samples, :n_tracked].astype(np.float64)
+        added = columns.astype(np.float64)
+        cross = np.rint(old.T @ added).astype(np.int64)
+        corner = np.rint(added.T @ added).astype(np.int64)
+        self.co_counts = np.block([[self.co_counts, cross], [cross.T, corner]])
+        self.incidence[: self.n_samples, n_tracked:n_columns] = columns
+        self.tracked = np.concatenate([self.tracked, new])
+
+    def co_mutation_counts(self, gene_codes: np.ndarray) -> np.ndarray:
+        """
+        Returns the co-mutation counts of tracked genes, in the given order.
+        """
+        positions = pd.Index(self.tracked).get_indexer(gene_codes)
+        return self.co_counts[np.ix_(positions, positions)]
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        return {
+            "pairs": self.pairs.values(),
+            "gene_counts": self.counts(),
+            "tracked": self.tracked,
+            "incidence": self.incidence[: self.n_samples, : len(self.tracked)],
+            "co_counts": self.co_counts,
+        }
+
+
+class IncrementalAnalysis:
+    """
+    Summary and somatic interaction state of a cohort that can be extended with new rows.
+
+    ``update`` folds a chunk of MAF records into the stores in time
+    proportional to the chunk. The summary and the pairwise tests are then
+    computed from the stores and match a full analysis of all rows read.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = list(columns)
+        self.samples = Labels()
+        self.genes = Labels()
+        self.classifications = Labels()
+        # Distinct (gene, sample, classification) records, packed.
+        self.records = SortedKeys()
+        self.sample_mutations = np.empty(0, dtype=np.int64)
+        self.n_mutations = 0
+        self.classification_counts: Counter = Counter()
+        self.variant_type_counts: Counter = Counter()
+        self.snv_counts: Counter = Counter()
+        self.stores: Dict[Exclusion, PairStore] = {frozenset(): PairStore()}
+        # Fingerprint of the MAF file when last read, and the deltas applied since.
+        self.source: Optional[dict] = None
+        self.deltas: List[dict] = []
+        # Queries track new genes, so they take the lock like updates.
+        self.lock = threading.RLock()
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Adds the records of one MAF chunk.
+        """
+        with self.lock:
+            self._update(chunk)
+
+    def _update(self, chunk: pd.DataFrame) -> None:
+        self.n_mutations += len(chunk)
+        self.classification_counts.update(chunk[CLASSIFICATION_COLUMN].value_counts().to_dict())
+        if VARIANT_TYPE_COLUMN in chunk:
+            self.variant_type_counts.update(chunk[VARIANT_TYPE_COLUMN].value_counts().to_dict())
+        self.snv_counts.update(snv_class_counts(chunk))
+
+        sample_codes = self.samples.encode(chunk[SAMPLE_COLUMN])
+        gene_codes = self.genes.encode(chunk[GENE_COLUMN])
+        classification_codes = self.classifications.encode(chunk[CLASSIFICATION_COLUMN])
+        n_samples = len(self.samples)
+        self.sample_mutations = _grow(self.sample_mutations, n_samples)
+        self.sample_mutations[:n_samples] += np.bincount(
+            sample_codes[sample_codes >= 0], minlength=n_samples
+        )
+
+        keep = (sample_codes >= 0) & (gene_codes >= 0)
+        novel = self.records.add(
+            pack_records(gene_codes[keep], sample_codes[keep], classification_codes[keep])
+        )
+        for exclude, store in self.stores.items():
+            self._add_records(store, exclude, novel, n_samples, len(self.genes))
+
+    def _add_records(
+        self,
+        store: PairStore,
+        exclude: Exclusion,
+        records: np.ndarray,
+        n_samples: int,
+        n_genes: int,
+    ) -> None:
+        gene_codes, sample_codes, classification_codes = unpack_records(records)
+        if exclude:
+            excluded = np.array(
+                [name in exclude for name in self.classifications.names] + [False]
+            )
+            keep = ~excluded[classification_codes]
+            gene_codes, sample_codes = gene_codes[keep], sample_codes[keep]
+        store.add(gene_codes, sample_codes, n_samples, n_genes)
+
+    def store(self, exclude_classifications: Optional[Iterable[str]] = None) -> PairStore:
+        """
+        Returns the store of a classification filter, building it from the records if new.
+        """
+        exclude = frozenset(exclude_classifications or ())
+        store = self.stores.get(exclude)
+        if store is None:
+            store = self.stores[exclude] = PairStore()
+            self._add_records(
+                store, exclude, self.records.values(), len(self.samples), len(self.genes)
+            )
+        return store
+
+    def ranking(
+        self, exclude_classifications: Optional[Iterable[str]] = None, n: Optional[int] = None
+    ) -> pd.Series:
+        """
+        Returns the number of mutated samples per gene, most mutated first
+        (ties by gene name), like GeneRanking.ranking. The counts are kept up
+        to date by updates, so ranking them costs time in the number of genes.
+
+        Args:
+            exclude_classifications: Variant classifications to ignore (e.g. Silent).
+            n: If set, only the ``n`` genes mutated in the most samples.
+        """
+        with self.lock:
+            counts = self.store(exclude_classifications).counts()
+            return _rank_counts(counts, self.genes.names, n)
+
+    def interactions(
+        self, top_n: int, exclude_classifications: Optional[Iterable[str]] = None
+    ) -> Tuple[List[str], pd.DataFrame]:
+        """
+        Runs Fisher's exact test on every pair of the ``top_n`` genes mutated
+        in the most samples, from the stored co-mutation counts.
+
+        Returns:
+            The top genes and the table of ``pairwise_interactions``.
+        """
+        with self.lock:
+            top_genes = self.ranking(exclude_classifications, top_n).index.tolist()
+            gene_codes = np.array([self.genes.codes[gene] for gene in top_genes], dtype=np.int64)
+            store = self.store(exclude_classifications)
+            store.track(gene_codes, len(self.samples))
+            co_counts = store.co_mutation_counts(gene_codes)
+            n_samples = len(self.samples)
+        return top_genes, interactions_from_counts(top_genes, co_counts, n_samples)
+
+    def summary(self) -> CohortSummary:
+        """
+        Returns the cohort summary of all rows read.
+        """
+        with self.lock:
+            return CohortSummary(
+                sample_mutations=pd.Series(
+                    self.sample_mutations[: len(self.samples)],
+                    index=pd.Index(self.samples.names, dtype=object),
+                ),
+                gene_samples=self.ranking(),
+                n_mutations=self.n_mutations,
+                variant_classifications=dict(self.classification_counts),
+                variant_types=dict(self.variant_type_counts),
+                snv_classes=dict(self.snv_counts),
+            )
+
+    def save(self, state_path: str) -> None:
+        """
+        Writes the state to a NumPy archive, atomically.
+        """
+        with self.lock:
+            self._save(state_path)
+
+    def _save(self, state_path: str) -> None:
+        arrays = {
+            "records": self.records.values(),
+            "sample_mutations": self.sample_mutations[: len(self.samples)],
+        }
+        exclusions = []
+        for position, (exclude, store) in enumerate(self.stores.items()):
+            exclusions.append(sorted(exclude))
+            for name, array in store.arrays().items():
+                arrays[f"store{position}_{name}"] = array
+        metadata = {
+            "version": _FORMAT_VERSION,
+            "columns": self.columns,
+            "samples": self.samples.names,
+            "genes": self.genes.names,
+            "classifications": self.classifications.names,
+            "n_mutations": self.n_mutations,
+            "classification_counts": self.classification_counts,
+            "variant_type_counts": self.variant_type_counts,
+            "snv_counts": self.snv_counts,
+            "exclusions": exclusions,
+            "source": self.source,
+            "deltas": self.deltas,
+        }
+        tmp_path = f"{state_path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, metadata=np.array(json.dumps(metadata)), **arrays)
+        os.replace(tmp_path, state_path)
+
+    @classmethod
+    def load(cls, state_path: str) -> Optional["IncrementalAnalysis"]:
+        """
+        Reads a saved state. Returns None if it is missing, unreadable or of another format.
+        """
+        try:
+            with np.load(state_path, allow_pickle=False) as archive:
+                metadata = json.loads(str(archive["metadata"]))
+                if metadata.get("version") != _FORMAT_VERSION:
+                    return None
+                state = cls(metadata["columns"])
+                state.samples = Labels(metadata["samples"])
+                state.genes = Labels(metadata["genes"])
+                state.classifications = Labels(metadata["classifications"])
+                state.records = SortedKeys(archive["records"])
+                state.sample_mutations = archive["sample_mutations"]
+                state.n_mutations = metadata["n_mutations"]
+                state.classification_counts = Counter(metadata["classification_counts"])
+                state.variant_type_counts = Counter(metadata["variant_type_counts"])
+                state.snv_counts = Counter(metadata["snv_counts"])
+                state.stores = {
+                    frozenset(exclude): PairStore(
+                        **{
+                            name: archive[f"store{position}_{name}"]
+                            for name in PairStore().arrays()
+                        }
+                    )
+                    for position, exclude in enumerate(metadata["exclusions"])
+                }
+                state.source = metadata["source"]
+                state.deltas = metadata["deltas"]
+                return state
+        except (OSError, ValueError, KeyError):
+            return None
+
+
+def file_fingerprint(maf_file_path: str) -> dict:
+    """
+    Fingerprints a MAF file: its path, size, a hash of its head and a hash of
+    the bytes before its end.
+    """
+    size = os.path.getsize(maf_file_path)
+    with open(maf_file_path, "rb") as f:
+        head = f.read(_HEAD_BYTES)
+        f.seek(max(size - _TAIL_BYTES, 0))
+        tail = f.read(_TAIL_BYTES)
+    return {
+        "path": os.path.abspath(maf_file_path),
+        "size": size,
+        "head": hashlib.sha256(head).hexdigest(),
+        "tail": hashlib.sha256(tail).hexdigest(),
+        # Bytes appended to a compressed file cannot be parsed on their own
+        "complete": tail.endswith(b"\n") and detect_compression(maf_file_path) is None,
+    }
+
+
+def appended_offset(maf_file_path: str, source: Optional[dict]) -> Optional[int]:
+    """
+    Returns the byte offset where rows appended since ``source`` was
+    fingerprinted start: the old size when the file only grew, or None if
+    the file was rewritten (or never read).
+    """
+    if not source:
+        return None
+    size = os.path.getsize(maf_file_path)
+    offset = source["size"]
+    if size < offset or (size > offset and not source["complete"]):
+        return None
+    with open(maf_file_path, "rb") as f:
+        head = f.read(min(_HEAD_BYTES, offset))
+        f.seek(max(offset - _TAIL_BYTES, 0))
+        tail = f.read(offset - max(offset - _TAIL_BYTES, 0))
+    if (
+        hashlib.sha256(head).hexdigest() != source["head"]
+        or hashlib.sha256(tail).hexdigest() != source["tail"]
+    ):
+        return None
+    return offset
+
+
+def state_path_for(maf_file_path: str) -> str:
+    """
+    Returns where the incremental state of a MAF file lives.
+
+    States are written next to the MAF file, or into MAF_AI_STATE_DIR when it
+    is set (e.g. when the data directory is read-only).
+    """
+    state_dir = os.environ.get("MAF_AI_STATE_DIR")
+    if not state_dir:
+        return maf_file_path + STATE_SUFFIX
+    digest = hashlib.sha1(os.path.abspath(maf_file_path).encode()).hexdigest()[:12]
+    return os.path.join(state_dir, f"{os.path.basename(maf_file_path)}.{digest}{STATE_SUFFIX}")
+
+
+_states: "OrderedDict[str, IncrementalAnalysis]" = OrderedDict()
+# Guards the two dictionaries only; each state file has its own lock, held
+# while it is read, so states of different files are brought up to date at
+# the same time.
+_states_lock = threading.Lock()
+_state_locks: Dict[str, threading.Lock] = {}
+_MAX_STATES = 16
+
+
+def incremental_analysis(
+    maf_file_path: str,
+    delta_maf_file_path: Optional[str] = None,
+    state_path: Optional[str] = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> IncrementalAnalysis:
+    """
+    Returns the incremental state of a MAF file, brought up to date.
+
+    The saved state is loaded and, if the file grew since it was last read
+    (same head, same bytes up to the old end), only the appended rows are
+    read. A file that was rewritten is read in full. Rows of a delta MAF are
+    added once; the delta is remembered so it is not applied twice. The state
+    is saved again whenever it changed.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        delta_maf_file_path: MAF file with new rows for the cohort, e.g. the
+            samples of the week, when they are not appended to the MAF file.
+        state_path: Where the state is saved. Defaults to ``state_path_for``.
+        chunksize: Rows per chunk when reading.
+
+    Returns:
+        The updated state.
+
+    Raises:
+        FileNotFoundError: If a MAF file does not exist.
+        KeyError: If a required column is missing.
+    """
+    state_path = state_path or state_path_for(maf_file_path)
+    columns = summary_columns(maf_file_path)
+    check_columns(maf_file_path, REQUIRED_COLUMNS)
+    with _states_lock:
+        state_lock = _state_locks.setdefault(state_path, threading.Lock())
+    with state_lock:
+        with _states_lock:
+            state = _states.get(state_path)
+        if state is None or state.columns != columns:
+            state = IncrementalAnalysis.load(state_path)
+        if state is not None and state.columns != columns:
+            state = None
+        changed = False
+
+        offset = appended_offset(maf_file_path, state.source if state else None)
+        if state is None or offset is None:
+            state = IncrementalAnalysis(columns)
+            for chunk in read_maf_chunks(maf_file_path, columns, chunksize):
+                state.update(chunk)
+            changed = True
+        elif offset < os.path.getsize(maf_file_path):
+            for chunk in read_appended_chunks(maf_file_path, offset, columns, chunksize):
+                state.update(chunk)
+            changed = True
+        if changed:
+            state.source = file_fingerprint(maf_file_path)
+
+        if delta_maf_file_path is not None:
+            delta = file_fingerprint(delta_maf_file_path)
+            if delta not in state.deltas:
+                header, _ = read_maf_header(delta_maf_file_path)
+                check_columns(delta_maf_file_path, REQUIRED_COLUMNS, header)
+                delta_columns = [column for column in columns if column in header]
+                for chunk in read_maf_chunks(delta_maf_file_path, delta_columns, chunksize):
+                    state.update(chunk)
+                state.deltas.append(delta)
+                changed = True
+
+        if changed:
+            state.save(state_path)
+        with _states_lock:
+            _states[state_path] = state
+            _states.move_to_end(state_path)
+            while len(_states) > _MAX_STATES:
+                _states.popitem(last=False)
+        return state
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache, wraps
+from typing import Any, Optional
+
+from maf_tools.persistent_cache import PersistentCache, default_cache_path
+
+# Persistent cache of LLM responses. LLM_CACHE=0 (or analyze-maf --no-llm-cache)
+# disables it; entries never expire unless LLM_CACHE_TTL (seconds) is set.
+LLM_CACHE_PATH = os.environ.get("LLM_CACHE_PATH", default_cache_path("llm"))
+LLM_CACHE_TTL = (
+    float(os.environ["LLM_CACHE_TTL"]) if os.environ.get("LLM_CACHE_TTL") else None
+)
+LLM_CACHE_MAX_ENTRIES = int(os.environ.get("LLM_CACHE_MAX_ENTRIES", 10_000))
+
+# Model used to turn instructions into plans.
+PLANNER_MODEL = "gpt-4o-mini"
+PLANNER_TEMPERATURE = 0.3  # Lower temperature for deterministic output
+
+_enabled = os.environ.get("LLM_CACHE", "1") != "0"
+_default_cache: Optional[PersistentCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def set_llm_cache_enabled(enabled: bool) -> None:
+    """
+    Enables or disables the shared LLM response cache.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def get_llm_cache() -> Optional[PersistentCache]:
+    """
+    Returns the process-wide LLM response cache, or None when it is disabled.
+    """
+    global _default_cache
+    if not _enabled:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = PersistentCache(
+                LLM_CACHE_PATH, ttl=LLM_CACHE_TTL, max_entries=LLM_CACHE_MAX_ENTRIES
+            )
+        return _default_cache
+
+
+def llm_cache_key(
+    model: Optional[str], temperature: Optional[float], prompt: Any, **inputs: Any
+) -> str:
+    """
+    Builds the cache key of an LLM call from the model, temperature, prompt
+    (a string or a list of chat messages) and any tool inputs.
+    """
+    payload = json.dumps(
+        {"model": model, "temperature": temperature, "prompt": prompt, "inputs": inputs},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class CachedLLM:
+    """
+    Wraps a LangChain-style LLM (``invoke(prompt) -> str``) with a response cache.
+
+    Responses are looked up by model, temperature, prompt and tool inputs, so
+    repeated calls with the same prompt skip the model. Any object with an
+    ``invoke`` method works, including local stub models.
+    """
+
+    def __init__(
+        self,
+        llm: Any,
+        cache: Optional[PersistentCache] = None,
+        model: Optional[str] = None,
+        temperature: Optional[float] = None,
+    ):
+        self.llm = llm
+        self._cache = cache
+        self.model = model or getattr(llm, "model_name", None) or getattr(llm, "model", None)
+        self.temperature = (
+            temperature if temperature is not None else getattr(llm, "temperature", None)
+        )
+
+    @property
+    def cache(self) -> Optional[PersistentCache]:
+        return self._cache if self._cache is not None else get_llm_cache()
+
+    def invoke(self, prompt: str, **inputs: Any) -> str:
+        """
+        Returns the model's response to ``prompt``, from the cache when possible.
+
+        Args:
+            prompt: The prompt.
+            **inputs: Tool inputs the prompt was built from; part of the cache key.
+        """
+        cache = self.cache
+        key = llm_cache_key(self.model, self.temperature, prompt, **inputs)
+        if cache is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+        response = self.llm.invoke(prompt)
+        # Chat models return a message; completion models return a string.
+        response = getattr(response, "content", response)
+        if cache is not None and isinstance(response, str):
+            cache.set(key, response)
+        return response
+
+
+def cache_llm_calls(llm: Any, cache: Optional[PersistentCache] = None) -> Any:
+    """
+    Caches the text responses of a CrewAI LLM, keyed on its model, temperature,
+    the messages and the tools offered.
+
+    The instance's ``call`` method is wrapped in place, so the LLM keeps its
+    type and can be passed to an Agent as before.
+
+    Returns:
+        The same LLM.
+    """
+    call = llm.call
+
+    @wraps(call)
+    def cached_call(messages, *args, **kwargs):
+        active_cache = cache if cache is not None else get_llm_cache()
+        if active_cache is None:
+            return call(messages, *args, **kwargs)
+        tools = kwargs.get("tools") if "tools" in kwargs else (args[0] if args else None)
+        key = llm_cache_key(
+            getattr(llm, "model", None),
+            getattr(llm, "temperature", None),
+            messages,
+            tools=tools,
+        )
+        cached = active_cache.get(key)
+        if cached is not None:
+            return cached
+        response = call(messages, *args, **kwargs)
+        # Only plain text is cached; tool calls and structured output are not.
+        if isinstance(response, str):
+            active_cache.set(key, response)
+        return response
+
+    # CrewAI LLMs are pydantic models, which reject unknown attributes.
+    object.__setattr__(llm, "call", cached_call)
+    return llm
+
+
+@lru_cache(maxsize=None)
+def get_planner_llm(
+    model: str = PLANNER_MODEL, temperature: float = PLANNER_TEMPERATURE
+) -> CachedLLM:
+    """
+    Returns the cached planning LLM. The OpenAI client is created once per
+    process and reused by every call.
+    """
+    from langchain_openai import OpenAI
+
+    return CachedLLM(OpenAI(model_name=model, temperature=temperature))
@@ -0,0 +1,188 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+import pandas as pd
+
+from maf_tools.maf_sidecar import read_maf_with_sidecar
+
+# Default memory budget for parsed MAF files held by the process-wide cache.
+# Can be overridden with the MAF_AI_CACHE_MAX_BYTES environment variable.
+DEFAULT_MAX_BYTES = int(os.environ.get("MAF_AI_CACHE_MAX_BYTES", 4 * 1024**3))
+
+CacheKey = Tuple[str, int, int]
+# Columns held by a cache entry; None means every column of the file.
+Columns = Optional[FrozenSet[str]]
+
+
+def file_key(maf_file_path: str) -> CacheKey:
+    """
+    Builds the cache key of a MAF file from its absolute path, mtime and size.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+    """
+    stat = os.stat(maf_file_path)
+    return (os.path.abspath(maf_file_path), stat.st_mtime_ns, stat.st_size)
+
+
+def _frame_nbytes(maf_df: pd.DataFrame) -> int:
+    return int(maf_df.memory_usage(deep=True).sum())
+
+
+class MAFCache:
+    """
+    Thread-safe LRU cache of parsed MAF files.
+
+    Entries are keyed by (path, mtime, size) so a file that changes on disk is
+    parsed again, and the total in-memory size of the cached DataFrames is kept
+    under ``max_bytes`` by evicting the least recently used entries. Each entry
+    remembers which columns were loaded; a request for columns the entry lacks
+    re-reads the file with the union of both column sets.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        loader: Optional[Callable[..., pd.DataFrame]] = None,
+    ):
+        self.max_bytes = max_bytes
+        self._loader = loader or read_maf_with_sidecar
+        self._entries: "OrderedDict[CacheKey, Tuple[pd.DataFrame, int, Columns]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        self._key_locks: Dict[CacheKey, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(
+        self, maf_file_path: str, columns: Optional[Iterable[str]] = None
+    ) -> pd.DataFrame:
+        """
+        Returns the parsed MAF file, reading it only if no fresh copy is cached.
+
+        The returned DataFrame is shared between callers and must not be modified.
+        It may hold more columns than requested.
+
+        Args:
+            maf_file_path: Path to the MAF file.
+            columns: Columns the caller needs. All columns when omitted.
+
+        Returns:
+            The parsed MAF file.
+        """
+        key = file_key(maf_file_path)
+        columns = frozenset(columns) if columns is not None else None
+        with self._lock:
+            maf_df = self._lookup(key, columns)
+            if maf_df is not None:
+                return maf_df
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+
+        # Only one thread parses a given file; the others wait and then hit the cache.
+        with key_lock:
+            with self._lock:
+                maf_df = self._lookup(key, columns)
+                if maf_df is not None:
+                    return maf_df
+                self.misses += 1
+                columns = self._merge_columns(key, columns)
+            try:
+                maf_df = self._loader(
+                    maf_file_path, usecols=sorted(columns) if columns is not None else None
+                )
+                with self._lock:
+                    self._store(key, maf_df, columns)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return maf_df
+
+    def _lookup(self, key: CacheKey, columns: Columns) -> Optional[pd.DataFrame]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        cached_columns = entry[2]
+        if cached_columns is not None and (columns is None or columns - cached_columns):
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def _merge_columns(self, key: CacheKey, columns: Columns) -> Columns:
+        entry = self._entries.get(key)
+        if columns is None or entry is None or entry[2] is None:
+            return columns
+        return columns | entry[2]
+
+    def _store(self, key: CacheKey, maf_df: pd.DataFrame, columns: Columns) -> None:
+        # Drop stale versions of the same file before inserting the new one.
+        for stale_key in [k for k in self._entries if k[0] == key[0]]:
+            del self._entries[stale_key]
+
+        nbytes = _frame_nbytes(maf_df)
+        if nbytes > self.max_bytes:
+            return
+        self._entries[key] = (maf_df, nbytes, columns)
+        while self.nbytes > self.max_bytes:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    @property
+    def nbytes(self) -> int:
+        return sum(entry[1] for entry in self._entries.values())
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Returns the hit/miss counters and the current size of the cache.
+        """
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self.nbytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def clear(self) -> None:
+        """
+        Drops all cached entries and resets the counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+_default_cache = MAFCache()
+
+
+def get_maf_cache() -> MAFCache:
+    """
+    Returns the process-wide MAF cache shared by all tools.
+    """
+    return _default_cache
+
+
+def load_maf(maf_file_path: str, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Loads a MAF file through the process-wide cache.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        columns: Columns the caller needs. All columns when omitted.
+
+    Returns:
+        The parsed MAF file. The DataFrame is shared and must not be modified.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        MissingColumnsError: If any of ``columns`` is absent from the file.
+    """
+    return _default_cache.get(maf_file_path, columns)
@@ -0,0 +1,242 @@
+import os
+from contextlib import contextmanager
+from typing import IO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import pandas as pd
+
+from maf_tools.compressed import detect_compression, open_maf
+
+SAMPLE_COLUMN = "Tumor_Sample_Barcode"
+GENE_COLUMN = "Hugo_Symbol"
+CLASSIFICATION_COLUMN = "Variant_Classification"
+VARIANT_TYPE_COLUMN = "Variant_Type"
+REFERENCE_ALLELE_COLUMN = "Reference_Allele"
+TUMOR_ALLELE_COLUMN = "Tumor_Seq_Allele2"
+
+# Low-cardinality string columns that are stored as pandas categoricals.
+CATEGORICAL_COLUMNS = (
+    SAMPLE_COLUMN,
+    GENE_COLUMN,
+    CLASSIFICATION_COLUMN,
+    VARIANT_TYPE_COLUMN,
+    REFERENCE_ALLELE_COLUMN,
+    TUMOR_ALLELE_COLUMN,
+)
+
+# CSV parser used when the caller does not pick one: "c" (pandas) or "pyarrow".
+DEFAULT_ENGINE = os.environ.get("MAF_AI_CSV_ENGINE", "c")
+
+
+class MissingColumnsError(KeyError):
+    """
+    Raised when a MAF file lacks columns required by the caller.
+    """
+
+    def __init__(self, maf_file_path: str, missing: Sequence[str]):
+        super().__init__(list(missing))
+        self.maf_file_path = maf_file_path
+        self.missing = list(missing)
+
+    def __str__(self) -> str:
+        return ", ".join(self.missing)
+
+
+def read_maf_header(maf_file_path: str) -> Tuple[List[str], int]:
+    """
+    Reads the column names of a MAF file.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+
+    Returns:
+        The column names and the number of leading '#' comment lines.
+    """
+    comment_lines = 0
+    # Only the first lines are needed, so nothing is decompressed ahead
+    with open_maf(maf_file_path, readahead=False) as f:
+        for line in f:
+            if line.startswith(b"#"):
+                comment_lines += 1
+                continue
+            return line.decode().rstrip("\r\n").split("\t"), comment_lines
+    return [], comment_lines
+
+
+@contextmanager
+def _maf_source(maf_file_path: str) -> Iterator[Union[str, IO[bytes]]]:
+    # Parsers read uncompressed files by path and compressed files from a
+    # stream decompressed on other threads, so no temporary file is written.
+    if detect_compression(maf_file_path) is None:
+        yield maf_file_path
+        return
+    with open_maf(maf_file_path) as f:
+        yield f
+
+
+def check_columns(
+    maf_file_path: str, columns: Iterable[str], header: Optional[List[str]] = None
+) -> None:
+    """
+    Raises MissingColumnsError if any of ``columns`` is absent from the MAF header.
+    """
+    if header is None:
+        header, _ = read_maf_header(maf_file_path)
+    missing = [column for column in columns if column not in header]
+    if missing:
+        raise MissingColumnsError(maf_file_path, missing)
+
+
+def _read_pyarrow(
+    maf_file_path: Union[str, IO[bytes]],
+    usecols: Optional[List[str]],
+    categorical: List[str],
+    skip_rows: int,
+) -> pd.DataFrame:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    table = pa_csv.read_csv(
+        maf_file_path,
+        read_options=pa_csv.ReadOptions(skip_rows=skip_rows),
+        parse_options=pa_csv.ParseOptions(delimiter="\t"),
+        convert_options=pa_csv.ConvertOptions(
+            include_columns=usecols,
+            column_types={
+                column: pa.dictionary(pa.int32(), pa.string()) for column in categorical
+            },
+        ),
+    )
+    maf_df = table.to_pandas()
+    # pyarrow orders dictionary values by first appearance; match the C engine.
+    for column in categorical:
+        maf_df[column] = maf_df[column].cat.reorder_categories(
+            sorted(maf_df[column].cat.categories)
+        )
+    return maf_df
+
+
+def read_maf(
+    maf_file_path: str,
+    usecols: Optional[Iterable[str]] = None,
+    categorical: bool = True,
+    engine: Optional[str] = None,
+) -> pd.DataFrame:
+    """
+    Reads a MAF file, loading only the requested columns.
+
+    The sample, gene and variant classification columns are loaded as pandas
+    categoricals, which is several times smaller than object strings for
+    cohort-sized files.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        usecols: Columns to load. All columns are loaded when omitted.
+        categorical: Whether to load the low-cardinality columns as categoricals.
+        engine: CSV parser, "c" or "pyarrow". Defaults to MAF_AI_CSV_ENGINE or "c".
+
+    Returns:
+        The MAF records.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        MissingColumnsError: If any of ``usecols`` is absent from the file.
+    """
+    engine = engine or DEFAULT_ENGINE
+    header, comment_lines = read_maf_header(maf_file_path)
+    if usecols is not None:
+        usecols = list(dict.fromkeys(usecols))
+        check_columns(maf_file_path, usecols, header)
+    selected = usecols if usecols is not None else header
+    categorical_columns = (
+        [column for column in CATEGORICAL_COLUMNS if column in selected]
+        if categorical
+        else []
+    )
+
+    if engine not in ("c", "pyarrow"):
+        raise ValueError(f"Unsupported MAF parser engine: {engine}")
+
+    with _maf_source(maf_file_path) as source:
+        if engine == "pyarrow":
+            return _read_pyarrow(source, usecols, categorical_columns, comment_lines)
+        return pd.read_csv(
+            source,
+            sep="\t",
+            skiprows=comment_lines,
+            usecols=usecols,
+            dtype={column: "category" for column in categorical_columns},
+            low_memory=False,
+        )
+
+
+def read_maf_chunks(
+    maf_file_path: str, usecols: Iterable[str], chunksize: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads a MAF file as a sequence of DataFrames of at most ``chunksize`` rows.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        usecols: Columns to load.
+        chunksize: Maximum number of rows per chunk.
+
+    Yields:
+        Consecutive chunks of MAF records.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        MissingColumnsError: If any of ``usecols`` is absent from the file.
+    """
+    header, comment_lines = read_maf_header(maf_file_path)
+    usecols = list(dict.fromkeys(usecols))
+    check_columns(maf_file_path, usecols, header)
+    with _maf_source(maf_file_path) as source, pd.read_csv(
+        source,
+        sep="\t",
+        skiprows=comment_lines,
+        usecols=usecols,
+        dtype=str,
+        chunksize=chunksize,
+    ) as reader:
+        yield from reader
+
+
+def read_appended_chunks(
+    maf_file_path: str, offset: int, usecols: Iterable[str], chunksize: int
+) -> Iterator[pd.DataFrame]:
+    """
+    Reads the records of a MAF file that start at byte ``offset``, e.g. the
+    rows appended since the file was last read, in chunks of at most
+    ``chunksize`` rows.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        offset: Byte offset of the first record to read; must be at the start of a line.
+        usecols: Columns to load.
+        chunksize: Maximum number of rows per chunk.
+
+    Yields:
+        Consecutive chunks of MAF records.
+
+    Raises:
+        FileNotFoundError: If the file does not exist.
+        MissingColumnsError: If any of ``usecols`` is absent from the file.
+    """
+    header, _ = read_maf_header(maf_file_path)
+    usecols = list(dict.fromkeys(usecols))
+    check_columns(maf_file_path, usecols, header)
+    with open(maf_file_path, "rb") as f:
+        f.seek(offset)
+        if not f.read(1):
+            return
+        f.seek(offset)
+        with pd.read_csv(
+            f,
+            sep="\t",
+            header=None,
+            names=header,
+            usecols=usecols,
+            dtype=str,
+            chunksize=chunksize,
+        ) as reader:
+            yield from reader
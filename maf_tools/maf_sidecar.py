@@ -0,0 +1,352 @@
+import hashlib
+import json
+import os
+import warnings
+from typing import Callable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.maf_reader import (
+    CATEGORICAL_COLUMNS,
+    CLASSIFICATION_COLUMN,
+    GENE_COLUMN,
+    SAMPLE_COLUMN,
+    check_columns,
+    read_maf,
+    read_maf_header,
+)
+
+# Columns stored in the sidecar. Requests for any other column read the MAF text.
+SIDECAR_COLUMNS = CATEGORICAL_COLUMNS
+
+SIDECAR_SUFFIX = ".maf_ai.arrow"
+# Distinct (gene, sample, classification) records of the gene ranking index.
+RANKING_SUFFIX = ".maf_ai.ranking.arrow"
+_RANKING_COLUMNS = [SAMPLE_COLUMN, GENE_COLUMN, CLASSIFICATION_COLUMN]
+_METADATA_KEY = b"maf_ai"
+_FORMAT_VERSION = 1
+
+# Whether a sidecar is written when a MAF file without one is loaded. Existing
+# sidecars are always used when they are up to date with their source file.
+_write_enabled = os.environ.get("MAF_AI_SIDECAR", "0") == "1"
+
+
+def check_sidecar_support() -> None:
+    """
+    Raises ImportError if pyarrow, which sidecars are written with, is not installed.
+    """
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Sidecars require pyarrow; install it with: pip install 'maf-ai[arrow]'"
+        ) from e
+
+
+def set_sidecar_enabled(enabled: bool) -> None:
+    """
+    Enables or disables writing sidecars on first load of a MAF file.
+
+    Raises:
+        ImportError: If sidecars are enabled and pyarrow is not installed.
+    """
+    global _write_enabled
+    if enabled:
+        check_sidecar_support()
+    _write_enabled = enabled
+
+
+def sidecar_enabled() -> bool:
+    return _write_enabled
+
+
+def sidecar_path(maf_file_path: str, suffix: str = SIDECAR_SUFFIX) -> str:
+    """
+    Returns where a sidecar of a MAF file lives: the columns sidecar, or the
+    ranking sidecar with ``suffix=RANKING_SUFFIX``.
+
+    Sidecars are written next to the MAF file, or into MAF_AI_SIDECAR_DIR when
+    it is set (e.g. when the data directory is read-only).
+    """
+    sidecar_dir = os.environ.get("MAF_AI_SIDECAR_DIR")
+    if not sidecar_dir:
+        return maf_file_path + suffix
+    digest = hashlib.sha1(os.path.abspath(maf_file_path).encode()).hexdigest()[:12]
+    return os.path.join(sidecar_dir, f"{os.path.basename(maf_file_path)}.{digest}{suffix}")
+
+
+def file_digest(path: str) -> str:
+    """
+    Returns the BLAKE2b digest of a file's contents.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _source_metadata(maf_file_path: str) -> dict:
+    stat = os.stat(maf_file_path)
+    return {
+        "version": _FORMAT_VERSION,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": file_digest(maf_file_path),
+    }
+
+
+def _is_fresh(metadata: dict, maf_file_path: str) -> bool:
+    """
+    Checks that a sidecar was built from the current contents of its MAF file.
+
+    Size and mtime are compared first; the content digest is only computed when
+    the size matches but the mtime does not (a copied or touched file). On a
+    digest match ``metadata`` takes the new mtime, for the caller to store.
+    """
+    if metadata.get("version") != _FORMAT_VERSION:
+        return False
+    stat = os.stat(maf_file_path)
+    if metadata.get("size") != stat.st_size:
+        return False
+    if metadata.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+    if metadata.get("digest") != file_digest(maf_file_path):
+        return False
+    metadata["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def _write_table(path: str, table, metadata: dict) -> None:
+    import pyarrow as pa
+
+    table = table.replace_schema_metadata({_METADATA_KEY: json.dumps(metadata).encode()})
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    try:
+        with pa.OSFile(tmp_path, "wb") as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _read_fresh(
+    path: str,
+    maf_file_path: str,
+    columns: Optional[List[str]],
+    convert: Callable,
+):
+    """
+    Memory-maps a sidecar file built from the current contents of its MAF
+    file and returns ``convert`` applied to the requested columns, read
+    without loading the others.
+
+    Returns:
+        The converted table, or None if the sidecar is missing, stale,
+        unreadable or lacks a column.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return None
+
+    if not os.path.exists(path):
+        return None
+    try:
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            raw_metadata = (reader.schema.metadata or {}).get(_METADATA_KEY)
+            if raw_metadata is None:
+                return None
+            metadata = json.loads(raw_metadata)
+            mtime_ns = metadata.get("mtime_ns")
+            if not _is_fresh(metadata, maf_file_path):
+                return None
+            columns = columns if columns is not None else reader.schema.names
+            if any(column not in reader.schema.names for column in columns):
+                return None
+            if metadata["mtime_ns"] != mtime_ns:
+                # The file was touched or copied; store its new mtime so the
+                # next load does not hash it again
+                try:
+                    _write_table(path, reader.read_all(), metadata)
+                except OSError:
+                    pass
+            schema = pa.schema([reader.schema.field(column) for column in columns])
+            table = pa.Table.from_batches(
+                [
+                    reader.get_batch(position).select(columns)
+                    for position in range(reader.num_record_batches)
+                ],
+                schema=schema,
+            )
+            return convert(table)
+    except (OSError, ValueError, pa.ArrowInvalid):
+        return None
+
+
+def read_sidecar(
+    maf_file_path: str, usecols: Optional[Iterable[str]] = None
+) -> Optional[pd.DataFrame]:
+    """
+    Reads MAF columns from an up-to-date sidecar by memory-mapping it.
+
+    Args:
+        maf_file_path: Path to the source MAF file.
+        usecols: Columns to load. All sidecar columns when omitted.
+
+    Returns:
+        The MAF records, or None if there is no usable sidecar.
+    """
+    return _read_fresh(
+        sidecar_path(maf_file_path),
+        maf_file_path,
+        list(usecols) if usecols is not None else None,
+        lambda table: table.to_pandas(),
+    )
+
+
+def _dictionary_codes(column) -> Tuple[np.ndarray, pd.Index]:
+    # Integer codes (-1 for nulls) and labels of a dictionary-encoded column.
+    column = column.unify_dictionaries().combine_chunks()
+    codes = column.indices.fill_null(-1).to_numpy().astype(np.int64)
+    labels = pd.Index(np.asarray(column.dictionary.to_pylist(), dtype=object))
+    return codes, labels
+
+
+def read_ranking_sidecar(maf_file_path: str) -> Optional[tuple]:
+    """
+    Reads the gene ranking index of a MAF file from an up-to-date ranking sidecar.
+
+    Returns:
+        The samples, genes and classifications and the sample, gene and
+        classification codes of the distinct records, in GeneRanking's
+        argument order, or None if there is no usable ranking sidecar.
+    """
+
+    def convert(table):
+        sample_codes, samples = _dictionary_codes(table.column(SAMPLE_COLUMN))
+        gene_codes, genes = _dictionary_codes(table.column(GENE_COLUMN))
+        classification_codes, classifications = _dictionary_codes(
+            table.column(CLASSIFICATION_COLUMN)
+        )
+        return samples, genes, classifications, sample_codes, gene_codes, classification_codes
+
+    return _read_fresh(
+        sidecar_path(maf_file_path, RANKING_SUFFIX), maf_file_path, _RANKING_COLUMNS, convert
+    )
+
+
+def write_ranking_sidecar(maf_file_path: str, ranking) -> str:
+    """
+    Stores the integer-coded distinct records of a gene ranking index of a
+    MAF file, so later runs hand them to GeneRanking without reading the
+    records again. Each column is dictionary-encoded: the codes are the
+    indices and the labels the dictionary.
+
+    Args:
+        maf_file_path: Path to the source MAF file.
+        ranking: GeneRanking built from the current contents of the file.
+
+    Returns:
+        The ranking sidecar path.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    check_sidecar_support()
+    import pyarrow as pa
+
+    metadata = _source_metadata(maf_file_path)
+
+    def encode(codes, labels):
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, type=pa.int32(), mask=codes < 0),
+            pa.array(list(labels), type=pa.string()),
+        )
+
+    table = pa.table(
+        {
+            SAMPLE_COLUMN: encode(ranking.sample_codes, ranking.samples),
+            GENE_COLUMN: encode(ranking.gene_codes, ranking.genes),
+            CLASSIFICATION_COLUMN: encode(ranking.classification_codes, ranking.classifications),
+        }
+    )
+    path = sidecar_path(maf_file_path, RANKING_SUFFIX)
+    _write_table(path, table, metadata)
+    return path
+
+
+def write_sidecar(maf_file_path: str) -> Optional[str]:
+    """
+    Converts the sidecar columns of a MAF file to a dictionary-encoded Arrow file.
+
+    The file is uncompressed Arrow IPC so later loads can memory-map it; the
+    sample, gene and classification columns are stored as integer codes plus
+    one dictionary of distinct values each.
+
+    Returns:
+        The sidecar path, or None if the MAF has none of the sidecar columns.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    check_sidecar_support()
+    import pyarrow as pa
+
+    header, _ = read_maf_header(maf_file_path)
+    columns = [column for column in SIDECAR_COLUMNS if column in header]
+    if not columns:
+        return None
+    metadata = _source_metadata(maf_file_path)
+    maf_df = read_maf(maf_file_path, usecols=columns)
+
+    path = sidecar_path(maf_file_path)
+    _write_table(path, pa.Table.from_pandas(maf_df, preserve_index=False), metadata)
+    return path
+
+
+def read_maf_with_sidecar(
+    maf_file_path: str, usecols: Optional[Iterable[str]] = None
+) -> pd.DataFrame:
+    """
+    Reads a MAF file, preferring an up-to-date binary sidecar over the text.
+
+    When sidecars are enabled and the requested columns are all sidecar
+    columns, a missing or stale sidecar is (re)built first.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        usecols: Columns to load. All columns when omitted.
+
+    Returns:
+        The MAF records.
+    """
+    usecols = list(usecols) if usecols is not None else None
+    if usecols is None or not set(usecols) <= set(SIDECAR_COLUMNS):
+        return read_maf(maf_file_path, usecols=usecols)
+
+    maf_df = read_sidecar(maf_file_path, usecols)
+    if maf_df is not None:
+        return maf_df
+    global _write_enabled
+    if _write_enabled:
+        check_columns(maf_file_path, usecols)
+        try:
+            written = write_sidecar(maf_file_path)
+        except ImportError as e:
+            # Enabled through MAF_AI_SIDECAR without pyarrow: say so once
+            warnings.warn(str(e))
+            _write_enabled = False
+            written = None
+        except OSError:
+            written = None
+        if written:
+            maf_df = read_sidecar(maf_file_path, usecols)
+            if maf_df is not None:
+                return maf_df
+    return read_maf(maf_file_path, usecols=usecols)
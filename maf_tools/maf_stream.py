@@ -0,0 +1,133 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Rows per chunk when a tool streams a MAF file instead of loading it whole.
+DEFAULT_CHUNKSIZE = 250_000
+
+# Distinct (gene, sample, classification) records are packed into one int64:
+# classification + 1 in the low 12 bits, the sample in the next 28 and the gene
+# above.
+_CLASSIFICATION_BITS = 12
+_SAMPLE_BITS = 28
+
+
+def sort_counts(counts: pd.Series) -> pd.Series:
+    """
+    Orders counts from most to least frequent, breaking ties by label.
+
+    Used instead of the order of ``value_counts`` so that in-memory and
+    streamed results rank equal counts the same way. Zero counts (unused
+    categories) are dropped.
+    """
+    counts = counts[counts > 0]
+    order = np.lexsort(
+        (np.asarray(counts.index, dtype=object), -counts.to_numpy(dtype=np.int64))
+    )
+    return pd.Series(
+        counts.to_numpy(dtype=np.int64)[order],
+        index=pd.Index(np.asarray(counts.index, dtype=object)[order]),
+        name="count",
+    )
+
+
+def pack_records(
+    gene_codes: np.ndarray, sample_codes: np.ndarray, classification_codes: np.ndarray
+) -> np.ndarray:
+    """
+    Packs (gene, sample, classification) codes into int64 keys that sort by
+    gene, then sample. A classification code of -1 means none.
+    """
+    return (
+        (gene_codes << (_SAMPLE_BITS + _CLASSIFICATION_BITS))
+        | (sample_codes << _CLASSIFICATION_BITS)
+        | (classification_codes + 1)
+    )
+
+
+def unpack_records(records: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the gene, sample and classification codes of packed keys.
+    """
+    return (
+        records >> (_SAMPLE_BITS + _CLASSIFICATION_BITS),
+        (records >> _CLASSIFICATION_BITS) & ((1 << _SAMPLE_BITS) - 1),
+        (records & ((1 << _CLASSIFICATION_BITS) - 1)) - 1,
+    )
+
+
+class SortedKeys:
+    """
+    A set of distinct int64 keys, kept as sorted runs each at least twice as
+    long as the next. New keys form a run that is merged only with the
+    shorter runs after it, so each key is copied O(log n) times in all
+    rather than the whole set being copied on every insert, and a lookup is
+    a binary search per run.
+    """
+
+    def __init__(self, keys: Optional[np.ndarray] = None):
+        self.runs: List[np.ndarray] = [] if keys is None or not len(keys) else [keys]
+
+    def add(self, keys: np.ndarray) -> np.ndarray:
+        """
+        Adds keys.
+
+        Returns:
+            The keys that were not present yet, sorted.
+        """
+        novel = np.unique(keys)
+        for run in self.runs:
+            positions = np.searchsorted(run, novel)
+            present = np.zeros(len(novel), dtype=bool)
+            in_range = positions < len(run)
+            present[in_range] = run[positions[in_range]] == novel[in_range]
+            novel = novel[~present]
+        run = novel
+        while self.runs and len(self.runs[-1]) < 2 * len(run):
+            run = np.sort(np.concatenate([self.runs.pop(), run]))
+        if len(run):
+            self.runs.append(run)
+        return novel
+
+    def range(self, low: int, high: int) -> np.ndarray:
+        """
+        Returns the keys in [low, high).
+        """
+        parts = [run[np.searchsorted(run, low) : np.searchsorted(run, high)] for run in self.runs]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def values(self) -> np.ndarray:
+        """
+        Returns all keys, sorted, merging the runs into one.
+        """
+        if len(self.runs) > 1:
+            self.runs = [np.sort(np.concatenate(self.runs))]
+        return self.runs[0] if self.runs else np.empty(0, dtype=np.int64)
+
+
+class Labels:
+    """
+    Integer codes of labels (samples, genes, classifications) in order of first appearance.
+    """
+
+    def __init__(self, names: Iterable[str] = ()):
+        self.names: List[str] = list(names)
+        self.codes: Dict[str, int] = {name: code for code, name in enumerate(self.names)}
+
+    def encode(self, values: pd.Series) -> np.ndarray:
+        """
+        Returns the code of each value, adding new labels; missing values get -1.
+        """
+        value_codes, uniques = pd.factorize(values)
+        label_codes = np.full(len(uniques) + 1, -1, dtype=np.int64)
+        for position, name in enumerate(uniques):
+            code = self.codes.get(name)
+            if code is None:
+                code = self.codes[name] = len(self.names)
+                self.names.append(name)
+            label_codes[position] = code
+        return label_codes[value_codes]
+
+    def __len__(self) -> int:
+        return len(self.codes)
@@ -1,63 +1,92 @@
-import pandas as pd
-from typing import Type
+from typing import Optional, Type
 from crewai.tools import BaseTool  # Ensure this is the correct BaseTool
 from pydantic import BaseModel, Field
+from maf_tools.analyses import summarize_maf
+from maf_tools.cohort_summary import DEFAULT_TOP_N
 
 
 # Define the input schema for the tool
 class MAFSummarizerInput(BaseModel):
     maf_file_path: str = Field(..., description="Path to the MAF file.")
+    chunksize: Optional[int] = Field(
+        None,
+        description="Stream the MAF file in chunks of this many rows instead of loading it into memory.",
+    )
+    output_format: str = Field(
+        "text", description="'text' for a readable summary or 'json' for structured data."
+    )
+    top_n: int = Field(
+        DEFAULT_TOP_N, description="Number of most frequently mutated genes to list."
+    )
+    capture_size_mb: Optional[float] = Field(
+        None,
+        description="Size of the sequenced region in megabases, to report mutation burden as mutations/Mb.",
+    )
+    incremental: bool = Field(
+        False,
+        description="Keep the cohort state next to the MAF file and read only rows appended since the last run.",
+    )
+    delta_maf_file_path: Optional[str] = Field(
+        None, description="MAF file with new rows for the cohort (implies incremental)."
+    )
 
 
 class MAFSummarizer(BaseTool):
     name: str = "maf_summarizer"
     description: str = (
         "Summarizes a MAF file, returning key statistics like number of samples, genes, "
-        "and variant classifications. The input should be a dictionary with the key "
-        "'maf_file_path' pointing to the path of the MAF file."
+        "variant classifications, mutation burden per sample, variant types, SNV classes "
+        "and the most frequently mutated genes. The input should be a dictionary with the key "
+        "'maf_file_path' pointing to the path of the MAF file; set 'output_format' to 'json' "
+        "for structured output."
     )
     args_schema: Type[BaseModel] = MAFSummarizerInput  # Specify the input schema
 
-    def _run(self, maf_file_path: str) -> str:
+    def _run(
+        self,
+        maf_file_path: str,
+        chunksize: Optional[int] = None,
+        output_format: str = "text",
+        top_n: int = DEFAULT_TOP_N,
+        capture_size_mb: Optional[float] = None,
+        incremental: bool = False,
+        delta_maf_file_path: Optional[str] = None,
+    ) -> str:
         """
         Reads a MAF file and returns a summary.
 
         Args:
             maf_file_path: Path to the MAF file.
+            chunksize: If set, stream the file in chunks of this many rows.
+            output_format: "text" or "json".
+            top_n: Number of most frequently mutated genes to list.
+            capture_size_mb: Capture size, to report mutation burden per megabase.
+            incremental: Read only the rows appended since the last run.
+            delta_maf_file_path: MAF file with new rows for the cohort.
 
         Returns:
             A summary of the MAF file.
         """
-        try:
-            # Read the MAF file
-            maf_df = pd.read_csv(
-                maf_file_path, sep="\t", comment="#"
-            )  # Adjust separator and comment character if needed
-
-            # Calculate statistics
-            sample_count = maf_df["Tumor_Sample_Barcode"].nunique()
-            gene_count = maf_df["Hugo_Symbol"].nunique()
-            variant_classifications = (
-                maf_df["Variant_Classification"].value_counts().to_dict()
-            )
-
-            # Create summary
-            summary = (
-                f"MAF Summary:\n"
-                f"  Number of Samples: {sample_count}\n"
-                f"  Number of Genes: {gene_count}\n"
-                f"  Variant Classifications: {variant_classifications}"
-            )
-            return summary
-
-        except FileNotFoundError:
-            return f"Error: MAF file not found at {maf_file_path}"
-        except KeyError as e:
-            return f"Error: Required column not found in MAF file: {e}"
-        except Exception as e:
-            return f"Error summarizing MAF file: {e}"
+        return summarize_maf(
+            maf_file_path,
+            chunksize,
+            output_format,
+            top_n,
+            capture_size_mb,
+            incremental,
+            delta_maf_file_path,
+        )
 
-    async def _arun(self, maf_file_path: str):
+    async def _arun(
+        self,
+        maf_file_path: str,
+        chunksize: Optional[int] = None,
+        output_format: str = "text",
+        top_n: int = DEFAULT_TOP_N,
+        capture_size_mb: Optional[float] = None,
+        incremental: bool = False,
+        delta_maf_file_path: Optional[str] = None,
+    ):
         """
         Asynchronous execution is not supported.
         """
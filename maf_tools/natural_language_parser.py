@@ -1,8 +1,9 @@
-from typing import Type
+from typing import Any, Optional, Type
 from crewai.tools import BaseTool
-from langchain_openai import OpenAI
 from pydantic import BaseModel, Field
 import json
+from maf_tools.llm_cache import CachedLLM, get_planner_llm
+from maf_tools.planner import DEFAULT_MIN_CONFIDENCE, rule_based_plan
 
 # Define the input schema for the tool
 class NaturalLanguageParserInput(BaseModel):
@@ -25,6 +26,12 @@ class NaturalLanguageParser(BaseTool):
     args_schema: Type[BaseModel] = (
         NaturalLanguageParserInput  # Specify the input schema
     )
+    # Model used for planning, anything with an ``invoke(prompt)`` method.
+    # Defaults to the shared, cached OpenAI planner.
+    llm: Optional[Any] = None
+    # Plan routine instructions with local rules; the LLM handles the rest.
+    use_rules: bool = True
+    min_confidence: float = DEFAULT_MIN_CONFIDENCE
 
     def _run(self, instruction: str) -> str:
         """
@@ -34,11 +41,19 @@ class NaturalLanguageParser(BaseTool):
             instruction: The natural language instruction to parse.
 
         Returns:
-            A JSON-formatted string containing the plan of action.
+            A JSON-formatted string containing the plan of action. Its
+            "planner" key tells whether the rules or the LLM produced it.
         """
         try:
-            # Use the LLM to generate a plan
-            llm = OpenAI(model_name="gpt-4o-mini",temperature=0.3)  # Lower temperature for deterministic output
+            if self.use_rules:
+                plan = rule_based_plan(instruction, self.min_confidence)
+                if plan is not None:
+                    return json.dumps(plan)
+
+            # Use the LLM to generate a plan; responses are cached per prompt
+            llm = self.llm or get_planner_llm()
+            if not isinstance(llm, CachedLLM):
+                llm = CachedLLM(llm)
 
             prompt = f"""
             You are an expert in cancer genomics analysis. Given the following instruction, create a plan of action with specific steps to achieve the goal. 
@@ -49,11 +64,13 @@ class NaturalLanguageParser(BaseTool):
             JSON Plan:
             """
 
-            plan = llm.invoke(prompt)
+            plan = llm.invoke(prompt, instruction=instruction)
 
         # Attempt to load the plan as JSON
             try:
                 plan_json = json.loads(plan)
+                if isinstance(plan_json, dict):
+                    plan_json.setdefault("planner", "llm")
                 return json.dumps(plan_json)  # Return as a string
             except json.JSONDecodeError as e:
                 return f"Error: Could not parse plan as JSON. Original LLM output: {plan}. Error: {e}"
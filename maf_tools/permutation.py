@@ -0,0 +1,200 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.defaults import DEFAULT_PERMUTATIONS
+from maf_tools.fisher import fisher_exact_batch
+from maf_tools.incidence import INTERACTION_COLUMNS, IncidenceMatrix
+
+# Permutations per independent chain. Chains, not workers, get their own seed,
+# so results for a given seed do not depend on the number of workers.
+CHAIN_LENGTH = 500
+# Curveball passes (each pass trades within one random pairing of the rows)
+# before the first sample of a chain, and between consecutive samples.
+BURN_IN_PASSES = 10
+THINNING_PASSES = 1
+
+
+def curveball_pass(matrix: np.ndarray, rng: np.random.Generator) -> None:
+    """
+    Runs one pass of the curveball algorithm on a boolean matrix, in place.
+
+    Rows are paired at random and each pair trades the columns in which
+    exactly one of the two rows is set: those columns are shuffled between the
+    two rows while each row keeps its count. Row and column sums are preserved,
+    and all pairs are traded at once.
+    """
+    n_rows, n_cols = matrix.shape
+    order = rng.permutation(n_rows)
+    half = n_rows // 2
+    first, second = order[:half], order[half : 2 * half]
+    a, b = matrix[first], matrix[second]
+
+    # Tradable entries as (pair, column), grouped by pair.
+    pair, column = np.divmod(np.flatnonzero(a ^ b), n_cols)
+    if len(pair) == 0:
+        return
+    a_only = np.bincount(pair, weights=a[pair, column], minlength=half).astype(np.int64)
+    group_start = np.concatenate(([0], np.cumsum(np.bincount(pair, minlength=half))[:-1]))
+
+    # Shuffle the entries within each pair; row ``a`` gets back as many as it
+    # had, taken from the front of the shuffled group.
+    shuffled = np.argsort(pair + rng.random(len(pair)))
+    rank = np.arange(len(pair)) - group_start[pair]
+    to_a = np.zeros(len(pair), dtype=bool)
+    to_a[shuffled[rank < a_only[pair]]] = True
+
+    shared = a & b
+    a, b = shared, shared.copy()
+    a[pair[to_a], column[to_a]] = True
+    b[pair[~to_a], column[~to_a]] = True
+    matrix[first] = a
+    matrix[second] = b
+
+
+def _pair_counts(x: np.ndarray, i: np.ndarray, j: np.ndarray) -> np.ndarray:
+    # float32 BLAS is exact for counts below 2**24.
+    return np.rint((x.T @ x)[i, j]).astype(np.int64)
+
+
+def _run_chain(
+    matrix: np.ndarray,
+    n_permutations: int,
+    seed: np.random.SeedSequence,
+    observed: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Samples one curveball chain and compares every pair with its observed count.
+
+    Returns:
+        Per pair: the number of permutations with a co-mutation count at least
+        and at most the observed one, and the sum of permuted counts.
+    """
+    rng = np.random.default_rng(seed)
+    matrix = matrix.astype(bool)
+    i, j = np.triu_indices(matrix.shape[1], k=1)
+    x = np.empty(matrix.shape, dtype=np.float32)
+    greater = np.zeros(len(i), dtype=np.int64)
+    less = np.zeros(len(i), dtype=np.int64)
+    total = np.zeros(len(i), dtype=np.int64)
+
+    for _ in range(BURN_IN_PASSES):
+        curveball_pass(matrix, rng)
+    for _ in range(n_permutations):
+        for _ in range(THINNING_PASSES):
+            curveball_pass(matrix, rng)
+        np.copyto(x, matrix)
+        counts = _pair_counts(x, i, j)
+        greater += counts >= observed
+        less += counts <= observed
+        total += counts
+    return greater, less, total
+
+
+def permutation_pvalues(
+    incidence: IncidenceMatrix,
+    n_permutations: int = DEFAULT_PERMUTATIONS,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Computes empirical co-mutation p-values under a burden-preserving null model.
+
+    Null matrices are sampled with the curveball algorithm, which keeps both
+    the number of mutated genes per sample and the number of mutated samples
+    per gene fixed, so hypermutated samples do not create co-occurrences by
+    themselves. Permutations are split into independent chains, spread over
+    worker processes; each chain's seed is spawned from ``seed``.
+
+    Args:
+        incidence: Sample x gene incidence matrix.
+        n_permutations: Number of null matrices to sample.
+        seed: Seed for reproducible results.
+        workers: Number of worker processes. Defaults to MAF_AI_PERMUTATION_WORKERS,
+            or the number of CPUs.
+
+    Returns:
+        Per gene pair (i, j) with i < j: the observed co-mutation count, the
+        two-sided empirical p-value and the mean count under the null model.
+    """
+    x = incidence.matrix.astype(np.float32)
+    i, j = np.triu_indices(len(incidence.genes), k=1)
+    observed = _pair_counts(x, i, j)
+    if len(i) == 0 or n_permutations <= 0:
+        return observed, np.ones(len(i)), observed.astype(float)
+
+    # Samples mutated in none or all of the genes never trade; they add the
+    # same amount to observed and permuted counts, so leave them out.
+    row_sums = incidence.matrix.sum(axis=1)
+    matrix = incidence.matrix[(row_sums > 0) & (row_sums < incidence.matrix.shape[1])]
+    fixed = observed - _pair_counts(matrix.astype(np.float32), i, j)
+
+    lengths = [CHAIN_LENGTH] * (n_permutations // CHAIN_LENGTH)
+    if n_permutations % CHAIN_LENGTH:
+        lengths.append(n_permutations % CHAIN_LENGTH)
+    seeds = np.random.SeedSequence(seed).spawn(len(lengths))
+    workers = workers or int(os.environ.get("MAF_AI_PERMUTATION_WORKERS", 0))
+    workers = min(workers or os.cpu_count() or 1, len(lengths))
+    args = [(matrix, length, chain_seed, observed - fixed) for length, chain_seed in zip(lengths, seeds)]
+    if workers == 1 or len(matrix) < 2:
+        results = [_run_chain(*chain_args) for chain_args in args]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_run_chain, *zip(*args)))
+
+    greater = sum(result[0] for result in results)
+    less = sum(result[1] for result in results)
+    total = sum(result[2] for result in results)
+    # Two-sided p-value from the smaller tail, counting the observed matrix.
+    tail = np.minimum(greater, less)
+    pvalues = np.minimum(1.0, 2 * (tail + 1) / (n_permutations + 1))
+    return observed, pvalues, fixed + total / n_permutations
+
+
+def permutation_interactions(
+    incidence: IncidenceMatrix,
+    n_permutations: int = DEFAULT_PERMUTATIONS,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Tests every pair of genes against the curveball null model.
+
+    Returns the same columns as ``pairwise_interactions``, with pValue the
+    empirical p-value. Event compares the observed co-mutation count with its
+    mean under the null model, so it accounts for mutation burden too.
+
+    Args:
+        incidence: Sample x gene incidence matrix.
+        n_permutations: Number of null matrices to sample.
+        seed: Seed for reproducible results.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        A DataFrame with one row per gene pair.
+    """
+    n11, pvalues, null_mean = permutation_pvalues(incidence, n_permutations, seed, workers)
+    mutated = incidence.mutated_counts()
+    i, j = np.triu_indices(len(incidence.genes), k=1)
+    n10 = mutated[i] - n11
+    n01 = mutated[j] - n11
+    n00 = incidence.n_samples - n11 - n10 - n01
+    oddsratios, _ = fisher_exact_batch(n11, n10, n01, n00)
+
+    return pd.DataFrame(
+        {
+            "gene1": incidence.genes[i],
+            "gene2": incidence.genes[j],
+            "pValue": pvalues,
+            "oddsRatio": oddsratios,
+            "00": n00,
+            "01": n01,
+            "11": n11,
+            "10": n10,
+            "Event": np.where(n11 > null_mean, "Co_Occurence", "Mutually_Exclusive"),
+        },
+        columns=INTERACTION_COLUMNS,
+    )
@@ -0,0 +1,212 @@
+import json
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from maf_tools.analyses import drug_gene_interactions, somatic_interactions, summarize_maf
+from maf_tools.cohort_summary import OPTIONAL_COLUMNS
+from maf_tools.dag_executor import TaskGraph
+from maf_tools.defaults import (
+    DEFAULT_NUM_GENES,
+    DEFAULT_NUM_INTERACTIONS,
+    DEFAULT_PERMUTATIONS,
+    DEFAULT_PVALUE_CUTOFF,
+    DEFAULT_TOP_N,
+)
+from maf_tools.maf_cache import load_maf
+from maf_tools.maf_reader import (
+    CLASSIFICATION_COLUMN,
+    GENE_COLUMN,
+    SAMPLE_COLUMN,
+    read_maf_header,
+)
+from maf_tools.report import render_report
+
+# Columns read by any of the pipeline's tools, loaded once up front.
+PIPELINE_COLUMNS = [SAMPLE_COLUMN, GENE_COLUMN, CLASSIFICATION_COLUMN]
+
+
+# Analysis tasks, in report order, with the report section they fill.
+ANALYSIS_SECTIONS = {
+    "summary": "MAF Summary",
+    "somatic_interactions": "Somatic Interactions",
+    "drug_gene_interactions": "Drug-Gene Interactions",
+}
+
+# Keywords identifying each task in the steps of a natural language plan.
+_STEP_KEYWORDS: List[Tuple[str, Tuple[str, ...]]] = [
+    ("drug_gene_interactions", ("drug", "therapeutic")),
+    ("somatic_interactions", ("somatic", "co-occur", "mutually exclusive", "exclusivity")),
+    ("summary", ("summar",)),
+    ("report", ("report",)),
+]
+
+
+def plan_tasks(plan: dict) -> Tuple[List[str], List[str]]:
+    """
+    Maps the steps of a plan from NaturalLanguageParser to pipeline tasks.
+
+    Args:
+        plan: The parsed plan, with a "steps" list.
+
+    Returns:
+        The task names, in report order, and the steps that match no task.
+    """
+    tasks, unknown = set(), []
+    for step in plan.get("steps", []):
+        text = (step if isinstance(step, str) else json.dumps(step)).lower()
+        for task, keywords in _STEP_KEYWORDS:
+            if any(keyword in text for keyword in keywords):
+                tasks.add(task)
+                break
+        else:
+            unknown.append(step)
+    ordered = [task for task in [*ANALYSIS_SECTIONS, "report"] if task in tasks]
+    return ordered, unknown
+
+
+def _report_errors(func: Callable[[], str]) -> Callable[..., str]:
+    # Failed analyses become report text instead of cancelling the report.
+    def run(**_):
+        try:
+            return func()
+        except Exception as e:
+            return f"Error: {e}"
+
+    return run
+
+
+def _preload(maf_file_path: str) -> None:
+    try:
+        # Include the optional summary columns, so the summary reuses this parse.
+        header, _ = read_maf_header(maf_file_path)
+        optional = [column for column in OPTIONAL_COLUMNS if column in header]
+        load_maf(maf_file_path, columns=PIPELINE_COLUMNS + optional)
+    except (OSError, KeyError, ValueError):
+        # Each tool reports the problem in its own output.
+        pass
+
+
+def build_graph(
+    maf_file_path: str,
+    tasks: Sequence[str] = tuple(ANALYSIS_SECTIONS),
+    report: bool = True,
+    top_n: int = DEFAULT_TOP_N,
+    pvalue_cutoff: float = DEFAULT_PVALUE_CUTOFF,
+    num_genes: int = DEFAULT_NUM_GENES,
+    num_interactions: int = DEFAULT_NUM_INTERACTIONS,
+    chunksize: Optional[int] = None,
+    drug_gene_tool: Optional[Any] = None,
+    method: str = "fisher",
+    permutations: int = DEFAULT_PERMUTATIONS,
+    seed: Optional[int] = None,
+    exclude_classifications: Optional[Sequence[str]] = None,
+    dgidb_client: Optional[Any] = None,
+) -> TaskGraph:
+    """
+    Builds the task graph of an analysis run.
+
+    The MAF file is parsed once by a "load_maf" task that every analysis
+    depends on, so the tools share one cached copy instead of racing to load
+    different column subsets. The analyses are independent of each other and
+    the "report" task depends on all of them.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        tasks: Analysis tasks to run (keys of ANALYSIS_SECTIONS).
+        report: Whether to add the report task.
+        top_n: Number of top mutated genes for the somatic interaction analysis.
+        pvalue_cutoff: Adjusted p-value cutoff for somatic interactions.
+        num_genes: Number of top mutated genes to look up in DGIdb.
+        num_interactions: Number of top DGIdb interactions per gene.
+        chunksize: If set, every tool streams the file in chunks of this many rows.
+        drug_gene_tool: DrugGeneInteractionTool used for DGIdb lookups instead
+            of ``dgidb_client``.
+        method: Somatic interaction test, "fisher" or "permutation".
+        permutations: Number of permutations for the permutation method.
+        seed: Random seed for the permutation method.
+        exclude_classifications: Variant classifications to ignore when
+            ranking genes (e.g. Silent).
+        dgidb_client: DGIdb backend (a DGIdbClient or DGIdbSnapshot). Defaults
+            to the shared backend.
+
+    Returns:
+        The task graph.
+    """
+    unknown = [task for task in tasks if task not in ANALYSIS_SECTIONS]
+    if unknown:
+        raise ValueError(f"Unknown analysis tasks: {', '.join(unknown)}")
+    exclude = list(exclude_classifications) if exclude_classifications else None
+    if drug_gene_tool is not None:
+        drug_gene_run = drug_gene_tool._run
+    else:
+        drug_gene_run = partial(drug_gene_interactions, client=dgidb_client)
+    # The analyses run as plain functions, so the pipeline never imports CrewAI.
+    steps = {
+        "summary": lambda: summarize_maf(maf_file_path, chunksize),
+        "somatic_interactions": lambda: somatic_interactions(
+            maf_file_path,
+            top_n,
+            pvalue_cutoff,
+            chunksize,
+            method,
+            permutations,
+            seed,
+            exclude,
+        ),
+        "drug_gene_interactions": lambda: drug_gene_run(
+            maf_file_path, num_genes, num_interactions, chunksize, exclude
+        ),
+    }
+
+    graph = TaskGraph()
+    load_dependencies = []
+    if not chunksize:
+        graph.add("load_maf", lambda: _preload(maf_file_path))
+        load_dependencies = ["load_maf"]
+    for task in tasks:
+        graph.add(task, _report_errors(steps[task]), depends_on=load_dependencies)
+    if report:
+        graph.add(
+            "report",
+            lambda **results: render_report(
+                {ANALYSIS_SECTIONS[task]: output for task, output in results.items()}
+            ),
+            depends_on=tasks,
+        )
+    return graph
+
+
+def run_analyses(maf_file_path: str, **kwargs) -> Dict[str, str]:
+    """
+    Runs the summary, somatic interaction and drug-gene analyses concurrently.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        **kwargs: Analysis parameters, see ``build_graph``.
+
+    Returns:
+        The tool outputs keyed by report section.
+    """
+    results = build_graph(maf_file_path, report=False, **kwargs).run()
+    return {
+        section: results[task]
+        for task, section in ANALYSIS_SECTIONS.items()
+        if task in results
+    }
+
+
+def run_pipeline(maf_file_path: str, **kwargs) -> str:
+    """
+    Runs all analyses without an LLM and renders the Markdown report.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        **kwargs: Analysis parameters, see ``build_graph``.
+
+    Returns:
+        The Markdown report.
+    """
+    report = build_graph(maf_file_path, **kwargs).run()["report"]
+    if isinstance(report, Exception):
+        return f"Error generating report: {report}"
+    return report
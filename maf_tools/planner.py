@@ -0,0 +1,115 @@
+import re
+from typing import Any, Dict, Optional
+
+# Plan steps understood by TaskDelegator, in execution order.
+SUMMARIZE_STEP = "Summarize MAF file"
+SOMATIC_STEP = "Perform somatic interaction analysis"
+DRUG_GENE_STEP = "Identify drug-gene interactions"
+ALL_STEPS = [SUMMARIZE_STEP, SOMATIC_STEP, DRUG_GENE_STEP]
+
+# Analysis parameters a plan may set (see pipeline.build_graph).
+PLAN_PARAMETERS = ("top_n", "pvalue_cutoff", "num_genes", "num_interactions")
+
+# Plans matched with less confidence than this are left to the LLM.
+DEFAULT_MIN_CONFIDENCE = 0.75
+
+_INTENT_RULES = [
+    (
+        SUMMARIZE_STEP,
+        re.compile(
+            r"\b(summar\w*|overview|statistics|stats|describe|how many|"
+            r"variant classifications?|number of (samples|genes))\b"
+        ),
+    ),
+    (
+        SOMATIC_STEP,
+        re.compile(
+            r"\b(somatic|co-?occurr?\w*|mutual(ly)?[ -]exclusiv\w*|exclusivity|"
+            r"gene[ -](gene|pair)s?|fisher|(?<!drug-gene )(?<!drug )interactions? between)\b"
+        ),
+    ),
+    (
+        DRUG_GENE_STEP,
+        re.compile(
+            r"\b(drugs?|therapeutic|therap(y|ies)|druggable|actionable|treatments?|"
+            r"targets?|dgidb|inhibitors?)\b"
+        ),
+    ),
+]
+
+# Instructions asking for the whole workflow.
+_FULL_ANALYSIS = re.compile(
+    r"\b(analy[sz]e|analysis of) (the |this |my )?(maf|mutation|cohort)|"
+    r"\b(full|complete|comprehensive|end-to-end) (analysis|report|workflow)\b"
+)
+
+# Requests the tools cannot serve; any of these sends the instruction to the LLM.
+_UNSUPPORTED = re.compile(
+    r"\b(survival|plots?|figures?|visuali[sz]\w*|signatures?|pathways?|"
+    r"compare|comparison|clinical|expression|copy[ -]number|cnv|fusions?|"
+    r"oncoplot|lollipop|enrichment|clonal\w*|subclon\w*)\b"
+)
+
+_NUMBER = r"(\d+(?:\.\d+)?(?:e-?\d+)?)"
+_PARAMETER_RULES = [
+    ("top_n", re.compile(r"\btop[ -](\d+)\s+(?:most\s+)?(?:frequently\s+)?(?:mutated\s+)?genes\b"), int),
+    ("top_n", re.compile(r"\b(\d+)\s+(?:most\s+)?(?:frequently\s+)?mutated genes\b"), int),
+    (
+        "pvalue_cutoff",
+        re.compile(
+            r"\b(?:p|p-?val(?:ue)?|q|q-?val(?:ue)?|fdr|padj|adjusted p-?value)\s*"
+            r"(?:<=?|of|cutoff(?: of)?|threshold(?: of)?|below|under|=)\s*" + _NUMBER
+        ),
+        float,
+    ),
+    ("num_interactions", re.compile(r"\b(?:top[ -])?(\d+)\s+(?:drugs|interactions)\s+per gene\b"), int),
+    ("num_genes", re.compile(r"\bdrugs? for (?:the )?top[ -](\d+)\s+genes\b"), int),
+]
+
+
+def rule_based_plan(
+    instruction: str, min_confidence: float = DEFAULT_MIN_CONFIDENCE
+) -> Optional[Dict[str, Any]]:
+    """
+    Plans an instruction with keyword rules, without calling an LLM.
+
+    Each step is matched by intent keywords ("summarize", "co-occurrence",
+    "therapeutic targets", ...). Requests for the whole analysis map to all
+    three steps. Parameters such as "top 50 genes" or "p < 0.01" are
+    extracted too. Instructions mentioning analyses the tools do not offer
+    (survival, pathways, plots, ...) lower the confidence.
+
+    Args:
+        instruction: The natural language instruction.
+        min_confidence: Minimum confidence for the rules to answer.
+
+    Returns:
+        The plan, with "steps", "parameters", "planner" and "confidence" keys,
+        or None when the instruction should go to the LLM.
+    """
+    text = instruction.lower()
+    steps = [step for step, pattern in _INTENT_RULES if pattern.search(text)]
+    matched = len(steps)
+    if _FULL_ANALYSIS.search(text):
+        steps = list(ALL_STEPS)
+        matched += 1
+
+    parameters: Dict[str, Any] = {}
+    for name, pattern, parse in _PARAMETER_RULES:
+        match = pattern.search(text)
+        if match and name not in parameters:
+            parameters[name] = parse(match.group(1))
+    if "top_n" in parameters and DRUG_GENE_STEP in steps and SOMATIC_STEP not in steps:
+        # "drug targets in the top 10 genes" is about the DGIdb lookup.
+        parameters.setdefault("num_genes", parameters.pop("top_n"))
+
+    unsupported = len(_UNSUPPORTED.findall(text))
+    confidence = matched / (matched + unsupported) if matched else 0.0
+    if not steps or confidence < min_confidence:
+        return None
+    return {
+        "steps": [step for step in ALL_STEPS if step in steps],
+        "parameters": parameters,
+        "planner": "rules",
+        "confidence": round(confidence, 3),
+    }
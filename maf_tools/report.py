@@ -0,0 +1,109 @@
+from typing import Any, Dict
+
+from maf_tools.tool_output import loads, markdown_table
+
+# Report headers of the drug-gene JSON table columns.
+DRUG_GENE_HEADERS = {
+    "gene": "Gene",
+    "drug": "Drug",
+    "types": "Interaction Type",
+    "sources": "Sources",
+}
+
+
+def _render_somatic_interactions(payload: Dict[str, Any]) -> str:
+    if not payload["rows"]:
+        return "No significant somatic interactions found.\n\n"
+    section = ""
+    if "pairs_tested" in payload:
+        section += (
+            f"{payload['significant']} of {payload['pairs_tested']} gene pairs significant "
+            f"({payload.get('method', 'fisher')}, adjusted p < {payload['pvalue_cutoff']}).\n\n"
+        )
+    section += markdown_table(payload["columns"], payload["rows"])
+    if payload.get("truncated"):
+        section += f"\n_{payload['truncated']} less significant pairs not shown._\n"
+    return section + "\n"
+
+
+def _render_drug_gene_interactions(payload: Dict[str, Any]) -> str:
+    section = ""
+    if payload["rows"]:
+        headers = [DRUG_GENE_HEADERS.get(column, column) for column in payload["columns"]]
+        section += markdown_table(headers, payload["rows"])
+        if payload.get("truncated"):
+            section += f"\n_{payload['truncated']} more interactions not shown._\n"
+    else:
+        section += "No drug-gene interactions found for the specified genes.\n"
+    if payload.get("no_interactions"):
+        section += f"\nNo interactions found: {', '.join(payload['no_interactions'])}\n"
+    for gene, error in payload.get("errors", {}).items():
+        section += f"\n{gene}: {error}\n"
+    return section + "\n"
+
+
+def render_report(inputs: Dict[str, str]) -> str:
+    """
+    Renders the Markdown report from the outputs of the analysis tools.
+
+    Args:
+        inputs: Tool outputs keyed by "MAF Summary", "Somatic Interactions"
+            and "Drug-Gene Interactions".
+
+    Returns:
+        The Markdown report.
+    """
+    try:
+        # Extract inputs
+        maf_summary = inputs.get("MAF Summary", "No MAF summary available.")
+        somatic_interactions = inputs.get(
+            "Somatic Interactions", "No somatic interactions available."
+        )
+        drug_gene_interactions = inputs.get(
+            "Drug-Gene Interactions", "No drug-gene interactions available."
+        )
+
+        # Generate the report
+        report = "# Comprehensive MAF Analysis Report\n\n"
+
+        # Add MAF Summary
+        report += "## MAF Summary\n\n"
+        report += f"```\n{maf_summary}\n```\n\n"
+
+        # Add Somatic Interactions, from the JSON table when the tool returned one
+        report += "## Somatic Interactions\n\n"
+        payload = loads(somatic_interactions)
+        if payload is not None and "rows" in payload:
+            report += _render_somatic_interactions(payload)
+        else:
+            report += "| Gene1 | Gene2 | pValue |\n"
+            report += "|-------|-------|--------|\n"
+            for line in somatic_interactions.split("\n"):
+                if line.strip():
+                    report += f"| {line.replace(',', ' | ')} |\n"
+            report += "\n"
+
+        # Add Drug-Gene Interactions
+        report += "## Drug-Gene Interactions\n\n"
+        payload = loads(drug_gene_interactions)
+        if payload is not None and "rows" in payload:
+            report += _render_drug_gene_interactions(payload)
+        else:
+            report += "| Gene | Drug | Interaction Type | Sources |\n"
+            report += "|------|------|------------------|---------|\n"
+            for line in drug_gene_interactions.split("\n"):
+                if line.strip():
+                    report += f"| {line.replace(',', ' | ')} |\n"
+            report += "\n"
+
+        # Add Conclusion
+        report += "## Conclusion\n\n"
+        report += (
+            "This report summarizes the results of the MAF analysis, including the MAF file summary, "
+            "somatic interaction analysis, and drug-gene interactions. The findings provide valuable insights "
+            "into potential therapeutic targets and their clinical relevance.\n"
+        )
+
+        return report
+    except Exception as e:
+        return f"Error generating report: {e}"
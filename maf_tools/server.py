@@ -0,0 +1,360 @@
+import inspect
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from maf_tools.analyses import drug_gene_interactions, somatic_interactions, summarize_maf
+from maf_tools.cohort_summary import summarize_cohort
+from maf_tools.defaults import (
+    DEFAULT_NUM_GENES,
+    DEFAULT_NUM_INTERACTIONS,
+    DEFAULT_PVALUE_CUTOFF,
+    DEFAULT_TOP_N,
+)
+from maf_tools.dgidb_client import DGIdbLookup
+from maf_tools.gene_ranking import gene_ranking
+from maf_tools.maf_cache import file_key, get_maf_cache
+
+# Long-running analysis service. The analysis modules, the parsed MAF files
+# (through the process-wide caches) and the DGIdb lookups stay in memory
+# between requests, so a repeated request for a cohort is answered without
+# re-reading the file or querying DGIdb.
+
+DEFAULT_HOST = os.environ.get("MAF_AI_SERVE_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("MAF_AI_SERVE_PORT", 8765))
+
+# Responses kept per (endpoint, MAF file version, parameters), and DGIdb
+# lookups kept per (gene, num_interactions). Both evict least recently used.
+DEFAULT_RESULT_CACHE_SIZE = int(os.environ.get("MAF_AI_SERVE_RESULT_CACHE_SIZE", 256))
+DEFAULT_DGIDB_MEMORY_SIZE = int(os.environ.get("MAF_AI_SERVE_DGIDB_MEMORY_SIZE", 10_000))
+
+
+class MemoryDGIdbClient:
+    """
+    In-memory LRU layer over a DGIdb backend (a DGIdbClient or DGIdbSnapshot).
+
+    Genes looked up with the same ``num_interactions`` are answered from
+    memory; the rest go to the wrapped backend. Failed lookups are not kept,
+    and ``errors`` counts them so callers can tell whether a result is safe
+    to reuse.
+    """
+
+    def __init__(self, client, max_entries: int = DEFAULT_DGIDB_MEMORY_SIZE):
+        self.client = client
+        self.cache = client.cache
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, int], List[dict]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def fetch_interactions(self, genes: Sequence[str], num_interactions: int) -> DGIdbLookup:
+        """
+        Fetches the top interactions of many genes, from memory when possible.
+        """
+        genes = list(dict.fromkeys(genes))
+        interactions: Dict[str, List[dict]] = {}
+        pending = []
+        with self._lock:
+            for gene in genes:
+                cached = self._entries.get((gene, num_interactions))
+                if cached is None:
+                    pending.append(gene)
+                    continue
+                self._entries.move_to_end((gene, num_interactions))
+                if cached:
+                    interactions[gene] = cached
+            hits = len(genes) - len(pending)
+            self.hits += hits
+            self.misses += len(pending)
+        if not pending:
+            return DGIdbLookup(interactions, {}, hits, 0)
+
+        lookup = self.client.fetch_interactions(pending, num_interactions)
+        interactions.update(lookup.interactions)
+        with self._lock:
+            self.errors += len(lookup.errors)
+            for gene in pending:
+                if gene in lookup.errors:
+                    continue
+                self._entries[(gene, num_interactions)] = lookup.interactions.get(gene, [])
+                self._entries.move_to_end((gene, num_interactions))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return DGIdbLookup(
+            interactions,
+            lookup.errors,
+            hits + lookup.cache_hits,
+            lookup.cache_misses,
+        )
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+def _report(maf_file_path: str, **kwargs) -> str:
+    from maf_tools.pipeline import run_pipeline
+
+    return run_pipeline(maf_file_path, **kwargs)
+
+
+def _parameters(func: Callable, exclude: Iterable[str]) -> frozenset:
+    return frozenset(inspect.signature(func).parameters) - {"maf_file_path", *exclude}
+
+
+class AnalysisService:
+    """
+    Answers analysis requests, keeping results and DGIdb lookups warm.
+
+    Each endpoint maps to an analysis function, the defaults of its required
+    parameters and the parameters fixed by the service. Successful results
+    are kept per (endpoint, MAF file version, parameters), so a changed MAF
+    file is analyzed again. Results are not kept when a DGIdb lookup failed
+    during the request or when a permutation test ran without a seed.
+    """
+
+    def __init__(
+        self,
+        dgidb_client=None,
+        result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+        dgidb_memory_size: int = DEFAULT_DGIDB_MEMORY_SIZE,
+    ):
+        if dgidb_client is None:
+            from maf_tools.dgidb_client import get_dgidb_client
+
+            dgidb_client = get_dgidb_client()
+        self.dgidb_client = MemoryDGIdbClient(dgidb_client, dgidb_memory_size)
+        self.result_cache_size = result_cache_size
+        self._results: "OrderedDict[tuple, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.result_hits = 0
+        self.result_misses = 0
+        self.requests = 0
+        self.started = time.time()
+
+        from maf_tools.pipeline import build_graph
+
+        # Endpoint -> (function, defaults, fixed parameters, accepted parameters)
+        self.endpoints: Dict[str, tuple] = {}
+        for path, func, defaults, fixed, signature in (
+            ("/summarize", summarize_maf, {}, {"output_format": "json"}, summarize_maf),
+            (
+                "/somatic-interactions",
+                somatic_interactions,
+                {"top_n": DEFAULT_TOP_N, "pvalue_cutoff": DEFAULT_PVALUE_CUTOFF},
+                {"output_format": "json"},
+                somatic_interactions,
+            ),
+            (
+                "/drug-gene-interactions",
+                drug_gene_interactions,
+                {"num_genes": DEFAULT_NUM_GENES, "num_interactions": DEFAULT_NUM_INTERACTIONS},
+                {"output_format": "json", "client": self.dgidb_client},
+                drug_gene_interactions,
+            ),
+            (
+                "/report",
+                _report,
+                {},
+                {"dgidb_client": self.dgidb_client, "drug_gene_tool": None, "report": True},
+                build_graph,
+            ),
+        ):
+            self.endpoints[path] = (func, defaults, fixed, _parameters(signature, fixed))
+
+    def warm_up(self, maf_file_paths: Iterable[str] = ()) -> None:
+        """
+        Imports the statistics libraries and loads MAF files ahead of the first request.
+        """
+        import maf_tools.incidence  # noqa: F401
+        import maf_tools.permutation  # noqa: F401
+        from statsmodels.sandbox.stats.multicomp import multipletests  # noqa: F401
+
+        for maf_file_path in maf_file_paths:
+            summarize_cohort(maf_file_path)
+            gene_ranking(maf_file_path)
+
+    def handle(self, path: str, params: Any) -> Tuple[int, bytes]:
+        """
+        Runs the analysis of an endpoint.
+
+        Args:
+            path: The endpoint, e.g. "/somatic-interactions".
+            params: The request body: "maf_file_path" and the analysis parameters.
+
+        Returns:
+            The HTTP status and the JSON response body.
+        """
+        with self._lock:
+            self.requests += 1
+        endpoint = self.endpoints.get(path)
+        if endpoint is None:
+            return 404, _error(f"Unknown endpoint {path}; expected one of {', '.join(self.endpoints)}")
+        func, defaults, fixed, allowed = endpoint
+        if not isinstance(params, dict) or not isinstance(params.get("maf_file_path"), str):
+            return 400, _error('The request body must be a JSON object with a "maf_file_path"')
+        maf_file_path = params.pop("maf_file_path")
+        unknown = sorted(set(params) - allowed)
+        if unknown:
+            return 400, _error(f"Unknown parameters: {', '.join(unknown)}")
+        params = {**defaults, **params}
+
+        try:
+            key = (path, file_key(maf_file_path), json.dumps(params, sort_keys=True))
+            group_by = params.get("group_by")
+            if isinstance(group_by, str) and os.path.isfile(group_by):
+                # A sample to group mapping file changes the results too
+                key += (file_key(group_by),)
+        except FileNotFoundError:
+            return 422, _error(f"Error: MAF file not found at {maf_file_path}")
+        with self._lock:
+            body = self._results.get(key)
+            if body is not None:
+                self._results.move_to_end(key)
+                self.result_hits += 1
+                return 200, body
+            self.result_misses += 1
+
+        errors_before = self.dgidb_client.errors
+        try:
+            output = func(maf_file_path, **params, **fixed)
+        except Exception as e:
+            return 500, _error(str(e))
+        if output.startswith("Error"):
+            return 422, _error(output)
+
+        if path == "/report":
+            body = json.dumps({"report": output}).encode()
+        else:
+            body = b'{"result":' + output.encode() + b"}"
+        reusable = self.dgidb_client.errors == errors_before and not (
+            params.get("method") == "permutation" and params.get("seed") is None
+        )
+        if reusable and self.result_cache_size > 0:
+            with self._lock:
+                self._results[key] = body
+                while len(self._results) > self.result_cache_size:
+                    self._results.popitem(last=False)
+        return 200, body
+
+    def health(self) -> Dict[str, Any]:
+        """
+        Returns the uptime, request count and cache statistics.
+        """
+        with self._lock:
+            results = {
+                "hits": self.result_hits,
+                "misses": self.result_misses,
+                "entries": len(self._results),
+                "max_entries": self.result_cache_size,
+            }
+            requests = self.requests
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": requests,
+            "endpoints": list(self.endpoints),
+            "caches": {
+                "results": results,
+                "maf": get_maf_cache().stats(),
+                "dgidb": self.dgidb_client.stats(),
+            },
+        }
+
+
+def _error(message: str) -> bytes:
+    return json.dumps({"error": message}).encode()
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "maf_ai"
+
+    def _send(self, status: int, body: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self) -> None:
+        if self.path == "/health":
+            self._send(200, json.dumps(self.server.service.health()).encode())
+        else:
+            self._send(404, _error(f"Unknown endpoint {self.path}"))
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            params = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            self._send(400, _error("The request body is not valid JSON"))
+            return
+        self._send(*self.server.service.handle(self.path, params))
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class AnalysisServer(ThreadingHTTPServer):
+    """
+    HTTP server answering each request on its own thread with a shared AnalysisService.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        service: AnalysisService,
+        host: str = DEFAULT_HOST,
+        port: int = DEFAULT_PORT,
+        verbose: bool = False,
+    ):
+        self.service = service
+        self.verbose = verbose
+        super().__init__((host, port), _RequestHandler)
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    dgidb_client=None,
+    preload: Sequence[str] = (),
+    result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+    verbose: bool = False,
+    ready: Optional[Callable[[AnalysisServer], None]] = None,
+) -> None:
+    """
+    Runs the analysis server until interrupted.
+
+    Args:
+        host: Interface to listen on.
+        port: Port to listen on; 0 picks a free port.
+        dgidb_client: DGIdb backend. Defaults to the shared backend.
+        preload: MAF files to load before accepting requests.
+        result_cache_size: Responses to keep in memory; 0 disables the result cache.
+        verbose: Log every request.
+        ready: Called with the server once it is listening.
+    """
+    service = AnalysisService(dgidb_client, result_cache_size=result_cache_size)
+    service.warm_up(preload)
+    with AnalysisServer(service, host, port, verbose) as server:
+        if ready is not None:
+            ready(server)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
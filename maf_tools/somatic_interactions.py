@@ -1,9 +1,9 @@
-from typing import Type
+from typing import List, Optional, Type
 from crewai.tools import BaseTool  # Ensure this is the correct BaseTool
 from pydantic import BaseModel, Field
-from scipy.stats import fisher_exact
-from statsmodels.sandbox.stats.multicomp import multipletests
-import pandas as pd
+from maf_tools.analyses import somatic_interactions
+from maf_tools.defaults import DEFAULT_PERMUTATIONS
+from maf_tools.tool_output import DEFAULT_MAX_ROWS
 
 
 # Define the input schema for the tool
@@ -11,6 +11,46 @@ class SomaticInteractionsInput(BaseModel):
     maf_file_path: str = Field(..., description="Path to the MAF file.")
     top_n: int = Field(25, description="Number of top mutated genes to consider.")
     pvalue_cutoff: float = Field(0.05, description="P-value cutoff for significance.")
+    chunksize: Optional[int] = Field(
+        None,
+        description="Stream the MAF file in chunks of this many rows instead of loading it into memory.",
+    )
+    method: str = Field(
+        "fisher",
+        description="'fisher' for Fisher's exact test, or 'permutation' for empirical p-values "
+        "under a null model that keeps each sample's mutation count fixed.",
+    )
+    permutations: int = Field(
+        DEFAULT_PERMUTATIONS, description="Number of permutations for the permutation method."
+    )
+    seed: Optional[int] = Field(None, description="Random seed for the permutation method.")
+    exclude_classifications: Optional[List[str]] = Field(
+        None,
+        description="Variant classifications to ignore when ranking genes and building the "
+        "incidence matrix (e.g. ['Silent']).",
+    )
+    output_format: str = Field(
+        "json",
+        description="'json' for a compact table of the significant pairs, or 'text' for a padded text table.",
+    )
+    max_rows: Optional[int] = Field(
+        DEFAULT_MAX_ROWS,
+        description="Most significant pairs to return in JSON output; the rest are counted as truncated.",
+    )
+    incremental: bool = Field(
+        False,
+        description="Keep the co-mutation counts next to the MAF file and read only rows "
+        "appended since the last run (fisher method only).",
+    )
+    delta_maf_file_path: Optional[str] = Field(
+        None, description="MAF file with new rows for the cohort (implies incremental)."
+    )
+    group_by: Optional[str] = Field(
+        None,
+        description="Test the pairs within each group of samples: a MAF column (e.g. a cancer "
+        "type column) or the path to a tab-separated sample-to-group mapping file. Returns one "
+        "table with a 'group' column; p-values are adjusted within each group.",
+    )
 
 
 class SomaticInteractionsTool(BaseTool):
@@ -18,11 +58,28 @@ class SomaticInteractionsTool(BaseTool):
     description: str = (
         "Identifies mutually exclusive or co-occurring gene sets in a MAF file using Fisher's Exact Test. "
         "The input should include 'maf_file_path' (path to the MAF file), 'top_n' (number of top mutated genes to consider), "
-        "and 'pvalue_cutoff' (p-value cutoff for significance)."
+        "and 'pvalue_cutoff' (p-value cutoff for significance). Set 'method' to 'permutation' to "
+        "control for per-sample mutation burden (e.g. hypermutated samples). Returns JSON with "
+        "the significant pairs as 'columns' and 'rows', most significant first."
     )
     args_schema: Type[BaseModel] = SomaticInteractionsInput  # Specify the input schema
 
-    def _run(self, maf_file_path: str, top_n: int, pvalue_cutoff: float) -> str:
+    def _run(
+        self,
+        maf_file_path: str,
+        top_n: int,
+        pvalue_cutoff: float,
+        chunksize: Optional[int] = None,
+        method: str = "fisher",
+        permutations: int = DEFAULT_PERMUTATIONS,
+        seed: Optional[int] = None,
+        exclude_classifications: Optional[List[str]] = None,
+        output_format: str = "json",
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+        incremental: bool = False,
+        delta_maf_file_path: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ) -> str:
         """
         Analyzes somatic interactions in a MAF file.
 
@@ -30,95 +87,52 @@ class SomaticInteractionsTool(BaseTool):
             maf_file_path: Path to the MAF file.
             top_n: Number of top mutated genes to consider.
             pvalue_cutoff: The p-value cutoff for significance.
+            chunksize: If set, stream the file in chunks of this many rows.
+            method: "fisher" or "permutation".
+            permutations: Number of permutations for the permutation method.
+            seed: Random seed for the permutation method.
+            exclude_classifications: Variant classifications to ignore (e.g. Silent).
+            output_format: "json" or "text".
+            max_rows: Most significant pairs to include in JSON output.
+            incremental: Read only the rows appended since the last run.
+            delta_maf_file_path: MAF file with new rows for the cohort.
+            group_by: MAF column or sample to group mapping file to stratify by.
 
         Returns:
             A string representation of the results (gene pairs, p-values, etc.).
         """
-        try:
-            # Read the MAF file
-            maf_df = pd.read_csv(
-                maf_file_path, sep="\t", comment="#"
-            )  # Adjust separator if needed
-            sample_ids = maf_df["Tumor_Sample_Barcode"].unique()
-
-            # 1. Gene Selection
-            gene_counts = maf_df["Hugo_Symbol"].value_counts().nlargest(top_n)
-            top_genes = gene_counts.index.tolist()
-
-            results = []
-
-            # 2. Pairwise Iteration
-            for i in range(len(top_genes)):
-                for j in range(i + 1, len(top_genes)):
-                    gene1 = top_genes[i]
-                    gene2 = top_genes[j]
-
-                    # 3. Contingency Table Creation
-                    gene1_mutated = maf_df["Tumor_Sample_Barcode"][
-                        maf_df["Hugo_Symbol"] == gene1
-                    ].unique()
-                    gene2_mutated = maf_df["Tumor_Sample_Barcode"][
-                        maf_df["Hugo_Symbol"] == gene2
-                    ].unique()
-
-                    n11 = len(set(gene1_mutated) & set(gene2_mutated))  # Both mutated
-                    n10 = len(set(gene1_mutated) - set(gene2_mutated))  # Gene1 only
-                    n01 = len(set(gene2_mutated) - set(gene1_mutated))  # Gene2 only
-                    n00 = len(sample_ids) - n11 - n10 - n01  # Neither
-
-                    # 4. Fisher's Exact Test
-                    contingency_table = [[n11, n10], [n01, n00]]
-                    oddsratio, pvalue = fisher_exact(contingency_table)
-
-                    # Determine event type (Co-occurrence or Mutually Exclusive)
-                    if oddsratio > 1:
-                        event = "Co_Occurence"
-                    else:
-                        event = "Mutually_Exclusive"
-
-                    results.append(
-                        [gene1, gene2, pvalue, oddsratio, n00, n01, n11, n10, event]
-                    )
-
-            # Create a DataFrame from the results
-            results_df = pd.DataFrame(
-                results,
-                columns=[
-                    "gene1",
-                    "gene2",
-                    "pValue",
-                    "oddsRatio",
-                    "00",
-                    "01",
-                    "11",
-                    "10",
-                    "Event",
-                ],
-            )
-
-            # 5. P-value Adjustment (Benjamini-Hochberg)
-            reject, pvals_corrected, _, _ = multipletests(
-                results_df["pValue"], method="fdr_bh"
-            )
-            results_df["pAdjust"] = pvals_corrected
-
-            # Filter based on p-value cutoff
-            significant_interactions = results_df[results_df["pAdjust"] < pvalue_cutoff]
-
-            # Format the output as a string
-            if significant_interactions.empty:
-                return "No significant somatic interactions found."
-
-            return significant_interactions.to_string()
-
-        except FileNotFoundError:
-            return f"Error: MAF file not found at {maf_file_path}"
-        except KeyError as e:
-            return f"Error: Required column not found in MAF file: {e}"
-        except Exception as e:
-            return f"Error during somatic interaction analysis: {e}"
-
-    async def _arun(self, maf_file_path: str, top_n: int, pvalue_cutoff: float):
+        return somatic_interactions(
+            maf_file_path,
+            top_n,
+            pvalue_cutoff,
+            chunksize,
+            method,
+            permutations,
+            seed,
+            exclude_classifications,
+            output_format,
+            max_rows,
+            incremental,
+            delta_maf_file_path,
+            group_by,
+        )
+
+    async def _arun(
+        self,
+        maf_file_path: str,
+        top_n: int,
+        pvalue_cutoff: float,
+        chunksize: Optional[int] = None,
+        method: str = "fisher",
+        permutations: int = DEFAULT_PERMUTATIONS,
+        seed: Optional[int] = None,
+        exclude_classifications: Optional[List[str]] = None,
+        output_format: str = "json",
+        max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+        incremental: bool = False,
+        delta_maf_file_path: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ):
         """
         Asynchronous execution is not supported.
         """
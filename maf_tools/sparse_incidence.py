@@ -0,0 +1,241 @@
+import os
+from typing import Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from maf_tools.fisher import fisher_exact_batch, min_pvalue_bounds, pvalue_lower_bounds
+from maf_tools.gene_ranking import GeneRanking
+from maf_tools.incidence import INTERACTION_COLUMNS, IncidenceMatrix
+
+# Sparse backend for somatic interactions over thousands of genes. A dense
+# sample x gene matrix and a gene x gene table of every pair both grow with
+# the square of the gene count; here the incidence matrix only stores the
+# mutated entries, and pairs are tested one block of first genes at a time.
+# Pairs whose margins cannot reach the p-value cutoff are dropped before
+# their co-mutation counts are computed, pairs whose table bounds their
+# p-value above the cutoff are dropped before the exact test, and only pairs
+# below the cutoff are kept, so memory stays bounded by the block size and
+# the number of hits.
+
+# Gene pairs per block; bounds the memory used by each block.
+DEFAULT_BLOCK_PAIRS = int(os.environ.get("MAF_AI_SPARSE_BLOCK_PAIRS", 1_000_000))
+# Relative slack on the pruning bound, covering rounding differences between
+# the bound and the p-values computed by fisher_exact_batch.
+_BOUND_SLACK = 1e-6
+# Most distinct mutated-sample counts for which margin-only bounds are
+# tabulated (a levels x levels table).
+_MAX_LEVELS = 2048
+
+
+def _plain_index(values) -> pd.Index:
+    return pd.Index(np.asarray(values, dtype=object))
+
+
+class SparseIncidence:
+    """
+    Binary sample x gene incidence matrix in compressed sparse column (CSC)
+    form; entry (i, j) is 1 when sample i carries at least one mutation in
+    gene j. Memory grows with the number of mutated entries.
+    """
+
+    def __init__(self, samples: pd.Index, genes: pd.Index, matrix: sparse.csc_matrix):
+        self.samples = pd.Index(samples)
+        self.genes = pd.Index(genes)
+        self.matrix = matrix
+
+    @classmethod
+    def from_entries(
+        cls, samples: Sequence[str], genes: Sequence[str], rows: np.ndarray, columns: np.ndarray
+    ) -> "SparseIncidence":
+        """
+        Builds the matrix from the (row, column) positions of mutated entries,
+        which may repeat.
+        """
+        matrix = sparse.csc_matrix(
+            (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+            shape=(len(samples), len(genes)),
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1
+        return cls(_plain_index(samples), _plain_index(genes), matrix)
+
+    @classmethod
+    def from_dense(cls, incidence: IncidenceMatrix) -> "SparseIncidence":
+        """
+        Converts a dense incidence matrix.
+        """
+        rows, columns = np.nonzero(incidence.matrix)
+        return cls.from_entries(incidence.samples, incidence.genes, rows, columns)
+
+    @classmethod
+    def from_ranking(
+        cls,
+        ranking: GeneRanking,
+        genes: Sequence[str],
+        exclude_classifications: Optional[Iterable[str]] = None,
+    ) -> "SparseIncidence":
+        """
+        Builds the incidence matrix of ``genes`` over all samples of a gene
+        ranking index, without a dense intermediate.
+        """
+        rows, columns = ranking.incidence_entries(genes, exclude_classifications)
+        return cls.from_entries(ranking.samples, genes, rows, columns)
+
+    @property
+    def n_samples(self) -> int:
+        return self.matrix.shape[0]
+
+    def mutated_counts(self) -> np.ndarray:
+        """
+        Returns the number of mutated samples per gene.
+        """
+        return np.diff(self.matrix.indptr).astype(np.int64)
+
+
+def interaction_blocks(
+    incidence: SparseIncidence,
+    pvalue_cutoff: Optional[float] = None,
+    block_pairs: int = DEFAULT_BLOCK_PAIRS,
+) -> Iterator[pd.DataFrame]:
+    """
+    Runs Fisher's exact test on the gene pairs of a sparse incidence matrix,
+    one block of first genes at a time.
+
+    With a cutoff, pairs whose margins bound their p-value at or above it are
+    skipped before their co-mutation counts are computed, pairs whose table
+    bounds their p-value at or above it are skipped before the exact test,
+    and only pairs with a p-value below it are yielded.
+
+    Args:
+        incidence: Sparse sample x gene incidence matrix.
+        pvalue_cutoff: Largest (exclusive) p-value to report. All pairs when omitted.
+        block_pairs: Approximate number of gene pairs per block.
+
+    Yields:
+        Non-empty tables with the columns of ``pairwise_interactions``, in
+        the same (i, j) order and indexed by the pair's position in it.
+    """
+    n_genes, n_samples = len(incidence.genes), incidence.n_samples
+    mutated = incidence.mutated_counts()
+    # Rows of the transpose are genes, so a block of first genes is a row slice.
+    by_gene = incidence.matrix.T.tocsr()
+    block = max(1, block_pairs // max(n_genes, 1))
+
+    # Genes share few distinct mutated-sample counts, so bounds that depend
+    # on the margins only are computed once per pair of distinct counts.
+    levels, level_of = np.unique(mutated, return_inverse=True)
+    tabulated = pvalue_cutoff is not None and len(levels) <= _MAX_LEVELS
+    if tabulated:
+        reachable = min_pvalue_bounds(levels[:, None], levels[None, :], n_samples)
+        unmutated = pvalue_lower_bounds(0, levels[:, None], levels[None, :], n_samples)
+
+    for start in range(0, n_genes - 1, block):
+        stop = min(start + block, n_genes - 1)
+        first = np.arange(start, stop)[:, None]
+        second = np.arange(start + 1, n_genes)[None, :]
+        candidates = second > first
+        if pvalue_cutoff is not None:
+            if tabulated:
+                bounds = reachable[level_of[first], level_of[second]]
+            else:
+                bounds = min_pvalue_bounds(mutated[first], mutated[second], n_samples)
+            candidates &= bounds < pvalue_cutoff * (1 + _BOUND_SLACK)
+        i, j = np.nonzero(candidates)
+        if len(i) == 0:
+            continue
+        i, j = i + start, j + start + 1
+
+        # Co-mutation counts of the remaining pairs only
+        columns, column_of = np.unique(j, return_inverse=True)
+        counts = (by_gene[start:stop] @ incidence.matrix[:, columns]).toarray()
+        n11 = counts[i - start, column_of].astype(np.int64)
+        if pvalue_cutoff is not None:
+            # Pairs whose cheap p-value bound already reaches the cutoff
+            # skip the exact test
+            if tabulated:
+                bounds = unmutated[level_of[i], level_of[j]]
+                co_mutated = n11 > 0
+                bounds[co_mutated] = pvalue_lower_bounds(
+                    n11[co_mutated], mutated[i[co_mutated]], mutated[j[co_mutated]], n_samples
+                )
+            else:
+                bounds = pvalue_lower_bounds(n11, mutated[i], mutated[j], n_samples)
+            testable = bounds < pvalue_cutoff * (1 + _BOUND_SLACK)
+            i, j, n11 = i[testable], j[testable], n11[testable]
+
+        n10 = mutated[i] - n11
+        n01 = mutated[j] - n11
+        n00 = n_samples - n11 - n10 - n01
+        oddsratios, pvalues = fisher_exact_batch(n11, n10, n01, n00)
+        if pvalue_cutoff is not None:
+            keep = pvalues < pvalue_cutoff
+            i, j, pvalues, oddsratios = i[keep], j[keep], pvalues[keep], oddsratios[keep]
+            n11, n10, n01, n00 = n11[keep], n10[keep], n01[keep], n00[keep]
+        if len(i) == 0:
+            continue
+        yield pd.DataFrame(
+            {
+                "gene1": incidence.genes[i],
+                "gene2": incidence.genes[j],
+                "pValue": pvalues,
+                "oddsRatio": oddsratios,
+                "00": n00,
+                "01": n01,
+                "11": n11,
+                "10": n10,
+                "Event": np.where(oddsratios > 1, "Co_Occurence", "Mutually_Exclusive"),
+            },
+            columns=INTERACTION_COLUMNS,
+            index=i * n_genes - i * (i + 1) // 2 + (j - i - 1),
+        )
+
+
+def fdr_bh(pvalues: np.ndarray, n_tests: int) -> np.ndarray:
+    """
+    Benjamini-Hochberg adjustment of the smallest p-values of ``n_tests`` tests.
+
+    The p-values left out must all be larger than those given. Adjusted
+    values below the smallest omitted p-value then match an adjustment of all
+    ``n_tests`` p-values (statsmodels' fdr_bh); larger ones may be overstated.
+    """
+    order = np.argsort(pvalues)
+    ranked = pvalues[order] / (np.arange(1, len(pvalues) + 1) / float(n_tests))
+    adjusted = np.empty(len(pvalues))
+    adjusted[order] = np.minimum(np.minimum.accumulate(ranked[::-1])[::-1], 1.0)
+    return adjusted
+
+
+def sparse_interactions(
+    incidence: SparseIncidence,
+    pvalue_cutoff: float,
+    block_pairs: int = DEFAULT_BLOCK_PAIRS,
+) -> Tuple[pd.DataFrame, int]:
+    """
+    Finds the gene pairs with a p-value below ``pvalue_cutoff``.
+
+    Pairs above the cutoff cannot have an adjusted p-value below it, so they
+    are dropped as they are tested, and the Benjamini-Hochberg adjustment of
+    the rest still counts every pair. Pairs significant after adjustment, and
+    their adjusted p-values, match ``pairwise_interactions`` followed by
+    fdr_bh over all pairs.
+
+    Args:
+        incidence: Sparse sample x gene incidence matrix.
+        pvalue_cutoff: P-value cutoff.
+        block_pairs: Approximate number of gene pairs tested per block.
+
+    Returns:
+        The pairs below the cutoff, with the columns of
+        ``pairwise_interactions`` and pAdjust, and the number of pairs tested.
+    """
+    n_genes = len(incidence.genes)
+    n_pairs = n_genes * (n_genes - 1) // 2
+    blocks = list(interaction_blocks(incidence, pvalue_cutoff, block_pairs))
+    if blocks:
+        results_df = pd.concat(blocks)
+    else:
+        results_df = pd.DataFrame(columns=INTERACTION_COLUMNS)
+    results_df["pAdjust"] = fdr_bh(results_df["pValue"].to_numpy(dtype=float), n_pairs)
+    return results_df, n_pairs
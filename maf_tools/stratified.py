@@ -0,0 +1,186 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.defaults import DEFAULT_PERMUTATIONS
+from maf_tools.gene_ranking import GeneRanking
+from maf_tools.incidence import INTERACTION_COLUMNS, IncidenceMatrix, pairwise_interactions
+from maf_tools.maf_cache import load_maf
+from maf_tools.maf_reader import SAMPLE_COLUMN, read_maf_chunks
+
+# Somatic interactions within subgroups of a cohort (cancer type, panel...).
+# The incidence matrix is built once with the samples of each group in
+# consecutive rows, so every group's matrix is a view of it, and the groups
+# are tested at the same time on a thread pool: the co-mutation products
+# (BLAS) and Fisher's test (NumPy) release the GIL, and threads share the
+# matrix without copying it to worker processes.
+
+# Threads testing groups at once. Defaults to the number of CPUs.
+DEFAULT_GROUP_WORKERS = int(os.environ.get("MAF_AI_GROUP_WORKERS", 0)) or os.cpu_count() or 1
+
+# Column of the combined table naming each pair's group.
+GROUP_COLUMN = "group"
+
+Stratum = Tuple[str, IncidenceMatrix]
+
+
+def _sample_groups(pairs: pd.DataFrame, source: str) -> pd.Series:
+    pairs = pairs.dropna().drop_duplicates()
+    samples, groups = pairs.iloc[:, 0].astype(str), pairs.iloc[:, 1].astype(str)
+    conflicts = samples[samples.duplicated()].unique()
+    if len(conflicts):
+        listed = ", ".join(conflicts[:5]) + (", ..." if len(conflicts) > 5 else "")
+        raise ValueError(f"Samples assigned to more than one group in {source}: {listed}")
+    return pd.Series(groups.to_numpy(), index=samples.to_numpy(), name=GROUP_COLUMN)
+
+
+def read_group_file(mapping_file_path: str) -> pd.Series:
+    """
+    Reads a sample to group mapping file.
+
+    The file is tab-separated with a sample barcode and its group on each
+    line. A header line starting with Tumor_Sample_Barcode and '#' comment
+    lines are skipped; further columns are ignored.
+
+    Returns:
+        The group of each sample, indexed by sample.
+
+    Raises:
+        ValueError: If the file has fewer than two columns, or lists a sample
+            in two groups.
+    """
+    mapping = pd.read_csv(mapping_file_path, sep="\t", header=None, comment="#", dtype=str)
+    if mapping.shape[1] < 2:
+        raise ValueError(f"Expected sample and group columns in {mapping_file_path}")
+    if len(mapping) and mapping.iat[0, 0] == SAMPLE_COLUMN:
+        mapping = mapping.iloc[1:]
+    return _sample_groups(mapping.iloc[:, :2], mapping_file_path)
+
+
+def sample_groups(
+    maf_file_path: str, group_by: str, chunksize: Optional[int] = None
+) -> pd.Series:
+    """
+    Returns the group of each sample of a MAF file.
+
+    Args:
+        maf_file_path: Path to the MAF file.
+        group_by: A MAF column holding each sample's group (e.g. a cancer type
+            column), or the path to a sample to group mapping file (see
+            ``read_group_file``).
+        chunksize: If set, stream the file in chunks of this many rows.
+
+    Returns:
+        The group of each sample, indexed by sample. Samples without a group
+        are left out.
+
+    Raises:
+        MissingColumnsError: If ``group_by`` is neither a file nor a MAF column.
+        ValueError: If a sample is assigned to more than one group.
+    """
+    if os.path.isfile(group_by):
+        return read_group_file(group_by)
+    columns = [SAMPLE_COLUMN, group_by]
+    if chunksize:
+        pairs = pd.concat(
+            [chunk[columns].drop_duplicates() for chunk in read_maf_chunks(maf_file_path, columns, chunksize)]
+            or [pd.DataFrame(columns=columns)],
+            ignore_index=True,
+        )
+    else:
+        pairs = load_maf(maf_file_path, columns=columns)[columns]
+    return _sample_groups(pairs, f"column {group_by}")
+
+
+def stratify(
+    ranking: GeneRanking,
+    genes: List[str],
+    groups: pd.Series,
+    exclude_classifications: Optional[List[str]] = None,
+) -> List[Stratum]:
+    """
+    Builds one incidence matrix of ``genes`` for the grouped samples and
+    slices it into per-group matrices.
+
+    Rows are ordered by group, so each group's matrix is a view of the shared
+    matrix rather than a copy. Samples of the mapping that are not in the
+    cohort are ignored, and cohort samples without a group are left out.
+
+    Returns:
+        (group, incidence matrix) per group, by group name.
+    """
+    groups = groups[groups.index.isin(ranking.samples)].sort_index().sort_values(kind="stable")
+    incidence = ranking.incidence(genes, exclude_classifications, samples=groups.index)
+    names, starts = np.unique(groups.to_numpy(dtype=str), return_index=True)
+    stops = np.append(starts[1:], len(groups))
+    return [
+        (
+            str(name),
+            IncidenceMatrix(incidence.samples[start:stop], incidence.genes, incidence.matrix[start:stop]),
+        )
+        for name, start, stop in zip(names, starts, stops)
+    ]
+
+
+def _test_group(
+    incidence: IncidenceMatrix, method: str, permutations: int, seed: Optional[int]
+) -> pd.DataFrame:
+    from statsmodels.sandbox.stats.multicomp import multipletests
+
+    from maf_tools.permutation import permutation_interactions
+
+    if method == "permutation":
+        results_df = permutation_interactions(incidence, permutations, seed)
+    else:
+        results_df = pairwise_interactions(incidence)
+    # Benjamini-Hochberg within the group
+    results_df["pAdjust"] = (
+        multipletests(results_df["pValue"], method="fdr_bh")[1] if len(results_df) else np.empty(0)
+    )
+    return results_df
+
+
+def stratified_interactions(
+    strata: List[Stratum],
+    method: str = "fisher",
+    permutations: int = DEFAULT_PERMUTATIONS,
+    seed: Optional[int] = None,
+    workers: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Tests every pair of genes within each group.
+
+    Args:
+        strata: (group, incidence matrix) pairs, as returned by ``stratify``.
+        method: "fisher" or "permutation".
+        permutations: Number of permutations for the permutation method.
+        seed: Random seed for the permutation method.
+        workers: Groups tested at once. Defaults to MAF_AI_GROUP_WORKERS, or
+            the number of CPUs.
+
+    Returns:
+        One table for all groups: the group column, the columns of
+        ``pairwise_interactions``, and pAdjust, the p-value adjusted by
+        Benjamini-Hochberg within the group.
+    """
+    workers = min(workers or DEFAULT_GROUP_WORKERS, max(len(strata), 1))
+    if method == "permutation" or workers == 1:
+        # Each permutation test already spreads its chains over all CPUs
+        tables = [
+            _test_group(incidence, method, permutations, seed) for _, incidence in strata
+        ]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            tables = list(
+                pool.map(
+                    lambda stratum: _test_group(stratum[1], method, permutations, seed), strata
+                )
+            )
+    for (name, _), results_df in zip(strata, tables):
+        results_df.insert(0, GROUP_COLUMN, name)
+    if not tables:
+        return pd.DataFrame(columns=[GROUP_COLUMN, *INTERACTION_COLUMNS, "pAdjust"])
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,225 @@
+import io
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.compressed import BGZFWriter
+from maf_tools.maf_reader import (
+    CLASSIFICATION_COLUMN,
+    GENE_COLUMN,
+    REFERENCE_ALLELE_COLUMN,
+    SAMPLE_COLUMN,
+    TUMOR_ALLELE_COLUMN,
+    VARIANT_TYPE_COLUMN,
+)
+
+# Variant classifications drawn for each mutation, with their weights.
+DEFAULT_CLASSIFICATION_WEIGHTS = {
+    "Missense_Mutation": 0.62,
+    "Silent": 0.2,
+    "Nonsense_Mutation": 0.07,
+    "Splice_Site": 0.05,
+    "Frame_Shift_Del": 0.04,
+    "Frame_Shift_Ins": 0.02,
+}
+_VARIANT_TYPES = {"Frame_Shift_Del": "DEL", "Frame_Shift_Ins": "INS"}
+
+SYNTHETIC_COLUMNS = [
+    GENE_COLUMN,
+    SAMPLE_COLUMN,
+    CLASSIFICATION_COLUMN,
+    VARIANT_TYPE_COLUMN,
+    REFERENCE_ALLELE_COLUMN,
+    TUMOR_ALLELE_COLUMN,
+]
+
+
+class PlantedPair(NamedTuple):
+    """
+    A gene pair whose mutations are made to co-occur or to be mutually
+    exclusive. ``strength`` is the probability that a sample mutated in
+    ``gene1`` has its ``gene2`` status forced (mutated for co-occurrence,
+    unmutated for exclusivity).
+    """
+
+    gene1: str
+    gene2: str
+    strength: float = 0.8
+
+
+def gene_names(n_genes: int) -> List[str]:
+    """
+    Returns the synthetic gene names GENE1..GENEn, most frequently mutated first.
+    """
+    return [f"GENE{i + 1}" for i in range(n_genes)]
+
+
+def gene_mutation_rates(
+    n_genes: int, max_rate: float = 0.3, decay: float = 1.0, min_rate: float = 0.002
+) -> np.ndarray:
+    """
+    Per-gene mutation frequencies following a power law, like the long tail
+    of real cohorts: gene i (from 0) is mutated in
+    ``max_rate * (i + 1) ** -decay`` of the samples, but at least ``min_rate``.
+    """
+    rates = max_rate * np.arange(1, n_genes + 1, dtype=np.float64) ** -decay
+    return np.maximum(rates, min_rate)
+
+
+def _plant(block: np.ndarray, pairs, columns, co_occurring: bool, rng) -> None:
+    for pair in pairs:
+        a, b = columns[pair.gene1], columns[pair.gene2]
+        selected = block[:, a] & (rng.random(len(block)) < pair.strength)
+        block[selected, b] = co_occurring
+
+
+def generate_maf(
+    n_samples: int,
+    n_genes: int,
+    gene_rates: Optional[Sequence[float]] = None,
+    max_rate: float = 0.3,
+    decay: float = 1.0,
+    burden_sigma: float = 0.5,
+    co_occurring: Sequence[PlantedPair] = (),
+    mutually_exclusive: Sequence[PlantedPair] = (),
+    extra_mutations: float = 0.3,
+    classification_weights: Optional[Dict[str, float]] = None,
+    seed: Optional[int] = None,
+    block_size: int = 1024,
+) -> pd.DataFrame:
+    """
+    Generates a synthetic MAF cohort.
+
+    Each sample is mutated in each gene independently, with probability the
+    gene's mutation rate times the sample's burden multiplier (log-normal with
+    mean 1, so a few samples are hypermutated). Planted pairs are then
+    applied, and every mutated (sample, gene) gets one record plus a Poisson
+    number of extra ones, each with a random Variant_Classification and alleles.
+
+    Args:
+        n_samples: Number of samples.
+        n_genes: Number of genes, named by ``gene_names``.
+        gene_rates: Mutation rate of each gene. Defaults to
+            ``gene_mutation_rates(n_genes, max_rate, decay)``.
+        max_rate: Rate of the most mutated gene, for the default rates.
+        decay: Power-law exponent of the default rates.
+        burden_sigma: Standard deviation of the log burden multiplier; 0 gives
+            every sample the same burden.
+        co_occurring: Pairs made to co-occur.
+        mutually_exclusive: Pairs made mutually exclusive.
+        extra_mutations: Mean number of additional records per mutated
+            (sample, gene).
+        classification_weights: Variant classifications and their weights.
+        seed: Random seed; the same seed gives the same cohort.
+        block_size: Samples simulated at once, which bounds memory.
+
+    Returns:
+        The MAF records, with categorical columns.
+
+    Raises:
+        ValueError: If a planted pair names an unknown gene.
+    """
+    rng = np.random.default_rng(seed)
+    genes = gene_names(n_genes)
+    columns = {gene: j for j, gene in enumerate(genes)}
+    for pair in [*co_occurring, *mutually_exclusive]:
+        unknown = [gene for gene in pair[:2] if gene not in columns]
+        if unknown:
+            raise ValueError(f"Unknown genes in planted pair: {', '.join(unknown)}")
+
+    rates = (
+        np.asarray(gene_rates, dtype=np.float64)
+        if gene_rates is not None
+        else gene_mutation_rates(n_genes, max_rate, decay)
+    )
+    burden = rng.lognormal(-(burden_sigma**2) / 2, burden_sigma, n_samples)
+
+    sample_codes, gene_codes = [], []
+    for start in range(0, n_samples, block_size):
+        stop = min(start + block_size, n_samples)
+        probabilities = np.minimum(np.outer(burden[start:stop], rates), 1.0)
+        block = rng.random(probabilities.shape, dtype=np.float32) < probabilities
+        _plant(block, co_occurring, columns, True, rng)
+        _plant(block, mutually_exclusive, columns, False, rng)
+        rows, cols = np.nonzero(block)
+        sample_codes.append(rows + start)
+        gene_codes.append(cols)
+
+    sample_codes = np.concatenate(sample_codes) if sample_codes else np.empty(0, np.int64)
+    gene_codes = np.concatenate(gene_codes) if gene_codes else np.empty(0, np.int64)
+    records = 1 + rng.poisson(extra_mutations, len(sample_codes))
+    sample_codes = np.repeat(sample_codes, records)
+    gene_codes = np.repeat(gene_codes, records)
+    n_rows = len(sample_codes)
+
+    weights = classification_weights or DEFAULT_CLASSIFICATION_WEIGHTS
+    classifications = list(weights)
+    probabilities = np.array([weights[c] for c in classifications], dtype=np.float64)
+    classification_codes = rng.choice(
+        len(classifications), n_rows, p=probabilities / probabilities.sum()
+    )
+    variant_types = ["SNP", "DEL", "INS"]
+    type_of_classification = np.array(
+        [variant_types.index(_VARIANT_TYPES.get(c, "SNP")) for c in classifications]
+    )
+    type_codes = type_of_classification[classification_codes]
+
+    # Substitutions change the base; deletions and insertions use "-".
+    reference = rng.integers(0, 4, n_rows)
+    tumor = (reference + rng.integers(1, 4, n_rows)) % 4
+    alleles = ["A", "C", "G", "T", "-"]
+    reference = np.where(type_codes == 2, 4, reference)
+    tumor = np.where(type_codes == 1, 4, tumor)
+
+    width = len(str(max(n_samples - 1, 0)))
+    samples = [f"SAMPLE{i:0{width}d}" for i in range(n_samples)]
+    return pd.DataFrame(
+        {
+            GENE_COLUMN: pd.Categorical.from_codes(gene_codes, genes),
+            SAMPLE_COLUMN: pd.Categorical.from_codes(sample_codes, samples),
+            CLASSIFICATION_COLUMN: pd.Categorical.from_codes(
+                classification_codes, classifications
+            ),
+            VARIANT_TYPE_COLUMN: pd.Categorical.from_codes(type_codes, variant_types),
+            REFERENCE_ALLELE_COLUMN: pd.Categorical.from_codes(reference, alleles),
+            TUMOR_ALLELE_COLUMN: pd.Categorical.from_codes(tumor, alleles),
+        },
+        columns=SYNTHETIC_COLUMNS,
+    )
+
+
+def write_maf(maf_df: pd.DataFrame, maf_file_path: str) -> str:
+    """
+    Writes MAF records as a tab-separated MAF file with a version header. Paths
+    ending in ".gz" or ".bgz" are compressed as BGZF, as bgzip would.
+
+    Returns:
+        The path written.
+    """
+    # Rows are streamed to the file (and compressed block by block), so the
+    # MAF text is never held in memory as a whole
+    with open(maf_file_path, "wb") as raw:
+        if maf_file_path.endswith((".gz", ".bgz")):
+            writer = io.BufferedWriter(BGZFWriter(raw))
+        else:
+            writer = raw
+        with io.TextIOWrapper(writer, newline="") as f:
+            f.write("#version 2.4\n")
+            maf_df.to_csv(f, sep="\t", index=False)
+    return maf_file_path
+
+
+def parse_pair(spec: str) -> PlantedPair:
+    """
+    Parses a planted pair written as ``GENE_A:GENE_B`` or ``GENE_A:GENE_B:strength``.
+
+    Raises:
+        ValueError: If the specification is malformed.
+    """
+    parts = spec.split(":")
+    if len(parts) not in (2, 3) or not all(parts[:2]):
+        raise ValueError(f"Expected GENE_A:GENE_B[:strength], got {spec!r}")
+    if len(parts) == 3:
+        return PlantedPair(parts[0], parts[1], float(parts[2]))
+    return PlantedPair(parts[0], parts[1])
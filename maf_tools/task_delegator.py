@@ -1,7 +1,10 @@
-from typing import Type
+from typing import Optional, Type
 from crewai.tools import BaseTool  # Ensure this is the correct BaseTool
 from pydantic import BaseModel, Field
 import json
+from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
+from maf_tools.pipeline import ANALYSIS_SECTIONS, build_graph, plan_tasks
+from maf_tools.planner import PLAN_PARAMETERS
 
 
 # Define the input schema for the tool
@@ -20,9 +23,15 @@ class TaskDelegator(BaseTool):
         "'plan_json' (a JSON-formatted string containing the plan) and "
         "'maf_file_path' (path to the MAF file). "
         "The plan should have a 'steps' key, where steps are high-level actions. "
-        "This tool returns a list of tasks that have been delegated."
+        "The analyses in the plan are run concurrently and this tool returns the "
+        "Markdown report combining their results."
     )
     args_schema: Type[BaseModel] = TaskDelegatorInput  # Specify the input schema
+    # Run the plan; when False, only the delegated tasks are listed.
+    execute: bool = True
+    # Tool used for DGIdb lookups. Defaults to one using the shared DGIdb backend.
+    drug_gene_tool: Optional[DrugGeneInteractionTool] = None
+    max_workers: Optional[int] = None
 
     def _run(self, plan_json: str, maf_file_path: str) -> str:
         """
@@ -33,11 +42,13 @@ class TaskDelegator(BaseTool):
             maf_file_path: Path to the MAF file.
 
         Returns:
-            A string representation of the delegated tasks.
+            The Markdown report, or the delegated tasks when ``execute`` is False.
         """
         try:
             # Parse the plan JSON
             plan = json.loads(plan_json)
+            if self.execute:
+                return self._execute(plan, maf_file_path)
             steps = plan.get("steps", [])
 
             delegated_tasks = []
@@ -63,6 +74,36 @@ class TaskDelegator(BaseTool):
         except Exception as e:
             return f"Error during task delegation: {e}"
 
+    def _execute(self, plan: dict, maf_file_path: str) -> str:
+        """
+        Runs the analyses of a plan as a task graph and renders the report.
+        """
+        tasks, unknown = plan_tasks(plan)
+        analyses = [task for task in tasks if task != "report"]
+        if not analyses:
+            if "report" not in tasks:
+                return f"Error: No known analysis steps in plan: {plan.get('steps', [])}"
+            # A plan that only asks for the report gets every analysis.
+            analyses = list(ANALYSIS_SECTIONS)
+        # Parameters extracted by the planner, e.g. "top 50 genes".
+        parameters = {
+            name: value
+            for name, value in (plan.get("parameters") or {}).items()
+            if name in PLAN_PARAMETERS
+        }
+        graph = build_graph(
+            maf_file_path,
+            tasks=analyses,
+            drug_gene_tool=self.drug_gene_tool,
+            **parameters,
+        )
+        report = graph.run(max_workers=self.max_workers)["report"]
+        if isinstance(report, Exception):
+            return f"Error generating report: {report}"
+        if unknown:
+            report += f"\nSkipped plan steps: {', '.join(map(str, unknown))}\n"
+        return report
+
     async def _arun(self, plan_json: str, maf_file_path: str):
         """
         Asynchronous execution is not supported.
@@ -0,0 +1,120 @@
+import json
+import math
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+# Output formats of the analysis tools. "json" is compact and typed, for the
+# agent and the report; "text" is the readable table the tools used to return.
+OUTPUT_FORMATS = ("json", "text")
+
+# Rows kept in a JSON table unless the caller asks for more (None keeps all).
+DEFAULT_MAX_ROWS = 50
+
+# Significant digits kept for floating point values.
+SIGNIFICANT_DIGITS = 3
+
+# Columns kept at full precision: rounding a p-value can move it across the
+# significance cutoff (0.04996 would read as 0.05).
+PVALUE_COLUMNS = ("pValue", "pAdjust")
+
+
+def compact_value(value: Any, digits: Optional[int] = SIGNIFICANT_DIGITS) -> Any:
+    """
+    Converts a table cell to a short JSON value: numpy scalars become Python
+    numbers, floats keep ``digits`` significant digits (all of them when
+    None) and non-finite floats become the strings "inf", "-inf" or null.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float):
+        if math.isnan(value):
+            return None
+        if math.isinf(value):
+            return "inf" if value > 0 else "-inf"
+        return value if digits is None else float(f"{value:.{digits}g}")
+    return value
+
+
+def table(
+    rows: Sequence[Sequence[Any]],
+    columns: Sequence[str],
+    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+) -> Dict[str, Any]:
+    """
+    Builds a column-oriented table: the column names once, then one list per
+    row, which is far shorter than a padded text table or a list of records.
+    Floats are rounded, except in ``PVALUE_COLUMNS``.
+
+    Args:
+        rows: Table rows, most important first.
+        columns: Column names.
+        max_rows: Rows to keep; the number of dropped rows is reported as
+            "truncated". None keeps every row.
+
+    Returns:
+        A dict with "columns", "rows" and "truncated" keys.
+    """
+    kept = rows if max_rows is None else rows[:max_rows]
+    digits = [
+        None if column in PVALUE_COLUMNS else SIGNIFICANT_DIGITS for column in columns
+    ]
+    return {
+        "columns": list(columns),
+        "rows": [
+            [compact_value(value, column_digits) for value, column_digits in zip(row, digits)]
+            for row in kept
+        ],
+        "truncated": len(rows) - len(kept),
+    }
+
+
+def frame_table(
+    frame: pd.DataFrame,
+    columns: Optional[Sequence[str]] = None,
+    max_rows: Optional[int] = DEFAULT_MAX_ROWS,
+) -> Dict[str, Any]:
+    """
+    Builds a column-oriented table (see ``table``) from a DataFrame.
+    """
+    columns = list(frame.columns if columns is None else columns)
+    rows = frame[columns].itertuples(index=False, name=None)
+    return table(list(rows), columns, max_rows)
+
+
+def dumps(payload: Dict[str, Any]) -> str:
+    """
+    Serializes a tool result without insignificant whitespace.
+    """
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def loads(output: str) -> Optional[Dict[str, Any]]:
+    """
+    Parses a JSON tool result. Returns None for text output, such as error
+    messages or the "text" format.
+    """
+    if not isinstance(output, str) or not output.lstrip().startswith("{"):
+        return None
+    try:
+        payload = json.loads(output)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def markdown_table(columns: List[str], rows: List[List[Any]]) -> str:
+    """
+    Renders table columns and rows as a Markdown table.
+    """
+    def cell(value: Any) -> str:
+        text = "" if value is None else str(value)
+        return text.replace("|", "\\|").replace("\n", " ")
+
+    lines = [
+        "| " + " | ".join(columns) + " |",
+        "|" + "|".join("-" * (len(column) + 2) for column in columns) + "|",
+    ]
+    lines.extend("| " + " | ".join(cell(value) for value in row) + " |" for row in rows)
+    return "\n".join(lines) + "\n"
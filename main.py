@@ -1,11 +1,16 @@
+from typing import List
+
 import typer
-from crewai import Agent, Task, Crew
-from langchain_openai import OpenAI
-from maf_tools.maf_summarizer import MAFSummarizer
-from maf_tools.somatic_interactions import SomaticInteractionsTool
-from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
-from maf_tools.natural_language_parser import NaturalLanguageParser
-from maf_tools.task_delegator import TaskDelegator
+# Only light modules are imported here. CrewAI, pandas and the statistics
+# libraries are imported by the command that needs them, so `--help` and
+# LLM-free runs do not pay for the agent stack.
+from maf_tools.defaults import (
+    DEFAULT_NUM_GENES,
+    DEFAULT_NUM_INTERACTIONS,
+    DEFAULT_PERMUTATIONS,
+    DEFAULT_PVALUE_CUTOFF,
+    DEFAULT_TOP_N,
+)
 from rich import print
 from dotenv import load_dotenv
 
@@ -22,7 +27,11 @@ def create_chief_analyst(
     somatic_interactions,
     drug_gene_interactions,
 ):
-    llm = OpenAI(model_name="gpt-4o-mini", temperature=0.7)
+    from crewai import Agent, LLM
+    from maf_tools.llm_cache import cache_llm_calls
+
+    # Responses are cached, so a rerun on unchanged data skips the model.
+    llm = cache_llm_calls(LLM(model="gpt-4o-mini", temperature=0.7))
     try:
         return Agent(
             role="Chief Cancer Genomics Analyst",
@@ -64,18 +73,100 @@ def analyze_maf(
     output_file: str = typer.Option(
         "maf_analysis_report.md", help="Path to save the generated Markdown report."
     ),
+    sidecar: bool = typer.Option(
+        False,
+        help="Write a binary columnar sidecar next to the MAF file so later runs skip parsing.",
+    ),
+    dgidb_snapshot: str = typer.Option(
+        None,
+        help="Local DGIdb snapshot (see build-dgidb-snapshot) to use instead of the DGIdb API.",
+    ),
+    no_llm: bool = typer.Option(
+        False,
+        help="Run the analyses directly, without the LLM agent, and render the report from the template.",
+    ),
+    no_llm_cache: bool = typer.Option(
+        False, help="Always query the LLM instead of reusing cached responses."
+    ),
+    top_n: int = typer.Option(
+        DEFAULT_TOP_N, help="Number of top mutated genes for somatic interactions."
+    ),
+    pvalue_cutoff: float = typer.Option(
+        DEFAULT_PVALUE_CUTOFF, help="Adjusted p-value cutoff for somatic interactions."
+    ),
+    num_genes: int = typer.Option(
+        DEFAULT_NUM_GENES, help="Number of top mutated genes to look up in DGIdb."
+    ),
+    num_interactions: int = typer.Option(
+        DEFAULT_NUM_INTERACTIONS, help="Number of DGIdb interactions to report per gene."
+    ),
+    method: str = typer.Option(
+        "fisher",
+        help="Somatic interaction test: 'fisher', or 'permutation' to control for per-sample mutation burden.",
+    ),
+    permutations: int = typer.Option(
+        DEFAULT_PERMUTATIONS, help="Number of permutations for --method permutation."
+    ),
+    seed: int = typer.Option(None, help="Random seed for --method permutation."),
+    exclude_classification: List[str] = typer.Option(
+        None,
+        help="Variant classification to ignore when ranking genes (e.g. Silent). Repeat to exclude several.",
+    ),
 ):
     """
     Runs the analysis using a Crew workflow and writes the combined Markdown report to a file.
     """
+    from maf_tools.dgidb_snapshot import DGIdbSnapshot
+    from maf_tools.llm_cache import set_llm_cache_enabled
+    from maf_tools.maf_sidecar import set_sidecar_enabled
+
+    try:
+        set_sidecar_enabled(sidecar)
+    except ImportError as e:
+        print(f"[bold red]Error: {e}[/]")
+        raise typer.Exit(code=1)
     print(f"[bold blue]Starting MAF analysis for file: {maf_file_path}[/]")
+    set_llm_cache_enabled(not no_llm_cache)
     try:
+        dgidb_client = DGIdbSnapshot.load(dgidb_snapshot) if dgidb_snapshot else None
+
+        if no_llm:
+            from maf_tools.pipeline import run_pipeline
+
+            # Fixed three-step plan: run the tools directly and concurrently.
+            report = run_pipeline(
+                maf_file_path,
+                top_n=top_n,
+                pvalue_cutoff=pvalue_cutoff,
+                num_genes=num_genes,
+                num_interactions=num_interactions,
+                dgidb_client=dgidb_client,
+                method=method,
+                permutations=permutations,
+                seed=seed,
+                exclude_classifications=list(exclude_classification or []),
+            )
+            if verbose:
+                print(report)
+            with open(output_file, "w") as f:
+                f.write(report)
+            print(f"[bold green]Report saved to {output_file}[/]")
+            print("[bold green]MAF analysis completed successfully![/]")
+            return
+
+        from crewai import Crew, Task
+        from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
+        from maf_tools.maf_summarizer import MAFSummarizer
+        from maf_tools.natural_language_parser import NaturalLanguageParser
+        from maf_tools.somatic_interactions import SomaticInteractionsTool
+        from maf_tools.task_delegator import TaskDelegator
+
         # Create instances of the tools.
+        drug_gene_interaction_tool = DrugGeneInteractionTool(client=dgidb_client)
         natural_language_parser_tool = NaturalLanguageParser()
         task_delegator_tool = TaskDelegator()
         maf_summarizer_tool = MAFSummarizer()
         somatic_interactions_tool = SomaticInteractionsTool()
-        drug_gene_interaction_tool = DrugGeneInteractionTool()
 
         # Create the chief analyst agent.
         chief_analyst_agent = create_chief_analyst(
@@ -86,11 +177,12 @@ def analyze_maf(
             drug_gene_interaction_tool,
         )
 
-        # Create the tasks.
+        # Create the tasks. The three analyses are independent and run concurrently.
         summarization_task = Task(
             description=f"Summarize the MAF file located at: {maf_file_path}",
             agent=chief_analyst_agent,
             expected_output="A summary of the MAF file.",
+            async_execution=True,
             inputs={"maf_file_path": maf_file_path},
         )
 
@@ -98,17 +190,28 @@ def analyze_maf(
             description=f"Perform somatic interaction analysis on the MAF file located at: {maf_file_path}",
             agent=chief_analyst_agent,
             expected_output="Somatic interaction analysis results.",
-            inputs={"maf_file_path": maf_file_path, "top_n": 25, "pvalue_cutoff": 0.05},
+            async_execution=True,
+            inputs={
+                "maf_file_path": maf_file_path,
+                "top_n": top_n,
+                "pvalue_cutoff": pvalue_cutoff,
+                "method": method,
+                "permutations": permutations,
+                "seed": seed,
+                "exclude_classifications": list(exclude_classification or []),
+            },
         )
 
         drug_gene_interaction_task = Task(
             description=f"Identify potential therapeutic targets from the MAF file located at: {maf_file_path}",
             agent=chief_analyst_agent,
             expected_output="Potential therapeutic targets identified.",
+            async_execution=True,
             inputs={
                 "maf_file_path": maf_file_path,
-                "num_genes": 5,
-                "num_interactions": 10,
+                "num_genes": num_genes,
+                "num_interactions": num_interactions,
+                "exclude_classifications": list(exclude_classification or []),
             },
         )
 
@@ -164,5 +267,210 @@ def analyze_maf(
         print(f"[bold red]Error: {e}[/]")
 
 
+@app.command("analyze-batch")
+def analyze_batch(
+    input_path: str = typer.Option(
+        ...,
+        "--input",
+        help="Directory of MAF files, or a manifest listing one MAF path (optionally 'cohort<TAB>path') per line.",
+    ),
+    output_dir: str = typer.Option("maf_reports", help="Directory for the reports and index."),
+    workers: int = typer.Option(None, help="Number of worker processes (default: number of CPUs)."),
+    force: bool = typer.Option(False, help="Re-analyze cohorts that already have a report."),
+    sidecar: bool = typer.Option(
+        False,
+        help="Write a binary columnar sidecar next to each MAF file so later runs skip parsing.",
+    ),
+    dgidb_snapshot: str = typer.Option(
+        None,
+        help="Local DGIdb snapshot (see build-dgidb-snapshot) to use instead of the DGIdb API.",
+    ),
+    top_n: int = typer.Option(
+        DEFAULT_TOP_N, help="Number of top mutated genes for somatic interactions."
+    ),
+    pvalue_cutoff: float = typer.Option(
+        DEFAULT_PVALUE_CUTOFF, help="Adjusted p-value cutoff for somatic interactions."
+    ),
+    num_genes: int = typer.Option(
+        DEFAULT_NUM_GENES, help="Number of top mutated genes to look up in DGIdb."
+    ),
+    num_interactions: int = typer.Option(
+        DEFAULT_NUM_INTERACTIONS, help="Number of DGIdb interactions to report per gene."
+    ),
+    method: str = typer.Option(
+        "fisher",
+        help="Somatic interaction test: 'fisher', or 'permutation' to control for per-sample mutation burden.",
+    ),
+    permutations: int = typer.Option(
+        DEFAULT_PERMUTATIONS, help="Number of permutations for --method permutation."
+    ),
+    seed: int = typer.Option(None, help="Random seed for --method permutation."),
+    exclude_classification: List[str] = typer.Option(
+        None,
+        help="Variant classification to ignore when ranking genes (e.g. Silent). Repeat to exclude several.",
+    ),
+):
+    """
+    Analyzes many MAF files without the LLM agent, one report per cohort plus an index.
+    """
+    from maf_tools.batch import discover_cohorts, run_batch
+    from maf_tools.maf_sidecar import check_sidecar_support
+
+    if sidecar:
+        try:
+            check_sidecar_support()
+        except ImportError as e:
+            print(f"[bold red]Error: {e}[/]")
+            raise typer.Exit(code=1)
+    cohorts = discover_cohorts(input_path)
+    print(f"[bold blue]Analyzing {len(cohorts)} cohorts from {input_path}[/]")
+
+    def report_progress(entry):
+        color = "red" if entry["status"] == "failed" else "green"
+        message = f"[{color}]{entry['cohort']}: {entry['status']}"
+        if entry.get("error"):
+            message += f" ({entry['error']})"
+        print(message + "[/]")
+
+    index = run_batch(
+        cohorts,
+        output_dir,
+        workers=workers,
+        params={
+            "top_n": top_n,
+            "pvalue_cutoff": pvalue_cutoff,
+            "num_genes": num_genes,
+            "num_interactions": num_interactions,
+            "method": method,
+            "permutations": permutations,
+            "seed": seed,
+            "exclude_classifications": list(exclude_classification or []),
+        },
+        sidecar=sidecar,
+        dgidb_snapshot=dgidb_snapshot,
+        force=force,
+        progress=report_progress,
+    )
+    failed = sum(entry["status"] == "failed" for entry in index)
+    print(
+        f"[bold green]{len(index) - failed} of {len(index)} cohorts analyzed; "
+        f"index written to {output_dir}/index.md[/]"
+    )
+    if failed:
+        raise typer.Exit(code=1)
+
+
+@app.command("build-dgidb-snapshot")
+def build_dgidb_snapshot(
+    interactions: str = typer.Option(..., help="Path to the DGIdb interactions.tsv export."),
+    output: str = typer.Option(..., help="Path to write the snapshot index (JSON)."),
+    drugs: str = typer.Option(None, help="Path to the DGIdb drugs.tsv export."),
+    genes: str = typer.Option(None, help="Path to the DGIdb genes.tsv export."),
+):
+    """
+    Builds a local DGIdb index for network-free drug-gene lookups.
+    """
+    from maf_tools.dgidb_snapshot import DGIdbSnapshot
+
+    snapshot = DGIdbSnapshot.build(interactions, drugs_path=drugs, genes_path=genes)
+    snapshot.save(output)
+    print(
+        f"[bold green]DGIdb snapshot with {len(snapshot.genes)} genes saved to {output}[/]"
+    )
+
+
+@app.command("serve")
+def serve(
+    host: str = typer.Option("127.0.0.1", help="Interface to listen on."),
+    port: int = typer.Option(8765, help="Port to listen on."),
+    preload: List[str] = typer.Option(
+        [], help="MAF file to load before accepting requests. Repeatable."
+    ),
+    sidecar: bool = typer.Option(
+        False,
+        help="Write a binary columnar sidecar next to each MAF file so later loads skip parsing.",
+    ),
+    dgidb_snapshot: str = typer.Option(
+        None,
+        help="Local DGIdb snapshot (see build-dgidb-snapshot) to use instead of the DGIdb API.",
+    ),
+    result_cache_size: int = typer.Option(
+        256, help="Responses kept in memory; 0 disables the result cache."
+    ),
+    verbose: bool = typer.Option(False, help="Log every request."),
+):
+    """
+    Serves the analyses over HTTP, keeping MAF files and DGIdb lookups warm between requests.
+    """
+    from maf_tools.dgidb_snapshot import DGIdbSnapshot
+    from maf_tools.maf_sidecar import set_sidecar_enabled
+    from maf_tools.server import serve as run_server
+
+    try:
+        set_sidecar_enabled(sidecar)
+    except ImportError as e:
+        print(f"[bold red]Error: {e}[/]")
+        raise typer.Exit(code=1)
+    dgidb_client = DGIdbSnapshot.load(dgidb_snapshot) if dgidb_snapshot else None
+
+    def ready(server):
+        print(f"[bold green]Serving MAF analyses on http://{host}:{server.server_address[1]}[/]")
+
+    run_server(
+        host,
+        port,
+        dgidb_client=dgidb_client,
+        preload=preload,
+        result_cache_size=result_cache_size,
+        verbose=verbose,
+        ready=ready,
+    )
+
+
+@app.command("generate-maf")
+def generate_maf(
+    output: str = typer.Option(..., help="Path to write the synthetic MAF file."),
+    samples: int = typer.Option(1000, help="Number of samples."),
+    genes: int = typer.Option(5000, help="Number of genes (GENE1, GENE2, ...)."),
+    max_rate: float = typer.Option(
+        0.3, help="Fraction of samples mutated in the most frequently mutated gene."
+    ),
+    decay: float = typer.Option(
+        1.0, help="Power-law exponent of the per-gene mutation rates."
+    ),
+    burden_sigma: float = typer.Option(
+        0.5, help="Spread of the per-sample mutation burden (log-normal sigma)."
+    ),
+    co_occurring: List[str] = typer.Option(
+        [], help="Planted co-occurring pair as GENE_A:GENE_B[:strength]. Repeatable."
+    ),
+    mutually_exclusive: List[str] = typer.Option(
+        [], help="Planted mutually exclusive pair as GENE_A:GENE_B[:strength]. Repeatable."
+    ),
+    seed: int = typer.Option(None, help="Random seed."),
+):
+    """
+    Generates a synthetic MAF file with planted gene interactions, for testing and benchmarks.
+    """
+    from maf_tools.synthetic import generate_maf as generate, parse_pair, write_maf
+
+    try:
+        maf_df = generate(
+            samples,
+            genes,
+            max_rate=max_rate,
+            decay=decay,
+            burden_sigma=burden_sigma,
+            co_occurring=[parse_pair(pair) for pair in co_occurring],
+            mutually_exclusive=[parse_pair(pair) for pair in mutually_exclusive],
+            seed=seed,
+        )
+    except ValueError as e:
+        print(f"[bold red]Error: {e}[/]")
+        raise typer.Exit(code=1)
+    write_maf(maf_df, output)
+    print(f"[bold green]Synthetic MAF with {len(maf_df)} mutations saved to {output}[/]")
+
+
 if __name__ == "__main__":
     app()
@@ -0,0 +1,38 @@
+import os
+
+# Columns of the MAF files written by the tests, unless they pass their own.
+MAF_COLUMNS = ["Hugo_Symbol", "Tumor_Sample_Barcode", "Variant_Classification"]
+
+# BRAF is mutated in three samples, KRAS in two and TP53 in one.
+MAF_RECORDS = [
+    ("BRAF", "S1", "Missense_Mutation"),
+    ("BRAF", "S2", "Missense_Mutation"),
+    ("BRAF", "S3", "Nonsense_Mutation"),
+    ("KRAS", "S1", "Missense_Mutation"),
+    ("KRAS", "S2", "Missense_Mutation"),
+    ("TP53", "S4", "Frame_Shift_Del"),
+]
+
+
+def write_maf(path, records=MAF_RECORDS, columns=MAF_COLUMNS, comments=()):
+    """
+    Writes a small tab-separated MAF file for tests.
+
+    Args:
+        path: Path of the file; missing parent directories are created.
+        records: Rows of values in ``columns`` order. Values past the last
+            column are dropped, so one set of records serves narrower headers.
+        columns: Header columns.
+        comments: Lines written before the header, e.g. "#version 2.4".
+
+    Returns:
+        The path, as a string.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w") as f:
+        for comment in comments:
+            f.write(comment + "\n")
+        f.write("\t".join(columns) + "\n")
+        for record in records:
+            f.write("\t".join(str(value) for value in record[: len(columns)]) + "\n")
+    return str(path)
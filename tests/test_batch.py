@@ -0,0 +1,83 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from conftest import write_maf
+from maf_tools.batch import discover_cohorts, run_batch
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "dgidb")
+PARAMS = {"top_n": 5, "pvalue_cutoff": 0.05, "num_genes": 2, "num_interactions": 1}
+
+
+def gene_records(genes):
+    # One missense mutation per gene, each in its own sample
+    return [(gene, f"S{i}", "Missense_Mutation") for i, gene in enumerate(genes)]
+
+
+def write_snapshot(tmp_path):
+    path = str(tmp_path / "dgidb.json")
+    DGIdbSnapshot.build(os.path.join(DATA_DIR, "interactions.tsv")).save(path)
+    return path
+
+
+def test_discover_cohorts_from_directory_and_manifest(tmp_path):
+    write_maf(tmp_path / "mafs" / "a.maf", gene_records(["BRAF"]))
+    write_maf(tmp_path / "mafs" / "study" / "data_mutations.txt", gene_records(["KRAS"]))
+    (tmp_path / "mafs" / "notes.md").write_text("not a MAF")
+
+    assert [name for name, _ in discover_cohorts(str(tmp_path / "mafs"))] == ["a", "study"]
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text("# cohorts\nmafs/a.maf\nfirst\tmafs/a.maf\nindex\tmafs/a.maf\n")
+    cohorts = discover_cohorts(str(manifest))
+    assert [name for name, _ in cohorts] == ["a", "first", "index_2"]
+    assert cohorts[0][1] == str(tmp_path / "mafs" / "a.maf")
+
+
+def test_run_batch_writes_reports_and_index(tmp_path):
+    cohorts = [
+        ("braf", write_maf(tmp_path / "braf.maf", gene_records(["BRAF", "BRAF", "TP53"]))),
+        ("kras", write_maf(tmp_path / "kras.maf", gene_records(["KRAS", "KRAS"]))),
+        ("missing", str(tmp_path / "missing.maf")),
+    ]
+    output_dir = str(tmp_path / "reports")
+    index = run_batch(
+        cohorts, output_dir, workers=2, params=PARAMS, dgidb_snapshot=write_snapshot(tmp_path)
+    )
+
+    assert [entry["status"] for entry in index] == ["done", "done", "failed"]
+    with open(os.path.join(output_dir, "braf.md")) as f:
+        assert "| BRAF | VEMURAFENIB |" in f.read()
+    with open(os.path.join(output_dir, "index.json")) as f:
+        assert [entry["cohort"] for entry in json.load(f)] == ["braf", "kras", "missing"]
+    with open(os.path.join(output_dir, "index.md")) as f:
+        assert "[kras.md](kras.md)" in f.read()
+
+
+def test_run_batch_resumes_finished_cohorts(tmp_path):
+    cohorts = [
+        ("braf", write_maf(tmp_path / "braf.maf", gene_records(["BRAF"]))),
+        ("kras", write_maf(tmp_path / "kras.maf", gene_records(["KRAS"]))),
+    ]
+    output_dir = str(tmp_path / "reports")
+    snapshot = write_snapshot(tmp_path)
+    run_batch(cohorts, output_dir, workers=1, params=PARAMS, dgidb_snapshot=snapshot)
+
+    # A crash after braf: its marker survives, kras lost its report.
+    os.remove(os.path.join(output_dir, "kras.md"))
+    index = run_batch(cohorts, output_dir, workers=1, params=PARAMS, dgidb_snapshot=snapshot)
+    assert [entry["status"] for entry in index] == ["skipped", "done"]
+
+    # Changed parameters invalidate finished cohorts.
+    index = run_batch(
+        cohorts, output_dir, workers=1, params=dict(PARAMS, top_n=3), dgidb_snapshot=snapshot
+    )
+    assert [entry["status"] for entry in index] == ["done", "done"]
+
+
+if __name__ == "__main__":
+    test_discover_cohorts_from_directory_and_manifest()
@@ -0,0 +1,108 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from conftest import write_maf
+from maf_tools import cohort_summary, gene_ranking
+from maf_tools.cohort_summary import summarize_cohort
+from maf_tools.maf_cache import get_maf_cache
+from maf_tools.maf_summarizer import MAFSummarizer
+
+HEADER = [
+    "Hugo_Symbol",
+    "Tumor_Sample_Barcode",
+    "Variant_Classification",
+    "Variant_Type",
+    "Reference_Allele",
+    "Tumor_Seq_Allele2",
+]
+RECORDS = [
+    ("TP53", "S1", "Missense_Mutation", "SNP", "C", "T"),
+    ("TP53", "S1", "Nonsense_Mutation", "SNP", "G", "A"),
+    ("TP53", "S2", "Missense_Mutation", "SNP", "A", "G"),
+    ("KRAS", "S2", "Missense_Mutation", "SNP", "C", "A"),
+    ("KRAS", "S3", "Frame_Shift_Del", "DEL", "T", "-"),
+    ("EGFR", "S4", "In_Frame_Del", "DEL", "GGAATT", "-"),
+    ("TP53", "S4", "Silent", "SNP", "g", "t"),
+]
+
+
+def clear_caches():
+    cohort_summary._summaries.clear()
+    gene_ranking._rankings.clear()
+    get_maf_cache().clear()
+
+
+def test_summary_statistics(tmp_path):
+    clear_caches()
+    summary = summarize_cohort(write_maf(tmp_path / "a.maf", RECORDS, HEADER))
+
+    assert (summary.n_samples, summary.n_genes, summary.n_mutations) == (4, 3, 7)
+    assert summary.top_genes(2) == ["TP53", "KRAS"]
+    assert summary.gene_frequencies(1) == {"TP53": 0.75}
+    assert summary.variant_types == {"SNP": 5, "DEL": 2}
+    # G>A folds onto C>T and lower-case alleles count too; indels are not SNVs.
+    assert summary.snv_classes == {
+        "C>A": 2, "C>G": 0, "C>T": 2, "T>A": 0, "T>C": 1, "T>G": 0
+    }
+    burden = summary.mutation_burden()
+    assert (burden["min"], burden["median"], burden["max"]) == (1, 2, 2)
+    assert summary.mutation_burden(capture_size_mb=0.5)["max"] == 4
+
+
+def test_streamed_summary_matches_in_memory_summary(tmp_path):
+    clear_caches()
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, HEADER)
+    in_memory = summarize_cohort(maf_file_path).to_dict()
+    clear_caches()
+    assert summarize_cohort(maf_file_path, chunksize=2).to_dict() == in_memory
+    # The pass that streamed the summary also built the shared gene ranking
+    assert gene_ranking.cached_gene_ranking(maf_file_path).top_genes(2) == ["TP53", "KRAS"]
+
+
+def test_streamed_summary_counts_rows_without_a_sample(tmp_path):
+    clear_caches()
+    records = RECORDS + [("BRAF", "", "Missense_Mutation", "SNP", "T", "A")]
+    maf_file_path = write_maf(tmp_path / "a.maf", records, HEADER)
+    in_memory = summarize_cohort(maf_file_path)
+    assert in_memory.n_mutations == 8
+    clear_caches()
+    assert summarize_cohort(maf_file_path, chunksize=3).to_dict() == in_memory.to_dict()
+
+
+def test_summary_without_optional_columns(tmp_path):
+    clear_caches()
+    summary = summarize_cohort(write_maf(tmp_path / "a.maf", RECORDS, HEADER[:3]))
+    assert summary.variant_types == {}
+    assert summary.snv_classes == {}
+    assert "SNV Classes" not in summary.to_text()
+
+
+def test_summarizer_output_formats(tmp_path):
+    clear_caches()
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, HEADER)
+    summarizer = MAFSummarizer()
+
+    text = summarizer._run(maf_file_path, top_n=2)
+    assert text.splitlines()[:3] == [
+        "MAF Summary:",
+        "  Number of Samples: 4",
+        "  Number of Genes: 3",
+    ]
+    assert "Top 2 Mutated Genes (by samples): TP53 (75.0%), KRAS (50.0%)" in text
+
+    data = json.loads(summarizer._run(maf_file_path, output_format="json", top_n=1))
+    assert data["top_genes"] == [{"gene": "TP53", "mutated_samples": 3, "frequency": 0.75}]
+    assert data["mutation_burden"]["unit"] == "mutations"
+    assert summarizer._run(maf_file_path, output_format="xml").startswith("Error")
+    assert summarizer._run(str(tmp_path / "missing.maf")).startswith("Error: MAF file not found")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    test_summarizer_output_formats(pathlib.Path(tempfile.mkdtemp()))
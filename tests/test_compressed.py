@@ -0,0 +1,100 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import gzip
+
+import pytest
+
+from maf_tools import compressed
+from maf_tools.analyses import somatic_interactions, summarize_maf
+from maf_tools.batch import _cohort_name
+from maf_tools.compressed import _inflate_blocks, bgzf_compress, detect_compression, open_maf
+from maf_tools.maf_reader import read_maf, read_maf_chunks, read_maf_header
+from maf_tools.synthetic import generate_maf, write_maf
+
+
+def test_bgzf_and_gzip_match_uncompressed(tmp_path, monkeypatch):
+    # Small tasks so the file spans many blocks and thread-pool tasks
+    monkeypatch.setattr(compressed, "BLOCKS_PER_TASK", 2)
+    maf_df = generate_maf(300, 50, seed=1)
+    maf_file_path = write_maf(maf_df, str(tmp_path / "cohort.maf"))
+    bgzf_file_path = write_maf(maf_df, str(tmp_path / "cohort.maf.gz"))
+    with open(maf_file_path, "rb") as f:
+        text = f.read()
+    gzip_file_path = str(tmp_path / "plain.maf.gz")
+    with open(gzip_file_path, "wb") as f:
+        # Two gzip members, as written by concatenating gzip files
+        f.write(gzip.compress(text[:1000]) + gzip.compress(text[1000:]))
+
+    assert detect_compression(maf_file_path) is None
+    assert detect_compression(bgzf_file_path) == "bgzf"
+    assert detect_compression(gzip_file_path) == "gzip"
+
+    expected = read_maf(maf_file_path)
+    for path in (bgzf_file_path, gzip_file_path):
+        with open_maf(path, threads=3) as f:
+            assert f.read() == text
+        assert read_maf_header(path) == read_maf_header(maf_file_path)
+        assert read_maf(path).equals(expected)
+        assert sum(len(chunk) for chunk in read_maf_chunks(path, ["Hugo_Symbol"], 500)) == len(
+            expected
+        )
+        assert summarize_maf(path) == summarize_maf(maf_file_path)
+        assert somatic_interactions(path, 10, 0.05) == somatic_interactions(maf_file_path, 10, 0.05)
+
+
+def test_header_reads_inflate_first_block_only(tmp_path, monkeypatch):
+    maf_df = generate_maf(300, 50, seed=2)
+    maf_file_path = write_maf(maf_df, str(tmp_path / "cohort.maf"))
+    bgzf_file_path = write_maf(maf_df, str(tmp_path / "cohort.maf.gz"))
+    inflated = []
+
+    def inflate_blocks(blocks):
+        inflated.extend(blocks)
+        return _inflate_blocks(blocks)
+
+    monkeypatch.setattr(compressed, "_inflate_blocks", inflate_blocks)
+    assert read_maf_header(bgzf_file_path) == read_maf_header(maf_file_path)
+    assert len(inflated) == 1
+
+    with open(maf_file_path, "rb") as f:
+        text = f.read()
+    with open_maf(bgzf_file_path, readahead=False) as f:
+        assert f.read() == text
+    assert len(inflated) > 1
+
+
+def test_corrupt_files_raise(tmp_path):
+    text = b"Hugo_Symbol\tTumor_Sample_Barcode\n" + b"BRAF\tS1\n" * 50000
+    data = bgzf_compress(text)
+
+    truncated = tmp_path / "truncated.maf.gz"
+    truncated.write_bytes(data[: len(data) // 2])
+    with pytest.raises(OSError):
+        with open_maf(str(truncated)) as f:
+            f.read()
+
+    corrupt = bytearray(data)
+    corrupt[40] ^= 0xFF
+    corrupt_path = tmp_path / "corrupt.maf.gz"
+    corrupt_path.write_bytes(bytes(corrupt))
+    with pytest.raises(OSError):
+        with open_maf(str(corrupt_path)) as f:
+            f.read()
+
+    truncated_gzip = tmp_path / "truncated_plain.maf.gz"
+    truncated_gzip.write_bytes(gzip.compress(text)[:-100])
+    with pytest.raises(OSError):
+        with open_maf(str(truncated_gzip)) as f:
+            f.read()
+
+
+def test_cohort_names_drop_compression_suffix():
+    assert _cohort_name("/data/LUAD.maf.gz") == "LUAD"
+    assert _cohort_name("/data/BRCA.maf.txt.bgz") == "BRCA"
+
+
+if __name__ == "__main__":
+    test_cohort_names_drop_compression_suffix()
@@ -0,0 +1,77 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import pytest
+
+from maf_tools.dag_executor import TaskFailedError, TaskGraph
+
+
+def sleeper(value, delay=0.2):
+    def run(**_):
+        time.sleep(delay)
+        return value
+
+    return run
+
+
+def test_independent_tasks_run_concurrently():
+    graph = TaskGraph()
+    for name in ["a", "b", "c"]:
+        graph.add(name, sleeper(name))
+    graph.add("report", lambda **results: "+".join(sorted(results)), depends_on=["a", "b", "c"])
+
+    start = time.perf_counter()
+    results = graph.run()
+    elapsed = time.perf_counter() - start
+
+    assert results["report"] == "a+b+c"
+    # Close to the longest task, not the sum of all three.
+    assert elapsed < 0.2 * 2
+
+
+def test_dependencies_receive_results():
+    graph = TaskGraph()
+    graph.add("total", lambda load: sum(load), depends_on=["load"])
+    graph.add("load", lambda: [1, 2, 3])
+    assert graph.order() == ["load", "total"]
+    assert graph.run() == {"load": [1, 2, 3], "total": 6}
+
+
+def test_failures_skip_dependent_tasks():
+    def fail():
+        raise ValueError("boom")
+
+    graph = TaskGraph()
+    graph.add("load", fail)
+    graph.add("analysis", lambda load: load, depends_on=["load"])
+    graph.add("report", lambda analysis: analysis, depends_on=["analysis"])
+    graph.add("other", lambda: "ok")
+
+    results = graph.run()
+    assert isinstance(results["load"], ValueError)
+    assert isinstance(results["analysis"], TaskFailedError)
+    assert isinstance(results["report"], TaskFailedError)
+    assert results["other"] == "ok"
+
+
+def test_invalid_graphs_are_rejected():
+    graph = TaskGraph()
+    graph.add("a", lambda b: b, depends_on=["b"])
+    graph.add("b", lambda a: a, depends_on=["a"])
+    with pytest.raises(ValueError, match="Cycle"):
+        graph.run()
+
+    graph = TaskGraph()
+    graph.add("a", lambda missing: missing, depends_on=["missing"])
+    with pytest.raises(ValueError, match="unknown task"):
+        graph.order()
+    with pytest.raises(ValueError, match="Duplicate"):
+        graph.add("a", lambda: None)
+
+
+if __name__ == "__main__":
+    test_independent_tasks_run_concurrently()
@@ -0,0 +1,209 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import asyncio
+import re
+import threading
+import time
+
+import requests
+
+from conftest import write_maf
+from maf_tools.dgidb_client import DGIdbClient, build_query
+from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
+from maf_tools.persistent_cache import PersistentCache
+
+
+def interaction(drug, score=1.0):
+    return {
+        "drug": {"name": drug, "conceptId": f"chembl:{drug}"},
+        "interactionScore": score,
+        "interactionTypes": [{"type": "inhibitor", "directionality": "INHIBITORY"}],
+        "interactionAttributes": [],
+        "publications": [],
+        "sources": [{"sourceDbName": "CIViC"}, {"sourceDbName": "OncoKB"}],
+    }
+
+
+KNOWN_GENES = {
+    "BRAF": [interaction("VEMURAFENIB"), interaction("DABRAFENIB")],
+    "KRAS": [interaction("SOTORASIB")],
+}
+# Aliases DGIdb resolves to the canonical symbol it answers with.
+ALIASES = {"KRAS2": "KRAS"}
+
+
+class FakeResponse:
+    def __init__(self, status_code, payload=None):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """Answers DGIdb GraphQL queries from KNOWN_GENES without network access."""
+
+    def __init__(self, delay=0.0, fail_genes=()):
+        self.delay = delay
+        self.fail_genes = set(fail_genes)
+        self.queries = []
+        self.lock = threading.Lock()
+
+    def post(self, url, json, timeout):
+        query = json["query"]
+        names = re.findall(r'"([^"]+)"', query)
+        with self.lock:
+            self.queries.append(names)
+        time.sleep(self.delay)
+        if self.fail_genes & set(names):
+            return FakeResponse(503)
+        nodes = [
+            {"name": name, "interactions": KNOWN_GENES[name]}
+            for name in dict.fromkeys(ALIASES.get(name.upper(), name) for name in names)
+            if name in KNOWN_GENES
+        ]
+        return FakeResponse(200, {"data": {"genes": {"nodes": nodes}}})
+
+
+def test_build_query_lists_all_genes():
+    query = build_query(["BRAF", "TP53"], 3)
+    assert 'genes(names: ["BRAF", "TP53"])' in query
+    assert "interactions(first: 3)" in query
+
+
+def test_fetch_interactions_batches_genes():
+    session = FakeSession()
+    client = DGIdbClient(session=session, batch_size=2, max_workers=2)
+
+    found, errors, _, _ = client.fetch_interactions(
+        ["BRAF", "TP53", "KRAS", "EGFR", "BRAF"], 5
+    )
+
+    assert errors == {}
+    assert sorted(found) == ["BRAF", "KRAS"]
+    assert [i["drug"]["name"] for i in found["BRAF"]] == ["VEMURAFENIB", "DABRAFENIB"]
+    # Plus one single-gene query per gene missing from a batch answer
+    assert sorted(len(names) for names in session.queries) == [1, 1, 2, 2]
+
+
+def test_fetch_interactions_maps_aliases_to_the_queried_genes():
+    session = FakeSession()
+    client = DGIdbClient(session=session, batch_size=3)
+
+    found, errors, _, _ = client.fetch_interactions(["BRAF", "kras2", "TP53"], 5)
+
+    assert errors == {}
+    assert sorted(found) == ["BRAF", "kras2"]
+    assert found["kras2"] == KNOWN_GENES["KRAS"]
+    # Genes missing from the batch answer are looked up one by one
+    assert session.queries == [["BRAF", "kras2", "TP53"], ["kras2"], ["TP53"]]
+    assert DGIdbClient(session=FakeSession(), batch_size=1).fetch_interactions(
+        ["KRAS2"], 5
+    ).interactions == {"KRAS2": KNOWN_GENES["KRAS"]}
+
+
+def test_fetch_interactions_reports_failed_batches():
+    client = DGIdbClient(session=FakeSession(fail_genes={"TP53"}), batch_size=1)
+    found, errors, _, _ = client.fetch_interactions(["BRAF", "TP53"], 5)
+    assert "BRAF" in found
+    assert errors["TP53"].endswith("HTTP Status Code: 503")
+
+
+def test_fetch_interactions_sends_batches_concurrently():
+    client = DGIdbClient(session=FakeSession(delay=0.2), batch_size=1, max_workers=8)
+    start = time.perf_counter()
+    client.fetch_interactions([f"GENE{i}" for i in range(8)], 5)
+    assert time.perf_counter() - start < 0.2 * 4
+
+
+def test_fetch_interactions_wraps_connection_errors():
+    class BrokenSession:
+        def post(self, *args, **kwargs):
+            raise requests.ConnectionError("offline")
+
+    lookup = DGIdbClient(session=BrokenSession()).fetch_interactions(["BRAF"], 5)
+    assert lookup.interactions == {}
+    assert "offline" in lookup.errors["BRAF"]
+
+
+def test_cache_hits_skip_the_network(tmp_path):
+    cache = PersistentCache(str(tmp_path / "dgidb.sqlite"))
+    session = FakeSession()
+    client = DGIdbClient(session=session, cache=cache)
+
+    first = client.fetch_interactions(["BRAF", "TP53"], 5)
+    n_queries = len(session.queries)
+    second = client.fetch_interactions(["BRAF", "TP53"], 5)
+
+    assert len(session.queries) == n_queries
+    assert (first.cache_hits, first.cache_misses) == (0, 2)
+    assert (second.cache_hits, second.cache_misses) == (2, 0)
+    assert second.interactions == first.interactions
+    # A different number of interactions is a different cache entry.
+    assert client.fetch_interactions(["BRAF"], 2).cache_misses == 1
+
+
+def test_cache_only_mode_works_offline(tmp_path):
+    cache = PersistentCache(str(tmp_path / "dgidb.sqlite"))
+    DGIdbClient(session=FakeSession(), cache=cache).fetch_interactions(["BRAF"], 5)
+
+    class OfflineSession:
+        def post(self, *args, **kwargs):
+            raise AssertionError("network access in offline mode")
+
+    client = DGIdbClient(session=OfflineSession(), cache=cache, cache_only=True)
+    lookup = client.fetch_interactions(["BRAF", "EGFR"], 5)
+    assert [i["drug"]["name"] for i in lookup.interactions["BRAF"]][0] == "VEMURAFENIB"
+    assert "offline" in lookup.errors["EGFR"]
+
+
+def test_failed_lookups_are_not_cached(tmp_path):
+    cache = PersistentCache(str(tmp_path / "dgidb.sqlite"))
+    DGIdbClient(session=FakeSession(fail_genes={"BRAF"}), cache=cache).fetch_interactions(
+        ["BRAF"], 5
+    )
+    assert len(cache) == 0
+
+
+def test_drug_gene_interaction_tool_formats_results(tmp_path):
+    tool = DrugGeneInteractionTool(client=DGIdbClient(session=FakeSession()))
+    result = tool._run(
+        write_maf(tmp_path / "a.maf"), num_genes=3, num_interactions=5, output_format="text"
+    )
+
+    assert result.splitlines() == [
+        "BRAF: VEMURAFENIB - Types: inhibitor (INHIBITORY) - Sources: CIViC, OncoKB",
+        "BRAF: DABRAFENIB - Types: inhibitor (INHIBITORY) - Sources: CIViC, OncoKB",
+        "KRAS: SOTORASIB - Types: inhibitor (INHIBITORY) - Sources: CIViC, OncoKB",
+        "TP53: No interactions found.",
+    ]
+
+
+def test_drug_gene_interaction_tool_reports_cache_use(tmp_path):
+    cache = PersistentCache(str(tmp_path / "dgidb.sqlite"))
+    tool = DrugGeneInteractionTool(client=DGIdbClient(session=FakeSession(), cache=cache))
+    maf_file_path = write_maf(tmp_path / "a.maf")
+
+    assert tool._run(maf_file_path, 3, 5, output_format="text").endswith(
+        "(DGIdb cache: 0 hits, 3 misses)"
+    )
+    assert tool._run(maf_file_path, 3, 5, output_format="text").endswith(
+        "(DGIdb cache: 3 hits, 0 misses)"
+    )
+
+
+def test_drug_gene_interaction_tool_runs_async(tmp_path):
+    tool = DrugGeneInteractionTool(client=DGIdbClient(session=FakeSession()))
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    result = asyncio.run(
+        tool._arun(maf_file_path, num_genes=1, num_interactions=5, output_format="text")
+    )
+    assert result.startswith("BRAF: VEMURAFENIB")
+
+
+if __name__ == "__main__":
+    test_fetch_interactions_batches_genes()
@@ -0,0 +1,87 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "dgidb")
+
+
+def build_snapshot():
+    return DGIdbSnapshot.build(
+        os.path.join(DATA_DIR, "interactions.tsv"),
+        drugs_path=os.path.join(DATA_DIR, "drugs.tsv"),
+        genes_path=os.path.join(DATA_DIR, "genes.tsv"),
+    )
+
+
+def test_snapshot_sorts_interactions_by_score():
+    snapshot = build_snapshot()
+    drugs = [i["drug"]["name"] for i in snapshot.lookup("BRAF")]
+    assert drugs == ["VEMURAFENIB", "DABRAFENIB", "ENCORAFENIB", "SORAFENIB"]
+    # Interactions without a score come last.
+    assert [i["drug"]["name"] for i in snapshot.lookup("EGFR")][-1] == "OSIMERTINIB"
+    assert [i["drug"]["name"] for i in snapshot.lookup("BRAF", 2)] == [
+        "VEMURAFENIB",
+        "DABRAFENIB",
+    ]
+
+
+def test_snapshot_merges_claims_of_the_same_drug():
+    vemurafenib = build_snapshot().lookup("BRAF", 1)[0]
+    assert vemurafenib["interactionScore"] == 3.52
+    assert [s["sourceDbName"] for s in vemurafenib["sources"]] == ["CIViC", "OncoKB"]
+    assert [t["type"] for t in vemurafenib["interactionTypes"]] == ["inhibitor"]
+    assert vemurafenib["drug"]["approved"] is True
+
+
+def test_snapshot_resolves_aliases_and_unknown_genes():
+    snapshot = build_snapshot()
+    assert snapshot.lookup("kras2") == snapshot.lookup("KRAS")
+    assert snapshot.lookup("TP53") == []
+    assert snapshot.lookup("NOT_A_GENE") == []
+
+
+def test_snapshot_save_and_load(tmp_path):
+    path = str(tmp_path / "dgidb.json")
+    snapshot = build_snapshot()
+    snapshot.save(path)
+
+    loaded = DGIdbSnapshot.load(path)
+    assert loaded.genes == snapshot.genes
+    assert loaded.aliases == snapshot.aliases
+    assert DGIdbSnapshot.load(path) is loaded
+
+
+def test_snapshot_lookup_of_a_cohort_is_fast():
+    snapshot = build_snapshot()
+    genes = [f"GENE{i}" for i in range(20000)] + ["BRAF", "KRAS", "EGFR"]
+    start = time.perf_counter()
+    lookup = snapshot.fetch_interactions(genes, 5)
+    assert time.perf_counter() - start < 0.5
+    assert sorted(lookup.interactions) == ["BRAF", "EGFR", "KRAS"]
+    assert lookup.errors == {}
+
+
+def test_drug_gene_interaction_tool_with_snapshot(tmp_path):
+    maf_file_path = str(tmp_path / "a.maf")
+    with open(maf_file_path, "w") as f:
+        f.write("Hugo_Symbol\tTumor_Sample_Barcode\n")
+        f.write("BRAF\tS1\nBRAF\tS2\nTP53\tS1\n")
+
+    tool = DrugGeneInteractionTool(client=build_snapshot())
+    result = tool._run(maf_file_path, num_genes=2, num_interactions=2, output_format="text")
+
+    assert result.splitlines() == [
+        "BRAF: VEMURAFENIB - Types: inhibitor - Sources: CIViC, OncoKB",
+        "BRAF: DABRAFENIB - Types: inhibitor - Sources: CIViC",
+        "TP53: No interactions found.",
+    ]
+
+
+if __name__ == "__main__":
+    test_snapshot_sorts_interactions_by_score()
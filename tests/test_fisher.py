@@ -0,0 +1,68 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from scipy.stats import fisher_exact
+
+from maf_tools.fisher import fisher_exact_batch
+
+
+def assert_matches_scipy(tables):
+    tables = np.asarray(tables, dtype=np.int64)
+    oddsratios, pvalues = fisher_exact_batch(*tables.T)
+    for (a, b, c, d), oddsratio, pvalue in zip(tables, oddsratios, pvalues):
+        expected_oddsratio, expected_pvalue = fisher_exact([[a, b], [c, d]])
+        assert np.isclose(pvalue, expected_pvalue, rtol=1e-6, atol=1e-300), (a, b, c, d)
+        assert np.isclose(oddsratio, expected_oddsratio, equal_nan=True), (a, b, c, d)
+
+
+def test_fisher_exact_batch_matches_scipy_on_random_tables():
+    rng = np.random.default_rng(42)
+    n_total = 500
+    tables = []
+    for _ in range(2000):
+        r1 = rng.integers(0, n_total + 1)
+        c1 = rng.integers(0, n_total + 1)
+        lo, hi = max(0, c1 - (n_total - r1)), min(r1, c1)
+        a = rng.integers(lo, hi + 1)
+        tables.append((a, r1 - a, c1 - a, n_total - r1 - c1 + a))
+    assert_matches_scipy(tables)
+
+
+def test_fisher_exact_batch_matches_scipy_on_edge_cases():
+    assert_matches_scipy(
+        [
+            (0, 0, 0, 10),  # empty row and column
+            (5, 0, 0, 5),  # perfect co-occurrence
+            (0, 5, 5, 0),  # perfect exclusivity
+            (3, 3, 3, 3),  # table at the mode
+            (1, 9, 9, 1),  # symmetric margins
+            (2, 8, 8, 2),
+            (0, 12, 40, 9948),  # sparse genes in a large cohort
+            (150, 10, 12, 9828),  # p-value far below 1e-300
+            (1, 0, 0, 0),
+        ]
+    )
+
+
+def test_fisher_exact_batch_reuses_duplicate_tables():
+    n11 = np.array([3, 1, 3, 1])
+    n10 = np.array([2, 4, 2, 4])
+    n01 = np.array([1, 5, 1, 5])
+    n00 = np.array([14, 10, 14, 10])
+    oddsratios, pvalues = fisher_exact_batch(n11, n10, n01, n00)
+    assert pvalues[0] == pvalues[2]
+    assert pvalues[1] == pvalues[3]
+    assert oddsratios[0] == fisher_exact([[3, 2], [1, 14]])[0]
+
+
+def test_fisher_exact_batch_empty_input():
+    oddsratios, pvalues = fisher_exact_batch([], [], [], [])
+    assert len(oddsratios) == 0
+    assert len(pvalues) == 0
+
+
+if __name__ == "__main__":
+    test_fisher_exact_batch_matches_scipy_on_random_tables()
@@ -0,0 +1,96 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from conftest import write_maf
+from maf_tools import gene_ranking as gene_ranking_module
+from maf_tools.gene_ranking import GeneRanking, gene_ranking
+from maf_tools.incidence import IncidenceMatrix
+from maf_tools.maf_cache import get_maf_cache
+
+# TTN has the most mutation rows but is mutated in only one sample.
+RECORDS = [
+    ("TTN", "S1", "Missense_Mutation"),
+    ("TTN", "S1", "Missense_Mutation"),
+    ("TTN", "S1", "Silent"),
+    ("TTN", "S1", "Silent"),
+    ("TTN", "S1", "Nonsense_Mutation"),
+    ("TP53", "S1", "Missense_Mutation"),
+    ("TP53", "S2", "Nonsense_Mutation"),
+    ("TP53", "S3", "Missense_Mutation"),
+    ("KRAS", "S2", "Missense_Mutation"),
+    ("KRAS", "S4", "Missense_Mutation"),
+    ("APC", "S3", "Silent"),
+    ("APC", "S4", "Silent"),
+    ("APC", "S5", "Silent"),
+]
+
+
+def maf_frame(records=RECORDS):
+    return pd.DataFrame(
+        records, columns=["Hugo_Symbol", "Tumor_Sample_Barcode", "Variant_Classification"]
+    )
+
+
+def test_ranks_genes_by_mutated_samples():
+    ranking = GeneRanking.from_maf(maf_frame())
+    assert ranking.ranking().to_dict() == {"APC": 3, "TP53": 3, "KRAS": 2, "TTN": 1}
+    assert ranking.top_genes(2) == ["APC", "TP53"]
+
+
+def test_classification_filters():
+    ranking = GeneRanking.from_maf(maf_frame())
+    assert ranking.top_genes(10, exclude_classifications=["Silent"]) == ["TP53", "KRAS", "TTN"]
+    assert ranking.top_genes(10, include_classifications=["Nonsense_Mutation"]) == [
+        "TP53",
+        "TTN",
+    ]
+    # Each filter is ranked once and reused.
+    assert ranking.ranking(["Silent"]) is ranking.ranking(["Silent"])
+
+
+def test_incidence_matches_incidence_from_maf():
+    maf_df = maf_frame()
+    ranking = GeneRanking.from_maf(maf_df)
+    genes = ranking.top_genes(3)
+    expected = IncidenceMatrix.from_maf(maf_df, genes=genes)
+    incidence = ranking.incidence(genes)
+    assert list(incidence.samples) == list(expected.samples)
+    assert (incidence.matrix == expected.matrix).all()
+
+    # Filtered-out mutations leave their sample in the matrix, unmutated.
+    filtered = ranking.incidence(["APC", "TP53"], exclude_classifications=["Silent"])
+    assert filtered.n_samples == 5
+    assert filtered.matrix[:, 0].sum() == 0
+
+
+def test_gene_ranking_is_shared_and_streaming_agrees(tmp_path):
+    gene_ranking_module._rankings.clear()
+    get_maf_cache().clear()
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS)
+
+    in_memory = gene_ranking(maf_file_path)
+    assert gene_ranking(maf_file_path) is in_memory
+
+    gene_ranking_module._rankings.clear()
+    streamed = gene_ranking(maf_file_path, chunksize=4)
+    assert streamed.ranking().equals(in_memory.ranking())
+    assert streamed.ranking(["Silent"]).equals(in_memory.ranking(["Silent"]))
+
+
+def test_ranking_without_classification_column(tmp_path):
+    gene_ranking_module._rankings.clear()
+    maf_file_path = tmp_path / "a.maf"
+    maf_frame()[["Hugo_Symbol", "Tumor_Sample_Barcode"]].to_csv(
+        maf_file_path, sep="\t", index=False
+    )
+    ranking = gene_ranking(str(maf_file_path))
+    assert ranking.top_genes(2) == ["APC", "TP53"]
+    assert ranking.top_genes(2, exclude_classifications=["Silent"]) == ["APC", "TP53"]
+
+
+if __name__ == "__main__":
+    test_ranks_genes_by_mutated_samples()
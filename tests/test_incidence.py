@@ -0,0 +1,67 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+from scipy.stats import fisher_exact
+
+from maf_tools.incidence import IncidenceMatrix, pairwise_interactions
+
+
+def random_maf(n_samples=60, n_genes=12, seed=0):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for s in range(n_samples):
+        for g in range(n_genes):
+            if rng.random() < 0.5 / (g + 1):
+                # Some samples carry several mutations in the same gene.
+                for _ in range(rng.integers(1, 3)):
+                    rows.append((f"G{g}", f"S{s}"))
+    return pd.DataFrame(rows, columns=["Hugo_Symbol", "Tumor_Sample_Barcode"]).astype(
+        "category"
+    )
+
+
+def test_incidence_matrix_marks_mutated_samples():
+    maf_df = pd.DataFrame(
+        {
+            "Hugo_Symbol": ["TP53", "TP53", "KRAS", "BRAF"],
+            "Tumor_Sample_Barcode": ["S1", "S1", "S2", "S3"],
+        }
+    )
+    incidence = IncidenceMatrix.from_maf(maf_df, genes=["TP53", "KRAS"])
+
+    assert list(incidence.samples) == ["S1", "S2", "S3"]
+    assert list(incidence.genes) == ["TP53", "KRAS"]
+    assert incidence.matrix.tolist() == [[1, 0], [0, 1], [0, 0]]
+    assert incidence.mutated_counts().tolist() == [1, 1]
+
+
+def test_pairwise_interactions_match_per_pair_fisher():
+    maf_df = random_maf()
+    genes = maf_df["Hugo_Symbol"].value_counts().index.tolist()
+    results_df = pairwise_interactions(IncidenceMatrix.from_maf(maf_df, genes=genes))
+
+    sample_count = maf_df["Tumor_Sample_Barcode"].nunique()
+    expected = []
+    for i in range(len(genes)):
+        for j in range(i + 1, len(genes)):
+            s1 = set(maf_df["Tumor_Sample_Barcode"][maf_df["Hugo_Symbol"] == genes[i]])
+            s2 = set(maf_df["Tumor_Sample_Barcode"][maf_df["Hugo_Symbol"] == genes[j]])
+            n11, n10, n01 = len(s1 & s2), len(s1 - s2), len(s2 - s1)
+            n00 = sample_count - n11 - n10 - n01
+            oddsratio, pvalue = fisher_exact([[n11, n10], [n01, n00]])
+            expected.append((genes[i], genes[j], pvalue, oddsratio, n00, n01, n11, n10))
+
+    assert len(results_df) == len(expected)
+    for row, exp in zip(results_df.itertuples(index=False), expected):
+        assert (row.gene1, row.gene2) == exp[:2]
+        assert np.isclose(row.pValue, exp[2], rtol=1e-9)
+        assert np.isclose(row.oddsRatio, exp[3], equal_nan=True)
+        assert (row[4], row[5], row[6], row[7]) == exp[4:]
+
+
+if __name__ == "__main__":
+    test_pairwise_interactions_match_per_pair_fisher()
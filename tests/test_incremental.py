@@ -0,0 +1,143 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pandas as pd
+
+from maf_tools import incremental
+from maf_tools.analyses import somatic_interactions, summarize_maf
+from maf_tools.gene_ranking import GeneRanking
+from maf_tools.maf_stream import SortedKeys
+from maf_tools.incremental import STATE_SUFFIX, incremental_analysis
+from maf_tools.synthetic import PlantedPair, generate_maf, write_maf
+
+
+def cohort(n_samples, seed):
+    return generate_maf(
+        n_samples,
+        40,
+        co_occurring=[PlantedPair("GENE3", "GENE4")],
+        mutually_exclusive=[PlantedPair("GENE1", "GENE2", 0.95)],
+        seed=seed,
+    )
+
+
+def append_maf(maf_df, maf_file_path):
+    with open(maf_file_path, "a") as f:
+        maf_df.to_csv(f, sep="\t", index=False, header=False)
+
+
+def full_results(maf_file_path):
+    return (
+        summarize_maf(maf_file_path, output_format="json"),
+        somatic_interactions(maf_file_path, 15, 0.05),
+        somatic_interactions(maf_file_path, 15, 0.05, exclude_classifications=["Silent"]),
+    )
+
+
+def incremental_results(maf_file_path, **kwargs):
+    return (
+        summarize_maf(maf_file_path, output_format="json", incremental=True, **kwargs),
+        somatic_interactions(maf_file_path, 15, 0.05, incremental=True, **kwargs),
+        somatic_interactions(
+            maf_file_path, 15, 0.05, exclude_classifications=["Silent"], incremental=True, **kwargs
+        ),
+    )
+
+
+def test_appended_rows_are_read_alone(tmp_path, monkeypatch):
+    maf_file_path = write_maf(cohort(300, 1), str(tmp_path / "cohort.maf"))
+    assert incremental_results(maf_file_path) == full_results(maf_file_path)
+    assert os.path.exists(maf_file_path + STATE_SUFFIX)
+
+    # A new process starts from the saved state and reads only the appended rows
+    incremental._states.clear()
+    new_samples = cohort(50, 2)
+    new_samples["Tumor_Sample_Barcode"] = "NEW" + new_samples["Tumor_Sample_Barcode"].astype(str)
+    append_maf(new_samples, maf_file_path)
+
+    def full_read(*args, **kwargs):
+        raise AssertionError("the whole file was read again")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(incremental, "read_maf_chunks", full_read)
+        results = incremental_results(maf_file_path)
+    assert results == full_results(maf_file_path)
+
+
+def test_rewritten_file_is_read_again(tmp_path):
+    maf_file_path = write_maf(cohort(300, 1), str(tmp_path / "cohort.maf"))
+    incremental_results(maf_file_path)
+
+    write_maf(cohort(200, 3), maf_file_path)
+    assert incremental_results(maf_file_path) == full_results(maf_file_path)
+
+
+def test_delta_maf_is_applied_once(tmp_path):
+    base, delta = cohort(300, 1), cohort(60, 4)
+    delta["Tumor_Sample_Barcode"] = "NEW" + delta["Tumor_Sample_Barcode"].astype(str)
+    maf_file_path = write_maf(base, str(tmp_path / "cohort.maf"))
+    delta_file_path = write_maf(delta, str(tmp_path / "delta.maf"))
+    combined_file_path = write_maf(base, str(tmp_path / "combined.maf"))
+    append_maf(delta, combined_file_path)
+
+    expected = full_results(combined_file_path)
+    assert incremental_results(maf_file_path, delta_maf_file_path=delta_file_path) == expected
+    assert incremental_results(maf_file_path, delta_maf_file_path=delta_file_path) == expected
+    assert incremental_analysis(maf_file_path).n_mutations == len(base) + len(delta)
+
+
+def test_more_top_genes_than_tracked(tmp_path):
+    maf_file_path = write_maf(cohort(300, 1), str(tmp_path / "cohort.maf"))
+    assert somatic_interactions(maf_file_path, 5, 0.05, incremental=True) == (
+        somatic_interactions(maf_file_path, 5, 0.05)
+    )
+    assert somatic_interactions(maf_file_path, 30, 0.05, incremental=True) == (
+        somatic_interactions(maf_file_path, 30, 0.05)
+    )
+
+
+def test_queries_after_an_update_skip_the_record_set(monkeypatch):
+    state = incremental.IncrementalAnalysis(list(cohort(1, 1).columns))
+    state.update(cohort(300, 1))
+    state.interactions(15, ["Silent"])
+    new_samples = cohort(20, 2)
+    new_samples["Tumor_Sample_Barcode"] = "NEW" + new_samples["Tumor_Sample_Barcode"].astype(str)
+    state.update(new_samples)
+
+    def values(self):
+        raise AssertionError("a query went through every record")
+
+    monkeypatch.setattr(SortedKeys, "values", values)
+    top_genes, _ = state.interactions(15)
+    state.interactions(15, ["Silent"])
+    assert state.summary().top_genes(15) == top_genes
+
+
+def test_rankings_match_the_shared_gene_ranking():
+    chunks = [cohort(300, 1), cohort(40, 2), cohort(40, 3)]
+    chunks[1]["Tumor_Sample_Barcode"] = "NEW" + chunks[1]["Tumor_Sample_Barcode"].astype(str)
+    state = incremental.IncrementalAnalysis(list(chunks[0].columns))
+    for position, chunk in enumerate(chunks):
+        state.update(chunk)
+        ranking = GeneRanking.from_maf(pd.concat(chunks[: position + 1]))
+        for exclude in ([], ["Silent"], ["Missense_Mutation", "Nonsense_Mutation"]):
+            expected = ranking.ranking(exclude)
+            pd.testing.assert_series_equal(state.ranking(exclude), expected)
+            # The partial sort breaks ties at the cut like the full ranking
+            for n in (0, 1, 7, 15, 1000):
+                pd.testing.assert_series_equal(state.ranking(exclude, n), expected.iloc[:n])
+
+
+def test_incremental_requires_fisher(tmp_path):
+    maf_file_path = write_maf(cohort(20, 1), str(tmp_path / "cohort.maf"))
+    result = somatic_interactions(maf_file_path, 5, 0.05, method="permutation", incremental=True)
+    assert result.startswith("Error")
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    test_delta_maf_is_applied_once(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,54 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import subprocess
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+HEAVY_MODULES = ("crewai", "langchain_openai", "scipy", "statsmodels", "pandas", "requests")
+
+
+def imported_after(code):
+    """
+    Runs ``code`` in a fresh interpreter and returns the heavy modules it imported.
+    """
+    script = (
+        code
+        + "\nimport json, sys\n"
+        + f"print(json.dumps(sorted(m for m in {HEAVY_MODULES!r} if m in sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_cli_imports_no_heavy_dependencies():
+    assert imported_after("import main") == []
+
+
+def test_summary_imports_only_pandas(tmp_path):
+    maf_file_path = tmp_path / "a.maf"
+    maf_file_path.write_text(
+        "Hugo_Symbol\tTumor_Sample_Barcode\tVariant_Classification\n"
+        "TP53\tS1\tMissense_Mutation\n"
+    )
+    code = (
+        "from maf_tools.analyses import summarize_maf\n"
+        f"assert 'Number of Samples: 1' in summarize_maf({str(maf_file_path)!r})"
+    )
+    assert imported_after(code) == ["pandas"]
+
+
+def test_pipeline_does_not_import_crewai():
+    assert "crewai" not in imported_after("import maf_tools.pipeline, maf_tools.batch")
+
+
+if __name__ == "__main__":
+    test_cli_imports_no_heavy_dependencies()
@@ -0,0 +1,97 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from maf_tools.llm_cache import CachedLLM, cache_llm_calls, llm_cache_key
+from maf_tools.natural_language_parser import NaturalLanguageParser
+from maf_tools.persistent_cache import PersistentCache
+
+PLAN = {
+    "steps": [
+        "Summarize MAF file",
+        "Perform somatic interaction analysis",
+        "Identify drug-gene interactions",
+    ]
+}
+
+
+class StubLLM:
+    """Local stand-in for the OpenAI client that counts its calls."""
+
+    model_name = "stub"
+    temperature = 0.3
+
+    def __init__(self, response=json.dumps(PLAN)):
+        self.response = response
+        self.prompts = []
+
+    def invoke(self, prompt):
+        self.prompts.append(prompt)
+        return self.response
+
+
+def test_cache_key_covers_model_temperature_prompt_and_inputs():
+    key = llm_cache_key("gpt-4o-mini", 0.3, "plan", instruction="a")
+    assert key == llm_cache_key("gpt-4o-mini", 0.3, "plan", instruction="a")
+    assert key != llm_cache_key("gpt-4o", 0.3, "plan", instruction="a")
+    assert key != llm_cache_key("gpt-4o-mini", 0.7, "plan", instruction="a")
+    assert key != llm_cache_key("gpt-4o-mini", 0.3, "other", instruction="a")
+    assert key != llm_cache_key("gpt-4o-mini", 0.3, "plan", instruction="b")
+
+
+def test_cached_llm_reuses_responses(tmp_path):
+    stub = StubLLM()
+    llm = CachedLLM(stub, cache=PersistentCache(str(tmp_path / "llm.sqlite")))
+
+    assert llm.invoke("plan this") == llm.invoke("plan this")
+    assert len(stub.prompts) == 1
+    llm.invoke("plan that")
+    assert len(stub.prompts) == 2
+
+    # The cache is persistent: a new process (client) reuses the responses.
+    other = StubLLM()
+    CachedLLM(other, cache=PersistentCache(str(tmp_path / "llm.sqlite"))).invoke("plan this")
+    assert other.prompts == []
+
+
+def test_natural_language_parser_caches_plans(tmp_path):
+    stub = StubLLM()
+    parser = NaturalLanguageParser(
+        llm=CachedLLM(stub, cache=PersistentCache(str(tmp_path / "llm.sqlite"))),
+        use_rules=False,
+    )
+    instruction = "Analyze the MAF file and identify potential therapeutic targets."
+
+    expected = dict(PLAN, planner="llm")
+    assert json.loads(parser._run(instruction)) == expected
+    assert json.loads(parser._run(instruction)) == expected
+    assert len(stub.prompts) == 1
+    parser._run("Summarize the MAF file.")
+    assert len(stub.prompts) == 2
+
+
+def test_cache_llm_calls_caches_text_responses_only():
+    class FakeAgentLLM:
+        model = "stub"
+        temperature = 0.7
+
+        def __init__(self):
+            self.calls = 0
+
+        def call(self, messages, tools=None, callbacks=None, available_functions=None):
+            self.calls += 1
+            return {"tool": "maf_summarizer"} if tools else f"answer {self.calls}"
+
+    llm = cache_llm_calls(FakeAgentLLM(), cache=PersistentCache(":memory:"))
+    messages = [{"role": "user", "content": "Summarize"}]
+    assert llm.call(messages) == llm.call(messages) == "answer 1"
+    assert llm.call(messages, tools=[{"name": "maf_summarizer"}]) == {"tool": "maf_summarizer"}
+    llm.call(messages, tools=[{"name": "maf_summarizer"}])
+    assert llm.calls == 3
+
+
+if __name__ == "__main__":
+    test_cached_llm_reuses_responses()
@@ -0,0 +1,90 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from conftest import MAF_RECORDS, write_maf
+from maf_tools.maf_cache import MAFCache, load_maf, get_maf_cache
+
+
+def test_maf_cache_hits_and_misses(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    cache = MAFCache()
+
+    first = cache.get(maf_file_path)
+    second = cache.get(maf_file_path)
+
+    assert first is second
+    assert len(first) == 6
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["entries"] == 1
+
+
+def test_maf_cache_reloads_modified_file(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    cache = MAFCache()
+    assert len(cache.get(maf_file_path)) == 6
+
+    write_maf(maf_file_path, MAF_RECORDS + [("EGFR", "S3", "Missense_Mutation")])
+    os.utime(maf_file_path, ns=(0, 10**9))
+
+    assert len(cache.get(maf_file_path)) == 7
+    stats = cache.stats()
+    assert stats["misses"] == 2
+    assert stats["entries"] == 1
+
+
+def test_maf_cache_evicts_least_recently_used(tmp_path):
+    paths = [write_maf(tmp_path / f"{name}.maf") for name in "abc"]
+    probe = MAFCache()
+    probe.get(paths[0])
+    entry_bytes = probe.stats()["bytes"]
+
+    cache = MAFCache(max_bytes=2 * entry_bytes)
+    cache.get(paths[0])
+    cache.get(paths[1])
+    cache.get(paths[0])  # a is now the most recently used entry
+    cache.get(paths[2])  # evicts b
+
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["evictions"] == 1
+    cache.get(paths[0])
+    assert cache.stats()["hits"] == 2
+    cache.get(paths[1])
+    assert cache.stats()["misses"] == 4
+
+
+def test_maf_cache_widens_entry_for_new_columns(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    cache = MAFCache()
+
+    narrow = cache.get(maf_file_path, columns=["Hugo_Symbol"])
+    assert list(narrow.columns) == ["Hugo_Symbol"]
+    assert cache.get(maf_file_path, columns=["Hugo_Symbol"]) is narrow
+
+    wide = cache.get(maf_file_path, columns=["Tumor_Sample_Barcode"])
+    assert sorted(wide.columns) == ["Hugo_Symbol", "Tumor_Sample_Barcode"]
+    assert cache.get(maf_file_path, columns=["Hugo_Symbol"]) is wide
+    stats = cache.stats()
+    assert stats["misses"] == 2
+    assert stats["hits"] == 2
+    assert stats["entries"] == 1
+
+
+def test_load_maf_uses_shared_cache(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    get_maf_cache().clear()
+
+    assert load_maf(maf_file_path) is load_maf(maf_file_path)
+    assert get_maf_cache().stats()["hits"] == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_maf_cache_hits_and_misses(pathlib.Path(tmp))
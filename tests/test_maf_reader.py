@@ -0,0 +1,70 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import pytest
+
+from conftest import write_maf
+from maf_tools.maf_reader import MissingColumnsError, read_maf, read_maf_header
+
+COMMENTS = ["#version 2.4", "#comment line"]
+COLUMNS = [
+    "Hugo_Symbol",
+    "Entrez_Gene_Id",
+    "Tumor_Sample_Barcode",
+    "Variant_Classification",
+    "t_alt_count",
+]
+RECORDS = [
+    ("TP53", 7157, "S2", "Missense_Mutation", 10),
+    ("KRAS", 3845, "S1", "Missense_Mutation", 4),
+    ("TP53", 7157, "S1", "Nonsense_Mutation", 7),
+]
+
+
+def test_read_maf_header(tmp_path):
+    header, comment_lines = read_maf_header(write_maf(tmp_path / "a.maf", RECORDS, COLUMNS, COMMENTS))
+    assert header[0] == "Hugo_Symbol"
+    assert len(header) == 5
+    assert comment_lines == 2
+
+
+@pytest.mark.parametrize("engine", ["c", "pyarrow"])
+def test_read_maf_prunes_columns_and_uses_categoricals(tmp_path, engine):
+    if engine == "pyarrow":
+        pytest.importorskip("pyarrow")
+    maf_df = read_maf(
+        write_maf(tmp_path / "a.maf", RECORDS, COLUMNS, COMMENTS),
+        usecols=["Tumor_Sample_Barcode", "Hugo_Symbol", "t_alt_count"],
+        engine=engine,
+    )
+
+    assert sorted(maf_df.columns) == ["Hugo_Symbol", "Tumor_Sample_Barcode", "t_alt_count"]
+    assert maf_df["Hugo_Symbol"].dtype == "category"
+    assert maf_df["Tumor_Sample_Barcode"].dtype == "category"
+    assert list(maf_df["Tumor_Sample_Barcode"].cat.categories) == ["S1", "S2"]
+    assert maf_df["t_alt_count"].tolist() == [10, 4, 7]
+    assert maf_df["Hugo_Symbol"].tolist() == ["TP53", "KRAS", "TP53"]
+
+
+def test_read_maf_reports_missing_columns_up_front(tmp_path):
+    with pytest.raises(MissingColumnsError) as excinfo:
+        read_maf(write_maf(tmp_path / "a.maf", RECORDS, COLUMNS, COMMENTS), usecols=["Hugo_Symbol", "Variant_Type"])
+    assert excinfo.value.missing == ["Variant_Type"]
+    assert isinstance(excinfo.value, KeyError)
+    assert str(excinfo.value) == "Variant_Type"
+
+
+def test_read_maf_without_categoricals(tmp_path):
+    maf_df = read_maf(write_maf(tmp_path / "a.maf", RECORDS, COLUMNS, COMMENTS), categorical=False)
+    assert maf_df["Hugo_Symbol"].dtype == object
+    assert len(maf_df.columns) == 5
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_read_maf_header(pathlib.Path(tmp))
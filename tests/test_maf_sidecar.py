@@ -0,0 +1,137 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from conftest import write_maf
+from maf_tools import gene_ranking, maf_sidecar
+from maf_tools.maf_cache import MAFCache, get_maf_cache
+from maf_tools.maf_reader import read_maf
+from maf_tools.maf_sidecar import (
+    RANKING_SUFFIX,
+    read_maf_with_sidecar,
+    read_sidecar,
+    sidecar_path,
+    write_sidecar,
+)
+
+COLUMNS = ["Hugo_Symbol", "Tumor_Sample_Barcode", "Variant_Classification", "t_alt_count"]
+RECORDS = [
+    ("TP53", "S2", "Missense_Mutation", 10),
+    ("KRAS", "S1", "Missense_Mutation", 4),
+    ("TP53", "S1", "Nonsense_Mutation", 7),
+]
+
+
+@pytest.fixture
+def sidecars_enabled():
+    maf_sidecar.set_sidecar_enabled(True)
+    yield
+    maf_sidecar.set_sidecar_enabled(False)
+
+
+def test_sidecar_round_trip(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, COLUMNS)
+    assert read_sidecar(maf_file_path) is None
+
+    assert write_sidecar(maf_file_path) == sidecar_path(maf_file_path)
+    maf_df = read_sidecar(maf_file_path, ["Hugo_Symbol", "Tumor_Sample_Barcode"])
+
+    expected = read_maf(maf_file_path, usecols=["Hugo_Symbol", "Tumor_Sample_Barcode"])
+    assert maf_df["Hugo_Symbol"].dtype == "category"
+    assert maf_df["Hugo_Symbol"].tolist() == expected["Hugo_Symbol"].tolist()
+    assert maf_df["Tumor_Sample_Barcode"].tolist() == ["S2", "S1", "S1"]
+    # Columns outside the sidecar are not served from it.
+    assert read_sidecar(maf_file_path, ["t_alt_count"]) is None
+
+
+def test_sidecar_is_invalidated_when_source_changes(tmp_path, monkeypatch):
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, COLUMNS)
+    write_sidecar(maf_file_path)
+
+    # Touching the file keeps the sidecar valid: the content digest still matches.
+    os.utime(maf_file_path, ns=(0, 10**9))
+    assert read_sidecar(maf_file_path) is not None
+    # The new mtime is stored, so the file is not hashed again
+    monkeypatch.setattr(maf_sidecar, "file_digest", None)
+    assert read_sidecar(maf_file_path) is not None
+    monkeypatch.undo()
+
+    write_maf(maf_file_path, [("BRAF", *record[1:]) for record in RECORDS], COLUMNS)
+    os.utime(maf_file_path, ns=(0, 2 * 10**9))
+    assert read_sidecar(maf_file_path) is None
+
+
+def test_sidecar_dir_override(tmp_path, monkeypatch):
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, COLUMNS)
+    monkeypatch.setenv("MAF_AI_SIDECAR_DIR", str(tmp_path / "sidecars"))
+
+    path = write_sidecar(maf_file_path)
+    assert os.path.dirname(path) == str(tmp_path / "sidecars")
+    assert read_sidecar(maf_file_path) is not None
+
+
+def test_cache_builds_and_reuses_sidecar(tmp_path, sidecars_enabled):
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, COLUMNS)
+    columns = ["Hugo_Symbol", "Variant_Classification"]
+
+    maf_df = MAFCache().get(maf_file_path, columns)
+    assert os.path.exists(sidecar_path(maf_file_path))
+    reloaded = read_maf_with_sidecar(maf_file_path, columns)
+    assert reloaded.equals(maf_df)
+
+
+def test_ranking_sidecar_skips_the_records(tmp_path, sidecars_enabled, monkeypatch):
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS + [("KRAS", "S2", "Silent", 3)], COLUMNS)
+    gene_ranking._rankings.clear()
+    built = gene_ranking.gene_ranking(maf_file_path)
+    assert os.path.exists(sidecar_path(maf_file_path, RANKING_SUFFIX))
+
+    # A new process reads the coded records instead of the MAF records
+    gene_ranking._rankings.clear()
+    get_maf_cache().clear()
+
+    def load_maf(*args, **kwargs):
+        raise AssertionError("the MAF records were read")
+
+    monkeypatch.setattr(gene_ranking, "load_maf", load_maf)
+    loaded = gene_ranking.gene_ranking(maf_file_path)
+    for name in ("sample_codes", "gene_codes", "classification_codes"):
+        assert np.array_equal(getattr(loaded, name), getattr(built, name))
+    assert loaded.ranking(["Silent"]).equals(built.ranking(["Silent"]))
+    genes = built.top_genes(2)
+    assert np.array_equal(loaded.incidence(genes).matrix, built.incidence(genes).matrix)
+
+
+def test_sidecars_require_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+    with pytest.raises(ImportError, match="maf-ai\\[arrow\\]"):
+        maf_sidecar.set_sidecar_enabled(True)
+    assert not maf_sidecar.sidecar_enabled()
+
+    # Enabled from the environment: loads warn and fall back to the text
+    monkeypatch.setattr(maf_sidecar, "_write_enabled", True)
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, COLUMNS)
+    with pytest.warns(UserWarning, match="pyarrow"):
+        maf_df = read_maf_with_sidecar(maf_file_path, ["Hugo_Symbol"])
+    assert list(maf_df["Hugo_Symbol"]) == ["TP53", "KRAS", "TP53"]
+    assert not maf_sidecar.sidecar_enabled()
+
+
+def test_sidecar_is_not_written_when_disabled(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf", RECORDS, COLUMNS)
+    read_maf_with_sidecar(maf_file_path, ["Hugo_Symbol"])
+    assert not os.path.exists(sidecar_path(maf_file_path))
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_sidecar_round_trip(pathlib.Path(tmp))
@@ -0,0 +1,126 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.gene_ranking import GeneRanking
+from maf_tools.incidence import IncidenceMatrix
+from maf_tools.maf_cache import load_maf
+from maf_tools.maf_reader import read_maf_chunks
+from maf_tools.maf_stream import SortedKeys, sort_counts
+from maf_tools.maf_summarizer import MAFSummarizer
+from maf_tools.somatic_interactions import SomaticInteractionsTool
+
+
+def write_random_maf(path, n_samples=120, n_genes=20, seed=7):
+    rng = np.random.default_rng(seed)
+    rows = []
+    for s in range(n_samples):
+        mutated = {g for g in range(n_genes) if rng.random() < 0.4 / (1 + g / 4)}
+        if 0 in mutated and rng.random() < 0.8:
+            mutated.add(1)  # planted co-occurrence
+        if 2 in mutated:
+            mutated.discard(3)  # planted mutual exclusivity
+        for g in mutated:
+            for _ in range(rng.integers(1, 3)):
+                rows.append(
+                    (
+                        f"GENE{g}",
+                        f"S{s:03d}",
+                        rng.choice(["Missense_Mutation", "Silent", "Nonsense_Mutation"]),
+                    )
+                )
+    rng.shuffle(rows)
+    maf_df = pd.DataFrame(
+        rows, columns=["Hugo_Symbol", "Tumor_Sample_Barcode", "Variant_Classification"]
+    )
+    with open(path, "w") as f:
+        f.write("#version 2.4\n")
+        maf_df.to_csv(f, sep="\t", index=False)
+    return str(path)
+
+
+def test_sort_counts_breaks_ties_by_label():
+    counts = pd.Series({"KRAS": 2, "BRAF": 2, "TP53": 5, "EGFR": 0})
+    assert sort_counts(counts).to_dict() == {"TP53": 5, "BRAF": 2, "KRAS": 2}
+    assert list(sort_counts(counts).index) == ["TP53", "BRAF", "KRAS"]
+
+
+def test_streamed_ranking_matches_in_memory(tmp_path):
+    maf_file_path = write_random_maf(tmp_path / "cohort.maf")
+    maf_df = load_maf(maf_file_path)
+    columns = ["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification"]
+    ranking = GeneRanking.from_chunks(read_maf_chunks(maf_file_path, columns, 37))
+
+    assert len(ranking.samples) == maf_df["Tumor_Sample_Barcode"].nunique()
+    pairs = maf_df[["Hugo_Symbol", "Tumor_Sample_Barcode"]].drop_duplicates()
+    assert ranking.ranking().equals(sort_counts(pairs["Hugo_Symbol"].value_counts()))
+
+    genes = ranking.top_genes(10)
+    streamed = ranking.incidence(genes)
+    in_memory = IncidenceMatrix.from_maf(maf_df, genes=genes)
+    assert list(streamed.samples) == list(in_memory.samples)
+    assert np.array_equal(streamed.matrix, in_memory.matrix)
+
+    expected = GeneRanking.from_maf(maf_df[columns])
+    assert np.array_equal(ranking.gene_codes, expected.gene_codes)
+    assert np.array_equal(ranking.sample_codes, expected.sample_codes)
+    assert np.array_equal(ranking.classification_codes, expected.classification_codes)
+
+
+def test_streamed_ranking_memory_does_not_grow_with_rows(tmp_path):
+    columns = ["Tumor_Sample_Barcode", "Hugo_Symbol", "Variant_Classification"]
+    peaks = []
+    for copies in (40, 160):
+        # The same records repeated: more rows, no more distinct records. Both
+        # files are larger than the parser's read buffer.
+        maf_df = pd.concat([load_maf(write_random_maf(tmp_path / "base.maf"))] * copies)
+        maf_file_path = str(tmp_path / f"cohort{copies}.maf")
+        maf_df.to_csv(maf_file_path, sep="\t", index=False)
+        del maf_df
+        tracemalloc.start()
+        GeneRanking.from_chunks(read_maf_chunks(maf_file_path, columns, 1000))
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    assert peaks[1] < 1.2 * peaks[0]
+
+
+def test_sorted_keys_merge_in_logarithmic_runs():
+    keys = SortedKeys()
+    rng = np.random.default_rng(0)
+    added = []
+    for _ in range(200):
+        chunk = rng.integers(0, 50000, 100)
+        novel = keys.add(chunk)
+        assert not np.isin(novel, np.concatenate(added or [np.empty(0, dtype=np.int64)])).any()
+        added.append(novel)
+        # Each run is at least twice as long as the next
+        lengths = [len(run) for run in keys.runs]
+        assert all(longer >= 2 * shorter for longer, shorter in zip(lengths, lengths[1:]))
+    values = keys.values()
+    assert (values == np.unique(np.concatenate(added))).all()
+    assert len(keys.runs) == 1
+    in_range = values[(values >= 1000) & (values < 2000)]
+    assert (np.sort(keys.range(1000, 2000)) == in_range).all()
+
+
+def test_streaming_tools_match_in_memory_output(tmp_path):
+    maf_file_path = write_random_maf(tmp_path / "cohort.maf")
+
+    summarizer = MAFSummarizer()
+    assert summarizer._run(maf_file_path, chunksize=50) == summarizer._run(maf_file_path)
+
+    tool = SomaticInteractionsTool()
+    in_memory = tool._run(maf_file_path, top_n=12, pvalue_cutoff=0.05)
+    streamed = tool._run(maf_file_path, top_n=12, pvalue_cutoff=0.05, chunksize=50)
+    assert "GENE0" in in_memory
+    assert streamed == in_memory
+
+
+if __name__ == "__main__":
+    test_sort_counts_breaks_ties_by_label()
@@ -0,0 +1,93 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.incidence import IncidenceMatrix, pairwise_interactions
+from maf_tools.permutation import curveball_pass, permutation_interactions
+from maf_tools.somatic_interactions import SomaticInteractionsTool
+
+
+def hypermutated_incidence(seed=0):
+    """
+    20 samples mutated in every gene plus 180 samples with one random mutation.
+    """
+    rng = np.random.default_rng(seed)
+    matrix = np.zeros((200, 6), dtype=np.uint8)
+    matrix[:20] = 1
+    matrix[np.arange(20, 200), rng.integers(0, 6, 180)] = 1
+    samples = pd.Index([f"S{i:03d}" for i in range(200)])
+    return IncidenceMatrix(samples, pd.Index([f"G{j}" for j in range(6)]), matrix)
+
+
+def test_curveball_preserves_margins():
+    rng = np.random.default_rng(1)
+    matrix = rng.random((51, 20)) < 0.3
+    rows, columns = matrix.sum(axis=1), matrix.sum(axis=0)
+    original = matrix.copy()
+    for _ in range(5):
+        curveball_pass(matrix, rng)
+    assert (matrix.sum(axis=1) == rows).all()
+    assert (matrix.sum(axis=0) == columns).all()
+    assert (matrix != original).any()
+
+
+def test_curveball_samples_trades_uniformly():
+    rng = np.random.default_rng(2)
+    matrix = np.array([[1, 1, 0, 0], [0, 0, 1, 1]], dtype=bool)
+    counts = Counter()
+    for _ in range(3000):
+        curveball_pass(matrix, rng)
+        counts[matrix[0].tobytes()] += 1
+    # All 6 ways of splitting the four columns between the rows.
+    assert len(counts) == 6
+    assert min(counts.values()) > 400
+
+
+def test_permutation_results_do_not_depend_on_workers():
+    incidence = hypermutated_incidence()
+    single = permutation_interactions(incidence, 600, seed=7, workers=1)
+    pooled = permutation_interactions(incidence, 600, seed=7, workers=2)
+    pd.testing.assert_frame_equal(single, pooled)
+
+
+def test_permutation_controls_for_mutation_burden():
+    incidence = hypermutated_incidence()
+    fisher = pairwise_interactions(incidence)
+    permuted = permutation_interactions(incidence, 500, seed=3, workers=1)
+
+    # Fisher's test calls every pair co-occurring because of the hypermutators.
+    assert (fisher["pValue"] < 0.05).all()
+    assert (permuted["pValue"] > 0.05).all()
+    assert permuted[["gene1", "gene2", "11", "10", "01", "00"]].equals(
+        fisher[["gene1", "gene2", "11", "10", "01", "00"]]
+    )
+
+
+def test_somatic_interactions_tool_permutation_method(tmp_path):
+    maf_file_path = tmp_path / "a.maf"
+    incidence = hypermutated_incidence()
+    with open(maf_file_path, "w") as f:
+        f.write("Hugo_Symbol\tTumor_Sample_Barcode\n")
+        for i, j in zip(*np.nonzero(incidence.matrix)):
+            f.write(f"{incidence.genes[j]}\t{incidence.samples[i]}\n")
+
+    tool = SomaticInteractionsTool()
+    assert json.loads(tool._run(str(maf_file_path), 6, 0.05))["significant"] == 15
+    permuted = tool._run(
+        str(maf_file_path), 6, 0.05, method="permutation", permutations=500, seed=1
+    )
+    assert json.loads(permuted)["significant"] == 0
+    assert tool._run(str(maf_file_path), 6, 0.05, method="bootstrap").startswith(
+        "Error: Unknown method"
+    )
+
+
+if __name__ == "__main__":
+    test_curveball_preserves_margins()
@@ -0,0 +1,57 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+from maf_tools.persistent_cache import PersistentCache
+
+
+def test_persistent_cache_round_trip_and_counters(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.sqlite"))
+    assert cache.get("TP53:5") is None
+    cache.set("TP53:5", [{"drug": "X"}])
+
+    assert cache.get("TP53:5") == [{"drug": "X"}]
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_persistent_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = PersistentCache(path)
+    cache.set("KRAS:5", [])
+    cache.close()
+
+    assert PersistentCache(path).get("KRAS:5") == []
+
+
+def test_persistent_cache_expires_entries(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.sqlite"), ttl=0.05)
+    cache.set("BRAF:5", ["a"])
+    time.sleep(0.1)
+    assert cache.get("BRAF:5") is None
+
+
+def test_persistent_cache_evicts_least_recently_used(tmp_path):
+    cache = PersistentCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    cache.set("a", 1)
+    time.sleep(0.01)
+    cache.set("b", 2)
+    time.sleep(0.01)
+    assert cache.get("a") == 1  # b is now the least recently used entry
+    time.sleep(0.01)
+    cache.set("c", 3)
+
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+
+
+if __name__ == "__main__":
+    import tempfile
+    import pathlib
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_persistent_cache_round_trip_and_counters(pathlib.Path(tmp))
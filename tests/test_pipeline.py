@@ -0,0 +1,63 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+from conftest import write_maf
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
+from maf_tools.pipeline import run_analyses, run_pipeline
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "dgidb")
+
+
+def snapshot_tool():
+    snapshot = DGIdbSnapshot.build(
+        os.path.join(DATA_DIR, "interactions.tsv"),
+        drugs_path=os.path.join(DATA_DIR, "drugs.tsv"),
+    )
+    return DrugGeneInteractionTool(client=snapshot)
+
+
+def test_run_analyses_returns_every_section(tmp_path):
+    results = run_analyses(
+        write_maf(tmp_path / "a.maf"),
+        top_n=3,
+        num_genes=2,
+        num_interactions=1,
+        drug_gene_tool=snapshot_tool(),
+    )
+
+    assert list(results) == ["MAF Summary", "Somatic Interactions", "Drug-Gene Interactions"]
+    assert "Number of Samples: 4" in results["MAF Summary"]
+    assert json.loads(results["Somatic Interactions"])["rows"] == []
+    drug_gene = json.loads(results["Drug-Gene Interactions"])
+    assert drug_gene["genes"] == ["BRAF", "KRAS"]
+    assert drug_gene["rows"][0][:2] == ["BRAF", "VEMURAFENIB"]
+
+
+def test_streamed_analyses_match_in_memory(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    tool = snapshot_tool()
+    assert run_analyses(maf_file_path, drug_gene_tool=tool) == run_analyses(
+        maf_file_path, chunksize=2, drug_gene_tool=tool
+    )
+
+
+def test_run_pipeline_renders_report(tmp_path):
+    report = run_pipeline(write_maf(tmp_path / "a.maf"), drug_gene_tool=snapshot_tool())
+    assert report.startswith("# Comprehensive MAF Analysis Report")
+    assert "## Drug-Gene Interactions" in report
+    assert "| BRAF | VEMURAFENIB |" in report
+    assert "No significant somatic interactions found." in report
+
+
+def test_run_pipeline_reports_missing_file(tmp_path):
+    report = run_pipeline(str(tmp_path / "missing.maf"), drug_gene_tool=snapshot_tool())
+    assert "Error: MAF file not found" in report
+
+
+if __name__ == "__main__":
+    test_run_analyses_returns_every_section()
@@ -0,0 +1,88 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import time
+
+from maf_tools.natural_language_parser import NaturalLanguageParser
+from maf_tools.planner import (
+    ALL_STEPS,
+    DRUG_GENE_STEP,
+    SOMATIC_STEP,
+    SUMMARIZE_STEP,
+    rule_based_plan,
+)
+
+
+class StubLLM:
+    model_name = "stub"
+    temperature = 0.3
+
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, prompt):
+        self.calls += 1
+        return json.dumps({"steps": ["Plot survival curves"]})
+
+
+def test_default_instruction_maps_to_all_steps():
+    plan = rule_based_plan("Analyze the MAF file and identify potential therapeutic targets.")
+    assert plan["steps"] == ALL_STEPS
+    assert plan["planner"] == "rules"
+    assert plan["parameters"] == {}
+
+
+def test_intents_select_steps():
+    assert rule_based_plan("Give me an overview of the cohort")["steps"] == [SUMMARIZE_STEP]
+    assert rule_based_plan("Which genes are mutually exclusive?")["steps"] == [SOMATIC_STEP]
+    assert rule_based_plan("Find co-occurring mutations and druggable genes")["steps"] == [
+        SOMATIC_STEP,
+        DRUG_GENE_STEP,
+    ]
+
+
+def test_parameters_are_extracted():
+    plan = rule_based_plan("Test co-occurrence among the top 50 genes with p < 0.01")
+    assert plan["parameters"] == {"top_n": 50, "pvalue_cutoff": 0.01}
+
+    plan = rule_based_plan("List 3 drugs per gene for the top 10 mutated genes")
+    assert plan["steps"] == [DRUG_GENE_STEP]
+    assert plan["parameters"] == {"num_interactions": 3, "num_genes": 10}
+
+
+def test_unmatched_or_unsupported_instructions_fall_back():
+    assert rule_based_plan("Hello there") is None
+    assert rule_based_plan("Summarize the MAF and plot survival by pathway signature") is None
+
+
+def test_rules_answer_in_microseconds():
+    instruction = "Analyze the MAF file and identify potential therapeutic targets."
+    start = time.perf_counter()
+    for _ in range(1000):
+        rule_based_plan(instruction)
+    assert (time.perf_counter() - start) / 1000 < 1e-3
+
+
+def test_parser_reports_the_path_taken(tmp_path):
+    from maf_tools.llm_cache import CachedLLM
+    from maf_tools.persistent_cache import PersistentCache
+
+    stub = StubLLM()
+    parser = NaturalLanguageParser(
+        llm=CachedLLM(stub, cache=PersistentCache(str(tmp_path / "llm.sqlite")))
+    )
+
+    plan = json.loads(parser._run("Summarize the MAF file."))
+    assert plan["planner"] == "rules"
+    assert stub.calls == 0
+
+    plan = json.loads(parser._run("Plot survival curves for TP53 carriers."))
+    assert plan == {"steps": ["Plot survival curves"], "planner": "llm"}
+    assert stub.calls == 1
+
+
+if __name__ == "__main__":
+    test_default_instruction_maps_to_all_steps()
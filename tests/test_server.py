@@ -0,0 +1,134 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from conftest import MAF_RECORDS, write_maf
+from maf_tools.dgidb_client import DGIdbLookup
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+from maf_tools.server import AnalysisServer, AnalysisService, MemoryDGIdbClient
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "dgidb")
+
+
+def start_server():
+    snapshot = DGIdbSnapshot.build(
+        os.path.join(DATA_DIR, "interactions.tsv"),
+        drugs_path=os.path.join(DATA_DIR, "drugs.tsv"),
+    )
+    server = AnalysisServer(AnalysisService(snapshot), port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def request(server, path, body=None):
+    url = f"http://127.0.0.1:{server.server_address[1]}{path}"
+    data = json.dumps(body).encode() if body is not None else None
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, data=data)) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_endpoints(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    server = start_server()
+    try:
+        status, body = request(server, "/summarize", {"maf_file_path": maf_file_path})
+        assert status == 200
+        assert body["result"]["n_samples"] == 4
+
+        status, body = request(
+            server, "/somatic-interactions", {"maf_file_path": maf_file_path, "top_n": 3}
+        )
+        assert status == 200
+        assert body["result"]["genes_tested"] == 3
+
+        status, body = request(
+            server,
+            "/drug-gene-interactions",
+            {"maf_file_path": maf_file_path, "num_genes": 2, "num_interactions": 1},
+        )
+        assert status == 200
+        assert body["result"]["rows"][0][:2] == ["BRAF", "VEMURAFENIB"]
+
+        status, body = request(server, "/report", {"maf_file_path": maf_file_path, "top_n": 3})
+        assert status == 200
+        assert "| BRAF | VEMURAFENIB |" in body["report"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_repeated_requests_are_cached_until_the_file_changes(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    server = start_server()
+    try:
+        params = {"maf_file_path": maf_file_path}
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            responses = list(pool.map(lambda _: request(server, "/summarize", params), range(8)))
+        assert all(response == responses[0] for response in responses)
+
+        _, health = request(server, "/health")
+        results = health["caches"]["results"]
+        assert results["hits"] + results["misses"] == 8
+        assert results["entries"] == 1
+
+        write_maf(tmp_path / "a.maf", MAF_RECORDS + [("EGFR", "S5", "Missense_Mutation")])
+        _, body = request(server, "/summarize", params)
+        assert body["result"]["n_samples"] == 5
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_request_errors(tmp_path):
+    maf_file_path = write_maf(tmp_path / "a.maf")
+    server = start_server()
+    try:
+        assert request(server, "/unknown", {"maf_file_path": maf_file_path})[0] == 404
+        assert request(server, "/summarize", {})[0] == 400
+        status, body = request(server, "/summarize", {"maf_file_path": maf_file_path, "depth": 3})
+        assert status == 400
+        assert body["error"] == "Unknown parameters: depth"
+        status, body = request(server, "/summarize", {"maf_file_path": str(tmp_path / "missing.maf")})
+        assert status == 422
+        assert "not found" in body["error"]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FlakyBackend:
+    cache = None
+
+    def __init__(self):
+        self.calls = []
+
+    def fetch_interactions(self, genes, num_interactions):
+        self.calls.append(list(genes))
+        return DGIdbLookup({"BRAF": [{"drug": {"name": "VEMURAFENIB"}}]}, {"KRAS": "timeout"})
+
+
+def test_memory_dgidb_client_keeps_successful_lookups():
+    backend = FlakyBackend()
+    client = MemoryDGIdbClient(backend)
+    client.fetch_interactions(["BRAF", "KRAS", "TP53"], 5)
+    lookup = client.fetch_interactions(["BRAF", "KRAS", "TP53"], 5)
+
+    # Failed lookups are retried; found and not-found genes are remembered
+    assert backend.calls == [["BRAF", "KRAS", "TP53"], ["KRAS"]]
+    assert lookup.interactions["BRAF"][0]["drug"]["name"] == "VEMURAFENIB"
+    assert lookup.errors == {"KRAS": "timeout"}
+    assert client.stats()["errors"] == 2
+
+
+if __name__ == "__main__":
+    test_memory_dgidb_client_keeps_successful_lookups()
@@ -0,0 +1,94 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pandas as pd
+from statsmodels.sandbox.stats.multicomp import multipletests
+
+from maf_tools import analyses, incidence, sparse_incidence
+from maf_tools.analyses import somatic_interactions
+from maf_tools.fisher import fisher_exact_batch, min_pvalue_bounds, pvalue_lower_bounds
+from maf_tools.gene_ranking import GeneRanking
+from maf_tools.incidence import IncidenceMatrix, pairwise_interactions
+from maf_tools.sparse_incidence import SparseIncidence, interaction_blocks, sparse_interactions
+from maf_tools.synthetic import PlantedPair, generate_maf, write_maf
+
+
+def cohort(n_samples=150, n_genes=60, seed=0):
+    return generate_maf(
+        n_samples,
+        n_genes,
+        co_occurring=[PlantedPair("GENE3", "GENE4")],
+        mutually_exclusive=[PlantedPair("GENE1", "GENE2", 0.95)],
+        seed=seed,
+    )
+
+
+def test_blocks_match_dense_pairs():
+    maf_df = cohort()
+    ranking = GeneRanking.from_maf(maf_df)
+    genes = ranking.top_genes(60)
+    dense = pairwise_interactions(ranking.incidence(genes))
+    sparse_incidence = SparseIncidence.from_ranking(ranking, genes)
+    assert (sparse_incidence.matrix.toarray() == ranking.incidence(genes).matrix).all()
+
+    # Small blocks, so pairs span many of them
+    blocks = list(interaction_blocks(sparse_incidence, block_pairs=100))
+    assert len(blocks) > 10
+    pd.testing.assert_frame_equal(pd.concat(blocks), dense)
+
+
+def test_pruning_keeps_every_significant_pair(monkeypatch):
+    dense_incidence = IncidenceMatrix.from_maf(cohort(n_samples=80, seed=1))
+    dense = pairwise_interactions(dense_incidence)
+    dense["pAdjust"] = multipletests(dense["pValue"], method="fdr_bh")[1]
+
+    # With margin bounds looked up in a table, and computed per pair
+    for max_levels in (2048, 0):
+        monkeypatch.setattr(sparse_incidence, "_MAX_LEVELS", max_levels)
+        for cutoff in (1e-6, 0.05, 0.5, 1.01):
+            results_df, n_pairs = sparse_interactions(
+                SparseIncidence.from_dense(dense_incidence), cutoff, block_pairs=500
+            )
+            assert n_pairs == len(dense)
+            assert (results_df["pValue"] < cutoff).all()
+            expected = dense[dense["pAdjust"] < cutoff]
+            pd.testing.assert_frame_equal(results_df[results_df["pAdjust"] < cutoff], expected)
+
+
+def test_min_pvalue_bounds():
+    n = 30
+    r1, c1, n11 = np.meshgrid(np.arange(n + 1), np.arange(n + 1), np.arange(n + 1))
+    valid = (n11 <= np.minimum(r1, c1)) & (n11 >= np.maximum(0, r1 + c1 - n))
+    r1, c1, n11 = r1[valid], c1[valid], n11[valid]
+    _, pvalues = fisher_exact_batch(n11, r1 - n11, c1 - n11, n - r1 - c1 + n11)
+    assert (min_pvalue_bounds(r1, c1, n) <= pvalues * (1 + 1e-9)).all()
+    bounds = pvalue_lower_bounds(n11, r1, c1, n)
+    assert (bounds <= pvalues * (1 + 1e-9)).all()
+    # Most tables far from significance are recognized by their bound alone
+    assert (bounds >= 0.05).sum() > 0.8 * (pvalues >= 0.05).sum()
+
+
+def test_analysis_switches_to_sparse_backend(tmp_path, monkeypatch):
+    maf_file_path = write_maf(cohort(seed=2), str(tmp_path / "cohort.maf"))
+    dense = [
+        somatic_interactions(maf_file_path, 40, 0.05),
+        somatic_interactions(maf_file_path, 40, 0.05, output_format="text"),
+    ]
+    monkeypatch.setattr(analyses, "SPARSE_MIN_GENES", 10)
+
+    def dense_pairs(*args, **kwargs):
+        raise AssertionError("the dense backend was used")
+
+    monkeypatch.setattr(incidence, "pairwise_interactions", dense_pairs)
+    sparse = [
+        somatic_interactions(maf_file_path, 40, 0.05),
+        somatic_interactions(maf_file_path, 40, 0.05, output_format="text"),
+    ]
+    assert sparse == dense
+
+
+if __name__ == "__main__":
+    test_blocks_match_dense_pairs()
@@ -0,0 +1,112 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from maf_tools.analyses import somatic_interactions
+from maf_tools.gene_ranking import gene_ranking
+from maf_tools.stratified import sample_groups, stratify
+from maf_tools.synthetic import PlantedPair, generate_maf, write_maf
+
+
+def cohort(prefix, co_occurring, seed):
+    maf_df = generate_maf(200, 15, max_rate=0.6, decay=0.3, co_occurring=[co_occurring], seed=seed)
+    maf_df["Tumor_Sample_Barcode"] = prefix + maf_df["Tumor_Sample_Barcode"].astype(str)
+    maf_df["Cancer_Type"] = prefix
+    return maf_df
+
+
+def pvalues(result):
+    columns = result["columns"]
+    return {
+        frozenset((row[columns.index("gene1")], row[columns.index("gene2")])): (
+            row[columns.index("pValue")],
+            row[columns.index("pAdjust")],
+        )
+        for row in result["rows"]
+    }
+
+
+def test_groups_match_separate_analyses(tmp_path):
+    luad = cohort("LUAD", PlantedPair("GENE5", "GENE6", 0.95), 1)
+    brca = cohort("BRCA", PlantedPair("GENE7", "GENE8", 0.95), 2)
+    maf_file_path = write_maf(pd.concat([luad, brca]), str(tmp_path / "cohort.maf"))
+
+    result = json.loads(
+        somatic_interactions(maf_file_path, 15, 1.01, group_by="Cancer_Type", max_rows=None)
+    )
+    assert result["groups"] == {
+        "BRCA": {"samples": brca["Tumor_Sample_Barcode"].nunique(), "significant": 105},
+        "LUAD": {"samples": luad["Tumor_Sample_Barcode"].nunique(), "significant": 105},
+    }
+    assert result["pairs_tested"] == 210
+    assert result["columns"][0] == "group"
+
+    for name, maf_df in (("LUAD", luad), ("BRCA", brca)):
+        group_file_path = write_maf(maf_df, str(tmp_path / f"{name}.maf"))
+        expected = json.loads(somatic_interactions(group_file_path, 15, 1.01, max_rows=None))
+        rows = [row for row in result["rows"] if row[0] == name]
+        assert pvalues({"columns": result["columns"], "rows": rows}) == pvalues(expected)
+
+    # Each planted pair is found in its own group only
+    significant = json.loads(
+        somatic_interactions(maf_file_path, 15, 0.01, group_by="Cancer_Type")
+    )
+    found = {(row[0], frozenset(row[1:3])) for row in significant["rows"]}
+    assert ("LUAD", frozenset(["GENE5", "GENE6"])) in found
+    assert ("BRCA", frozenset(["GENE7", "GENE8"])) in found
+    assert ("LUAD", frozenset(["GENE7", "GENE8"])) not in found
+
+
+def test_mapping_file_and_views(tmp_path):
+    planted = PlantedPair("GENE1", "GENE2")
+    maf_df = pd.concat([cohort("A", planted, 3), cohort("B", planted, 4)])
+    maf_file_path = write_maf(maf_df, str(tmp_path / "cohort.maf"))
+    mapping_file_path = tmp_path / "groups.tsv"
+    samples = maf_df[["Tumor_Sample_Barcode", "Cancer_Type"]].drop_duplicates()
+    # Samples that are not in the cohort are ignored
+    mapping_file_path.write_text(
+        "Tumor_Sample_Barcode\tgroup\n"
+        + "".join(f"{sample}\t{group}\n" for sample, group in samples.itertuples(index=False))
+        + "OTHER1\tC\n"
+    )
+
+    assert somatic_interactions(
+        maf_file_path, 10, 0.05, group_by=str(mapping_file_path)
+    ) == somatic_interactions(maf_file_path, 10, 0.05, group_by="Cancer_Type").replace(
+        '"group_by":"Cancer_Type"', f'"group_by":{json.dumps(str(mapping_file_path))}'
+    )
+
+    ranking = gene_ranking(maf_file_path)
+    strata = stratify(ranking, ranking.top_genes(10), sample_groups(maf_file_path, "Cancer_Type"))
+    assert [name for name, _ in strata] == ["A", "B"]
+    # Both groups are slices of one matrix
+    assert np.shares_memory(strata[0][1].matrix, strata[1][1].matrix.base)
+    assert list(strata[1][1].samples[:2]) == ["BSAMPLE000", "BSAMPLE001"]
+
+
+def test_group_errors(tmp_path):
+    maf_df = cohort("A", PlantedPair("GENE1", "GENE2"), 5)
+    maf_df.loc[maf_df.index[0], "Cancer_Type"] = "B"
+    maf_file_path = write_maf(maf_df, str(tmp_path / "cohort.maf"))
+
+    result = somatic_interactions(maf_file_path, 10, 0.05, group_by="Cancer_Type")
+    assert result.startswith("Error") and "more than one group" in result
+    result = somatic_interactions(maf_file_path, 10, 0.05, group_by="Panel")
+    assert result == "Error: Required column not found in MAF file: Panel"
+    result = somatic_interactions(
+        maf_file_path, 10, 0.05, group_by="Cancer_Type", incremental=True
+    )
+    assert result == "Error: Incremental analysis does not support group_by"
+
+
+if __name__ == "__main__":
+    import pathlib
+    import tempfile
+
+    test_groups_match_separate_analyses(pathlib.Path(tempfile.mkdtemp()))
@@ -0,0 +1,105 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import json
+import subprocess
+
+import pytest
+
+from maf_tools.analyses import somatic_interactions
+from maf_tools.maf_reader import read_maf
+from maf_tools.synthetic import (
+    SYNTHETIC_COLUMNS,
+    PlantedPair,
+    gene_mutation_rates,
+    generate_maf,
+    parse_pair,
+    write_maf,
+)
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_generate_maf_is_reproducible():
+    first = generate_maf(200, 50, seed=3)
+    second = generate_maf(200, 50, seed=3)
+    assert list(first.columns) == SYNTHETIC_COLUMNS
+    assert first.equals(second)
+    assert not first.equals(generate_maf(200, 50, seed=4))
+
+
+def test_generate_maf_follows_gene_rates():
+    maf_df = generate_maf(4000, 20, burden_sigma=0, extra_mutations=0, seed=1)
+    mutated = maf_df.groupby("Hugo_Symbol", observed=False)["Tumor_Sample_Barcode"].nunique()
+    frequencies = mutated.to_numpy() / 4000
+    assert frequencies == pytest.approx(gene_mutation_rates(20), abs=0.02)
+
+    # Deletions and insertions use "-" for the missing allele
+    deletions = maf_df[maf_df["Variant_Type"] == "DEL"]
+    assert (deletions["Tumor_Seq_Allele2"] == "-").all()
+    snps = maf_df[maf_df["Variant_Type"] == "SNP"]
+    assert (snps["Reference_Allele"] != snps["Tumor_Seq_Allele2"]).all()
+
+
+def test_planted_pairs_are_detected(tmp_path):
+    maf_df = generate_maf(
+        1000,
+        200,
+        co_occurring=[PlantedPair("GENE3", "GENE4", 0.8)],
+        mutually_exclusive=[PlantedPair("GENE1", "GENE2", 0.95)],
+        seed=0,
+    )
+    maf_file_path = write_maf(maf_df, str(tmp_path / "synthetic.maf"))
+    assert len(read_maf(maf_file_path)) == len(maf_df)
+
+    result = json.loads(somatic_interactions(maf_file_path, 10, 0.05))
+    events = {tuple(sorted(row[:2])): row[2] for row in result["rows"]}
+    assert events[("GENE3", "GENE4")] == "Co_Occurence"
+    assert events[("GENE1", "GENE2")] == "Mutually_Exclusive"
+
+
+def test_unknown_planted_gene():
+    with pytest.raises(ValueError, match="GENE99"):
+        generate_maf(10, 5, co_occurring=[PlantedPair("GENE1", "GENE99")])
+
+
+def test_parse_pair():
+    assert parse_pair("TP53:MDM2") == PlantedPair("TP53", "MDM2", 0.8)
+    assert parse_pair("A:B:0.5") == PlantedPair("A", "B", 0.5)
+    with pytest.raises(ValueError):
+        parse_pair("TP53")
+
+
+def test_benchmark_harness(tmp_path):
+    output = tmp_path / "results.json"
+    subprocess.run(
+        [
+            sys.executable,
+            "benchmarks/run_benchmarks.py",
+            "--scales",
+            "100x30",
+            "--top-n",
+            "5,10",
+            "--repeat",
+            "1",
+            "--output",
+            str(output),
+        ],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        check=True,
+    )
+    results = json.loads(output.read_text())["results"]
+    assert [(r["benchmark"], r["params"]) for r in results] == [
+        ("maf_summarizer", {}),
+        ("somatic_interactions", {"top_n": 5}),
+        ("somatic_interactions", {"top_n": 10}),
+        ("report", {"top_n": 10}),
+    ]
+    assert all(r["best_s"] > 0 and r["peak_mb"] > 0 for r in results)
+
+
+if __name__ == "__main__":
+    test_generate_maf_is_reproducible()
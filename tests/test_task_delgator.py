@@ -3,8 +3,24 @@ import os
 # Add the project root to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
+import json
+
+from conftest import write_maf
+from maf_tools.dgidb_snapshot import DGIdbSnapshot
+from maf_tools.drug_gene_interactions import DrugGeneInteractionTool
+from maf_tools.pipeline import plan_tasks
 from maf_tools.task_delegator import TaskDelegator
 
+PLAN = {
+    "steps": [
+        "Summarize MAF file",
+        "Perform somatic interaction analysis",
+        "Identify drug-gene interactions",
+    ]
+}
+RECORDS = [("BRAF", "S1", "Missense_Mutation"), ("KRAS", "S2", "Missense_Mutation")]
+
+
 def test_task_delegator():
     delegator = TaskDelegator()
     inputs = {
@@ -14,5 +30,45 @@ def test_task_delegator():
     result = delegator._run(inputs)
     print(result)
 
+
+def test_plan_tasks_maps_steps_to_tasks():
+    tasks, unknown = plan_tasks(
+        {"steps": ["Generate the report", "Identify drug-gene interactions", "Load data"]}
+    )
+    assert tasks == ["drug_gene_interactions", "report"]
+    assert unknown == ["Load data"]
+    assert plan_tasks(PLAN)[0] == ["summary", "somatic_interactions", "drug_gene_interactions"]
+
+
+def test_task_delegator_executes_plan(tmp_path):
+    snapshot = DGIdbSnapshot.build(
+        os.path.join(os.path.dirname(__file__), "data", "dgidb", "interactions.tsv")
+    )
+    delegator = TaskDelegator(drug_gene_tool=DrugGeneInteractionTool(client=snapshot))
+    report = delegator._run(json.dumps(PLAN), write_maf(tmp_path / "a.maf", RECORDS))
+
+    assert report.startswith("# Comprehensive MAF Analysis Report")
+    assert "Number of Samples: 2" in report
+    assert "| BRAF | VEMURAFENIB |" in report
+
+
+def test_task_delegator_applies_plan_parameters(tmp_path):
+    snapshot = DGIdbSnapshot.build(
+        os.path.join(os.path.dirname(__file__), "data", "dgidb", "interactions.tsv")
+    )
+    delegator = TaskDelegator(drug_gene_tool=DrugGeneInteractionTool(client=snapshot))
+    plan = {"steps": ["Identify drug-gene interactions"], "parameters": {"num_genes": 1, "unknown": 3}}
+    report = delegator._run(json.dumps(plan), write_maf(tmp_path / "a.maf", RECORDS))
+
+    assert "| BRAF | VEMURAFENIB |" in report
+    assert "KRAS" not in report
+
+
+def test_task_delegator_lists_tasks_without_executing():
+    delegator = TaskDelegator(execute=False)
+    result = delegator._run(json.dumps(PLAN), "a.maf")
+    assert result.startswith("Summarize the MAF file located at: a.maf")
+
+
 if __name__ == "__main__":
     test_task_delegator()
\ No newline at end of file
@@ -0,0 +1,19 @@
+import sys
+import os
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+
+from maf_tools.tool_output import table
+
+
+def test_table_rounds_floats_but_not_pvalues():
+    rows = [("TP53", "KRAS", np.float64(2.345678), np.float64(0.04996123), 0.0499612, 3)]
+    result = table(rows, ["gene1", "gene2", "oddsRatio", "pValue", "pAdjust", "count"])
+    assert result["rows"] == [["TP53", "KRAS", 2.35, 0.04996123, 0.0499612, 3]]
+    assert result["truncated"] == 0
+
+
+if __name__ == "__main__":
+    test_table_rounds_floats_but_not_pvalues()